@@ -0,0 +1,215 @@
+"""Banc d'essai des chemins critiques de la couche de données, sans serveur Streamlit
+
+Les territoires, secteurs et mois sont paramétrables ; chaque étape est chronométrée
+(meilleure et médiane de --repeat passes, cumulées sur les territoires) puis rejouée
+une fois sous tracemalloc pour son pic mémoire. Le résultat JSON se compare à celui
+d'un autre commit avec --compare. Exemple :
+    
+    python benchmarks/hot_paths.py --territories 11 --sectors 500 --months 240 --json bench.json
+    python benchmarks/hot_paths.py --territories 11 --sectors 500 --months 240 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+import numpy as np
+import pandas as pd
+import streamlit.logger
+
+# Hors serveur, les caches Streamlit avertissent à chaque appel
+streamlit.logger.set_log_level('error')
+warnings.filterwarnings('ignore')
+
+from octroi.aggregates import ComparisonEngine, build_rollups
+from octroi.anomalies import AnomalyDetector, _monthly_values
+from octroi.definitions import get_secteurs_definitions, get_territories_definitions
+from octroi.forecast import build_forecasts
+from octroi.generators import (
+    _generate_historical_data_vectorized, build_current_data_from_history, generate_current_data
+)
+from octroi.live import LiveUpdateEngine
+from octroi.query import COLONNES_TRI, SecteurQueryIndex
+from octroi.scenario import Scenario
+from octroi.schema import enforce_history_schema
+
+def _sans_cache(fonction):
+    # Les étapes mesurent le calcul, pas le cache st.cache_data
+    return getattr(fonction, '__wrapped__', fonction)
+
+def build_territories(n_territories):
+    """Territoires du banc : les définitions réelles, dupliquées au-delà de 11"""
+    reels = get_territories_definitions()
+    territoires = {}
+    for i in range(n_territories):
+        code, info = list(reels.items())[i % len(reels)]
+        if i >= len(reels):
+            code = f'{code}_{i // len(reels)}'
+        territoires[code] = {**info, 'taux_octroi_actif': True, 'source': code.split('_')[0]}
+    return territoires
+
+def build_secteurs(territory_code, n_secteurs):
+    """Secteurs du banc : ceux du territoire, dupliqués jusqu'à n_secteurs lignes"""
+    base = list(get_secteurs_definitions(territory_code).items())
+    secteurs = {}
+    for i in range(n_secteurs):
+        code, info = base[i % len(base)]
+        secteurs[code if i < len(base) else f'{code}_{i // len(base)}'] = info
+    return secteurs
+
+def run_stages(territoires, n_secteurs, dates, batches, seed, memoire=False):
+    """Une passe complète
+    
+    Retourne la durée de chaque étape (cumulée sur les territoires) et, si memoire
+    est vrai (tracemalloc actif), son pic d'allocation (maximum sur les territoires).
+    """
+    durees, pics = {}, {}
+    
+    def mesure(etape, fonction, *args):
+        if memoire:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        debut = time.perf_counter()
+        resultat = fonction(*args)
+        durees[etape] = durees.get(etape, 0.0) + time.perf_counter() - debut
+        if memoire:
+            pics[etape] = max(pics.get(etape, 0), tracemalloc.get_traced_memory()[1] - base)
+        return resultat
+    
+    generer_courant = _sans_cache(generate_current_data)
+    rollups = {}
+    for i, (code, info) in enumerate(territoires.items()):
+        secteurs = build_secteurs(info['source'], n_secteurs)
+        rng = np.random.default_rng([seed, i])
+        
+        historique = mesure('historique', lambda: enforce_history_schema(
+            _generate_historical_data_vectorized(info['source'], secteurs, dates, rng)))
+        courant = mesure('courant_simule', generer_courant, info['source'], secteurs, historique, Scenario(seed=seed))
+        mesure('courant_depuis_historique', build_current_data_from_history, info['source'], secteurs, historique)
+        rollups[code] = mesure('rollups', build_rollups, historique)
+        mesure('previsions', build_forecasts, historique)
+        mesure('anomalies', lambda: AnomalyDetector(*_monthly_values(historique)))
+        mesure('groupby_categories', lambda: courant.groupby('categorie', observed=True).agg({
+            'variation_pct': 'mean',
+            'volume_importation': 'sum',
+            'revenu_mensuel': 'sum',
+            'secteur': 'count'
+        }).reset_index())
+        
+        index = mesure('index_requete', SecteurQueryIndex, courant)
+        mesure('requete', lambda: [index.query(colonne, performance='En croissance')
+                                   for colonne in COLONNES_TRI.values()])
+        
+        moteur = LiveUpdateEngine(courant, 0)
+        
+        def mises_a_jour():
+            for _ in range(batches):
+                moteur.apply(*moteur.random_batch(rng))
+            return moteur.snapshot()
+        mesure('mises_a_jour_direct', mises_a_jour)
+    
+    # Comparaison : construction complète, puis mise à jour d'un seul territoire
+    def comparaison_complete():
+        moteur = ComparisonEngine(territoires)
+        for code in territoires:
+            moteur.update(code, 0, lambda: rollups[code]['total_mensuel'])
+        return moteur
+    moteur = mesure('comparaison', comparaison_complete)
+    code = next(iter(territoires))
+    mesure('comparaison_incrementale', moteur.update, code, 1, lambda: rollups[code]['total_mensuel'])
+    return durees, pics
+
+def peak_memory(territoires, n_secteurs, dates, batches, seed):
+    """Pic mémoire (octets) de chaque étape, sur une passe rejouée sous tracemalloc"""
+    tracemalloc.start()
+    try:
+        return run_stages(territoires, n_secteurs, dates, batches, seed, memoire=True)[1]
+    finally:
+        tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--territories', type=int, default=11, help="nombre de territoires (défaut : 11)")
+    parser.add_argument('--sectors', type=int, default=10, help="secteurs/produits par territoire (défaut : 10)")
+    parser.add_argument('--months', type=int, default=48, help="mois d'historique (défaut : 48)")
+    parser.add_argument('--batches', type=int, default=20, help="lots de mises à jour en direct par territoire")
+    parser.add_argument('--repeat', type=int, default=3, help="passes chronométrées (défaut : 3)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="ne pas mesurer le pic mémoire")
+    parser.add_argument('--json', help="fichier de sortie JSON")
+    parser.add_argument('--compare', help="résultat JSON de référence (autre commit)")
+    args = parser.parse_args()
+    
+    territoires = build_territories(args.territories)
+    dates = pd.date_range(end=datetime.now(), periods=args.months, freq='M')
+    
+    passes = [run_stages(territoires, args.sectors, dates, args.batches, args.seed)[0]
+              for _ in range(args.repeat)]
+    pics = {} if args.no_memory else peak_memory(territoires, args.sectors, dates, args.batches, args.seed)
+    
+    etapes = {}
+    for etape in passes[0]:
+        mesures = [passe[etape] for passe in passes]
+        etapes[etape] = {
+            'min_s': min(mesures),
+            'median_s': statistics.median(mesures),
+            'pic_memoire_mo': pics[etape] / 1e6 if etape in pics else None
+        }
+    
+    rapport = {
+        'meta': {
+            'commit': _git_commit(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'parametres': {
+                'territoires': args.territories,
+                'secteurs': args.sectors,
+                'mois': args.months,
+                'lots': args.batches,
+                'passes': args.repeat,
+                'seed': args.seed
+            }
+        },
+        'etapes': etapes
+    }
+    
+    reference = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            reference = json.load(f)
+    
+    print(f"{args.territories} territoires × {args.sectors} secteurs × {args.months} mois "
+          f"({args.territories * args.sectors * args.months:,} lignes d'historique)")
+    for etape, mesure in etapes.items():
+        ligne = f"  {etape:<28} {mesure['min_s'] * 1000:10.1f} ms"
+        if mesure['pic_memoire_mo'] is not None:
+            ligne += f"  {mesure['pic_memoire_mo']:8.1f} Mo"
+        if reference and etape in reference['etapes']:
+            ligne += f"  ×{mesure['min_s'] / reference['etapes'][etape]['min_s']:.2f} vs référence"
+        print(ligne)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rapport, f, indent=2, ensure_ascii=False)
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RACINE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == '__main__':
+    main()
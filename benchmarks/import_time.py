@@ -0,0 +1,79 @@
+"""Temps d'import du dashboard, mesuré avec ``python -X importtime``
+
+Chaque mesure s'exécute dans un interpréteur neuf. Exemple :
+
+    python benchmarks/import_time.py --repeat 5 --top 15 --json import_time.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def mesurer(module):
+    """Une mesure : liste des modules importés (temps propre et cumulé, en µs)"""
+    resultat = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=RACINE, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for ligne in resultat.stderr.splitlines():
+        if not ligne.startswith('import time:') or 'self [us]' in ligne:
+            continue
+        propre, cumul, nom = ligne[len('import time:'):].split('|')
+        modules.append({
+            'module': nom.strip(),
+            'profondeur': (len(nom) - len(nom.lstrip()) - 1) // 2,
+            'propre_us': int(propre),
+            'cumul_us': int(cumul)
+        })
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='octroi.app', help="module à importer (défaut : octroi.app)")
+    parser.add_argument('--repeat', type=int, default=3, help="nombre de mesures (la plus rapide est retenue)")
+    parser.add_argument('--top', type=int, default=10, help="nombre de dépendances affichées")
+    parser.add_argument('--json', help="fichier de sortie JSON, pour comparer deux commits")
+    args = parser.parse_args()
+    
+    mesures = [mesurer(args.module) for _ in range(args.repeat)]
+    totaux = [next(m['cumul_us'] for m in mesure if m['module'] == args.module) for mesure in mesures]
+    meilleure = mesures[totaux.index(min(totaux))]
+    
+    # Dépendances importées directement par le module (listées juste avant lui), par coût cumulé
+    position = next(i for i, m in enumerate(meilleure) if m['module'] == args.module)
+    directes = []
+    for m in reversed(meilleure[:position]):
+        if m['profondeur'] == 0:
+            break
+        if m['profondeur'] == 1:
+            directes.append(m)
+    directes.sort(key=lambda m: m['cumul_us'], reverse=True)
+    charges = {m['module'] for m in meilleure}
+    
+    rapport = {
+        'module': args.module,
+        'python': sys.version.split()[0],
+        'total_ms': min(totaux) / 1000,
+        'mesures_ms': [total / 1000 for total in totaux],
+        'modules_charges': len(charges),
+        'plotly_express_charge': 'plotly.express' in charges,
+        'dependances': [{'module': m['module'], 'cumul_ms': m['cumul_us'] / 1000}
+                        for m in directes[:args.top]]
+    }
+    
+    print(f"import {args.module} : {rapport['total_ms']:.0f} ms "
+          f"(meilleure de {args.repeat}, {rapport['modules_charges']} modules)")
+    print(f"plotly.express chargé à l'import : {'oui' if rapport['plotly_express_charge'] else 'non'}")
+    for dependance in rapport['dependances']:
+        print(f"  {dependance['cumul_ms']:8.1f} ms  {dependance['module']}")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(rapport, f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""Dashboard Octroi de Mer DROM-COM : couche de données et application Streamlit"""
@@ -0,0 +1,144 @@
+"""Agrégats des vues : rollups par territoire et table de comparaison"""
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .definitions import get_territories_definitions
+from .metrics import get_metrics, instrumented_cache_data
+from .schema import schema_memory_report
+from .store import build_territory_entry
+
+def compute_comparison_metrics(comparison_data):
+    """Indicateurs dérivés de la table de comparaison, en une passe vectorisée"""
+    population = comparison_data['population']
+    pib_euros = comparison_data['pib'] * 1e6
+    return comparison_data.assign(
+        revenu_par_habitant=comparison_data['revenu_octroi_total'] / population,
+        densite=population / comparison_data['superficie'],
+        pib_par_habitant=pib_euros / population,
+        contribution_octroi_pib=comparison_data['revenu_12_mois'] / pib_euros * 100
+    )
+
+def build_rollups(historical_data):
+    """Calcule une fois les agrégats de l'historique consommés par les vues"""
+    # Clés de regroupement passées en tableaux : l'index mensuel n'est pas unique
+    revenus = historical_data['revenu_octroi'].reset_index(drop=True)
+    dates = historical_data['date'].reset_index(drop=True)
+    mois = dates.dt.to_period('M').dt.to_timestamp()
+    
+    # Totaux par date (vue d'ensemble, projections)
+    total_par_date = revenus.groupby(dates).sum().reset_index()
+    total_par_date['revenu_mensuel_M'] = total_par_date['revenu_octroi'] / 1e6
+    
+    # Totaux par mois et catégorie (évolution comparative)
+    par_mois_categorie = revenus.groupby(
+        [mois, historical_data['categorie'].reset_index(drop=True)], observed=True
+    ).sum().reset_index()
+    
+    # Totaux mensuels et cumul (analyse historique)
+    total_mensuel = revenus.groupby(mois.rename('date_group')).sum().reset_index()
+    total_mensuel['cumulative_revenue'] = total_mensuel['revenu_octroi'].cumsum()
+    
+    # Pivot année × mois (carte de chaleur, M€)
+    heatmap = total_mensuel.assign(
+        annee=total_mensuel['date_group'].dt.year,
+        mois=total_mensuel['date_group'].dt.month
+    ).pivot_table(index='annee', columns='mois', values='revenu_octroi', aggfunc='sum') / 1e6
+    
+    # Moyenne par mois de l'année (saisonnalité)
+    saisonnalite = revenus.groupby(dates.dt.month.rename('mois')).mean().reset_index()
+    saisonnalite['revenu_M'] = saisonnalite['revenu_octroi'] / 1e6
+    
+    return {
+        'total_par_date': total_par_date,
+        'par_mois_categorie': par_mois_categorie,
+        'total_mensuel': total_mensuel,
+        'heatmap': heatmap,
+        'saisonnalite': saisonnalite
+    }
+
+@instrumented_cache_data(ttl=1800, max_entries=64)
+def get_rollups(territory_code, data_version, _historical_data, filtre=None):
+    """Agrégats d'un territoire, calculés une seule fois par version des données et filtre"""
+    return build_rollups(_historical_data)
+
+@instrumented_cache_data(ttl=1800, max_entries=64)
+def get_memory_report(territory_code, data_version, _historical_data):
+    """Rapport mémoire du schéma compact d'un territoire, une fois par version des données"""
+    return schema_memory_report(_historical_data)
+
+class ComparisonEngine:
+    """Table de comparaison inter-territoires construite à partir des agrégats mensuels
+    
+    Chaque territoire actif occupe une ligne alimentée par ses agrégats (dernier mois
+    et douze derniers mois). Seuls les territoires dont la version des données a
+    changé sont relus ; les indicateurs dérivés sont ensuite recalculés en une passe
+    sur la table. La table publiée n'est jamais modifiée en place.
+    """
+    
+    def __init__(self, territories):
+        actifs = {code: info for code, info in territories.items() if info['taux_octroi_actif']}
+        self.territory_codes = list(actifs)
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._versions = dict.fromkeys(self.territory_codes)
+        self._lock = threading.Lock()
+        self._table = compute_comparison_metrics(pd.DataFrame({
+            'territoire': self.territory_codes,
+            'nom_complet': [info['nom_complet'] for info in actifs.values()],
+            'type': [info['type'] for info in actifs.values()],
+            'population': [info['population'] for info in actifs.values()],
+            'superficie': [info['superficie'] for info in actifs.values()],
+            'pib': [info['pib'] for info in actifs.values()],
+            'revenu_octroi_total': np.nan,
+            'revenu_12_mois': np.nan,
+            'taux_octroi_actif': True
+        }))
+    
+    def update(self, territory_code, data_version, total_mensuel):
+        """Met à jour la ligne d'un territoire si sa version des données a changé"""
+        with self._lock:
+            if self._versions.get(territory_code) == data_version:
+                self.hits += 1
+                return False
+            self.misses += 1
+            revenus = total_mensuel()['revenu_octroi']
+            table = self._table.copy()
+            ligne = self.territory_codes.index(territory_code)
+            # Territoire sans historique (aucun extrait) : ligne gardée, valeurs manquantes
+            table.iloc[ligne, table.columns.get_loc('revenu_octroi_total')] = \
+                revenus.iloc[-1] if len(revenus) else np.nan
+            table.iloc[ligne, table.columns.get_loc('revenu_12_mois')] = \
+                revenus.iloc[-12:].sum() if len(revenus) else np.nan
+            self._table = compute_comparison_metrics(table)
+            self._versions[territory_code] = data_version
+            self.version += 1
+            return True
+    
+    def refresh(self, store, data_source):
+        """Synchronise la table avec les entrées du magasin partagé"""
+        for territory_code in self.territory_codes:
+            entry = store.get(territory_code, lambda code: build_territory_entry(data_source, code))
+            self.update(
+                territory_code, entry['data_version'],
+                lambda: get_rollups(territory_code, entry['data_version'], entry['historical_data'])['total_mensuel']
+            )
+        return self.snapshot()
+    
+    def snapshot(self):
+        """(version, table) de la dernière table publiée"""
+        with self._lock:
+            return self.version, self._table
+
+@st.cache_resource
+def get_comparison_engine():
+    """Moteur de comparaison partagé du processus"""
+    engine = ComparisonEngine(get_territories_definitions())
+    get_metrics().add_collector(lambda: [
+        ('octroi_cache_hits_total', {'cache': 'comparaison'}, engine.hits),
+        ('octroi_cache_misses_total', {'cache': 'comparaison'}, engine.misses)
+    ])
+    return engine
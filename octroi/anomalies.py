@@ -0,0 +1,216 @@
+"""Détection d'anomalies : scores robustes des résidus saisonniers, par lots"""
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .forecast import PERIODE, monthly_series, seasonal_indices
+from .metrics import get_metrics
+
+# Colonne de l'historique → colonne de l'instantané courant
+METRIQUES = {
+    'revenu_octroi': 'revenu_mensuel',
+    'volume_importation': 'volume_importation'
+}
+
+# Score robuste au-delà duquel un point est signalé
+SEUIL_ANOMALIE = 3.5
+
+# Facteur rendant la MAD comparable à un écart type (loi normale)
+FACTEUR_MAD = 0.6745
+
+def robust_scores(valeurs, fenetres, min_points):
+    """Scores robustes de valeurs (séries × points) face à leurs fenêtres (séries × points × taille)
+    
+    Médiane et écart absolu médian de chaque fenêtre ; les fenêtres incomplètes
+    (valeurs manquantes) ne comptent que leurs valeurs observées. Moins de
+    min_points observations, ou une dispersion nulle, donnent un score nul.
+    """
+    completes = ~np.isnan(fenetres).any(axis=-1)
+    mediane = np.full(valeurs.shape, np.nan)
+    mad = np.full(valeurs.shape, np.nan)
+    if completes.any():
+        mediane[completes] = np.median(fenetres[completes], axis=-1)
+        mad[completes] = np.median(np.abs(fenetres[completes] - mediane[completes][:, None]), axis=-1)
+    
+    partielles = ~completes & ((~np.isnan(fenetres)).sum(axis=-1) >= min_points)
+    if partielles.any():
+        mediane[partielles] = _nanmedian(fenetres[partielles])
+        mad[partielles] = _nanmedian(np.abs(fenetres[partielles] - mediane[partielles][:, None]))
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(mad > 0, FACTEUR_MAD * (valeurs - mediane) / mad, 0.0)
+    return np.where(np.isnan(mediane), 0.0, scores), mediane
+
+def _nanmedian(fenetres):
+    # Médiane par ligne des valeurs observées : le tri range les NaN en fin de ligne
+    triees = np.sort(fenetres, axis=-1)
+    n = (~np.isnan(fenetres)).sum(axis=-1, keepdims=True)
+    bas = np.take_along_axis(triees, (n - 1) // 2, axis=-1)
+    haut = np.take_along_axis(triees, n // 2, axis=-1)
+    return ((bas + haut) / 2)[:, 0]
+
+class AnomalyDetector:
+    """Scores d'anomalie d'un lot de séries mensuelles (séries × mois)
+    
+    Chaque série est désaisonnalisée (indices multiplicatifs), puis chaque mois est
+    comparé aux `fenetre` mois précédents par un score robuste (médiane, MAD). Les
+    fenêtres glissantes de toutes les séries sont évaluées en un bloc. Le détecteur
+    garde la dernière fenêtre de chaque série : un nouveau mois est noté sur cette
+    seule fenêtre, sans relire l'historique. Un détecteur publié n'est jamais
+    modifié ; extend() en renvoie un nouveau.
+    """
+    
+    def __init__(self, series, valeurs, mois, fenetre=PERIODE, min_points=6):
+        valeurs = np.asarray(valeurs, dtype=float)
+        self.series = series
+        self.fenetre = fenetre
+        self.min_points = min_points
+        self.mois = mois
+        self.saison = seasonal_indices(valeurs, mois.month.to_numpy())
+        ajustees = valeurs / self.saison[:, mois.month.to_numpy() - 1]
+        
+        # Chaque mois est comparé aux `fenetre` mois qui le précèdent
+        precedents = np.concatenate([np.full((len(series), fenetre), np.nan), ajustees], axis=1)
+        fenetres = sliding_window_view(precedents[:, :-1], fenetre, axis=1)
+        scores, mediane = robust_scores(ajustees, fenetres, min_points)
+        
+        self.valeurs = valeurs
+        self.scores = scores
+        self.attendus = mediane * self.saison[:, mois.month.to_numpy() - 1]
+        self.tampon = precedents[:, -fenetre:]
+    
+    def score(self, valeurs, periode):
+        """Scores et valeurs attendues d'un nouveau point (une valeur par série), sans l'ajouter"""
+        saison = self.saison[:, periode.month - 1]
+        scores, mediane = robust_scores((np.asarray(valeurs, dtype=float) / saison)[:, None],
+                                        self.tampon[:, None, :], self.min_points)
+        return scores[:, 0], mediane[:, 0] * saison
+    
+    def extend(self, valeurs, mois):
+        """Nouveau détecteur complété de mois postérieurs (séries × nouveaux mois)"""
+        valeurs = np.asarray(valeurs, dtype=float)
+        suite = object.__new__(AnomalyDetector)
+        suite.__dict__.update(self.__dict__)
+        scores, attendus = [], []
+        for i, periode in enumerate(mois):
+            score, attendu = suite.score(valeurs[:, i], periode)
+            scores.append(score)
+            attendus.append(attendu)
+            ajustee = valeurs[:, i] / self.saison[:, periode.month - 1]
+            suite.tampon = np.concatenate([suite.tampon[:, 1:], ajustee[:, None]], axis=1)
+        
+        suite.mois = self.mois.append(mois)
+        suite.valeurs = np.concatenate([self.valeurs, valeurs], axis=1)
+        suite.scores = np.concatenate([self.scores, np.column_stack(scores)], axis=1)
+        suite.attendus = np.concatenate([self.attendus, np.column_stack(attendus)], axis=1)
+        return suite
+    
+    def flagged(self, seuil=SEUIL_ANOMALIE):
+        """Points de l'historique dont le score dépasse le seuil, les plus récents d'abord"""
+        lignes, colonnes = np.nonzero(np.abs(self.scores) >= seuil)
+        ordre = np.lexsort((-np.abs(self.scores[lignes, colonnes]), -colonnes))
+        lignes, colonnes = lignes[ordre], colonnes[ordre]
+        return pd.DataFrame({
+            'mois': self.mois[colonnes].to_timestamp(),
+            'secteur': self.series.get_level_values('secteur')[lignes],
+            'metrique': self.series.get_level_values('metrique')[lignes],
+            'valeur': self.valeurs[lignes, colonnes],
+            'attendu': self.attendus[lignes, colonnes],
+            'score': self.scores[lignes, colonnes]
+        })
+    
+    def score_table(self, metrique):
+        """Scores d'une métrique (secteurs × mois) pour la carte de chaleur"""
+        lignes = self.series.get_level_values('metrique') == metrique
+        return pd.DataFrame(self.scores[lignes], index=self.series.get_level_values('secteur')[lignes],
+                            columns=self.mois.to_timestamp())
+
+def _monthly_values(historical_data):
+    """Séries (secteur, métrique) et valeurs (séries × mois) de l'historique"""
+    cadres = [monthly_series(historical_data, colonne, total=False) for colonne in METRIQUES]
+    secteurs = cadres[0].columns
+    series = pd.MultiIndex.from_product([list(METRIQUES), secteurs], names=['metrique', 'secteur'])
+    valeurs = np.concatenate([cadre.reindex(columns=secteurs).to_numpy().T for cadre in cadres])
+    return series, valeurs, cadres[0].index
+
+def score_current(detecteur, current_data):
+    """Scores de l'instantané courant (mois suivant l'historique) : une ligne par secteur"""
+    metriques = detecteur.series.get_level_values('metrique')
+    secteurs = detecteur.series.get_level_values('secteur')
+    courant = current_data.set_index(current_data['secteur'].astype(str))
+    valeurs = np.concatenate([
+        courant[colonne].reindex(secteurs[metriques == metrique]).to_numpy(dtype=float)
+        for metrique, colonne in METRIQUES.items()
+    ])
+    scores, attendus = detecteur.score(valeurs, detecteur.mois[-1] + 1)
+    resultat = pd.DataFrame({
+        'metrique': metriques,
+        'secteur': secteurs,
+        'valeur': valeurs,
+        'attendu': attendus,
+        'score': np.nan_to_num(scores)
+    }).pivot(index='secteur', columns='metrique')
+    resultat.columns = [f'{metrique}_{champ}' for champ, metrique in resultat.columns]
+    return resultat.reset_index()
+
+class AnomalyEngine:
+    """Détecteurs d'anomalies des territoires, partagés par les sessions
+    
+    Un détecteur est construit au premier chargement d'un territoire. Quand une
+    nouvelle version des données prolonge l'historique sans réviser le dernier
+    mois noté, seuls les nouveaux mois sont notés ; sinon le détecteur est
+    reconstruit.
+    """
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self._detecteurs = {}
+        self._lock = threading.Lock()
+    
+    def detector(self, territory_code, data_version, historical_data):
+        with self._lock:
+            version, detecteur = self._detecteurs.get(territory_code, (None, None))
+            if detecteur is not None and version == data_version:
+                self.hits += 1
+                return detecteur
+            self.misses += 1
+            
+            suite = self._extend(detecteur, historical_data) if detecteur is not None else None
+            if suite is None:
+                series, valeurs, mois = _monthly_values(historical_data)
+                suite = AnomalyDetector(series, valeurs, mois)
+            else:
+                self.extensions += 1
+            self._detecteurs[territory_code] = (data_version, suite)
+            return suite
+    
+    @staticmethod
+    def _extend(detecteur, historical_data):
+        """Détecteur prolongé des seuls mois nouveaux, ou None si l'historique a été révisé"""
+        if not isinstance(historical_data.index, pd.PeriodIndex):
+            return None
+        dernier = detecteur.mois[-1]
+        recents = historical_data[historical_data.index >= dernier]
+        if not len(recents) or recents.index.max() <= dernier:
+            return None
+        
+        series, valeurs, mois = _monthly_values(recents)
+        if not series.equals(detecteur.series) or mois[0] != dernier \
+                or not np.allclose(valeurs[:, 0], detecteur.valeurs[:, -1]):
+            return None
+        return detecteur.extend(valeurs[:, 1:], mois[1:])
+
+@st.cache_resource
+def get_anomaly_engine():
+    """Moteur d'anomalies partagé du processus"""
+    engine = AnomalyEngine()
+    get_metrics().add_collector(lambda: [
+        ('octroi_cache_hits_total', {'cache': 'anomalies'}, engine.hits),
+        ('octroi_cache_misses_total', {'cache': 'anomalies'}, engine.misses)
+    ])
+    return engine
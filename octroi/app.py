@@ -0,0 +1,1570 @@
+"""Application Streamlit du dashboard Octroi de Mer"""
+import json
+import time
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from .anomalies import METRIQUES, SEUIL_ANOMALIE, get_anomaly_engine, score_current
+from .aggregates import get_comparison_engine, get_memory_report, get_rollups
+from .definitions import get_territories_definitions
+from .export import FORMATS, ExportJob
+from .figures import get_figure_cache, px
+from .forecast import forecast_frame, get_forecasts
+from .metrics import get_metrics, start_metrics_exporter
+from .partitions import HistoryFilter
+from .live import LiveUpdateEngine, get_refresh_scheduler, summarize_current
+from .profiling import RenderProfiler
+from .query import COLONNES_TRI
+from .scenario import get_scenario
+from .simulator import COEFFICIENTS_ORIGINE, TYPES_TAUX, calculer_octroi_batch
+from .sources import get_data_source
+from .store import TerritoryLease, build_territory_entry, get_territory_store, start_warm_up
+warnings.filterwarnings('ignore')
+
+# CSS personnalisé
+CSS = """
+<style>
+    .main-header {
+        font-size: 2.5rem;
+        background: linear-gradient(45deg, #0055A4, #EF4135, #FFD700);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        text-align: center;
+        margin-bottom: 2rem;
+        font-weight: bold;
+    }
+    .live-badge {
+        background: linear-gradient(45deg, #0055A4, #00A3E0);
+        color: white;
+        padding: 0.3rem 1rem;
+        border-radius: 20px;
+        font-weight: bold;
+        display: inline-block;
+        animation: pulse 2s infinite;
+    }
+    @keyframes pulse {
+        0% { transform: scale(1); }
+        50% { transform: scale(1.05); }
+        100% { transform: scale(1); }
+    }
+    .metric-card {
+        background-color: #f0f2f6;
+        padding: 1rem;
+        border-radius: 10px;
+        border-left: 4px solid #0055A4;
+        margin: 0.5rem 0;
+    }
+    .section-header {
+        color: #0055A4;
+        border-bottom: 2px solid #EF4135;
+        padding-bottom: 0.5rem;
+        margin-top: 2rem;
+    }
+    .sector-card {
+        padding: 1rem;
+        border-radius: 10px;
+        margin: 0.5rem 0;
+        border-left: 5px solid #0055A4;
+        background-color: #f8f9fa;
+    }
+    .revenue-change {
+        padding: 0.5rem;
+        border-radius: 5px;
+        margin: 0.2rem 0;
+        font-size: 0.9rem;
+        font-weight: bold;
+    }
+    .positive { background-color: #d4edda; border-left: 4px solid #28a745; color: #155724; }
+    .negative { background-color: #f8d7da; border-left: 4px solid #dc3545; color: #721c24; }
+    .neutral { background-color: #e2e3e5; border-left: 4px solid #6c757d; color: #383d41; }
+    .sector-badge {
+        display: inline-block;
+        padding: 0.25rem 0.5rem;
+        border-radius: 15px;
+        font-size: 0.75rem;
+        font-weight: 600;
+        margin-right: 0.5rem;
+        margin-bottom: 0.5rem;
+    }
+    .territory-flag {
+        padding: 0.5rem 1rem;
+        border-radius: 10px;
+        text-align: center;
+        margin: 1rem 0;
+        color: white;
+    }
+    .reunion-flag { background: linear-gradient(90deg, #0055A4 33%, #EF4135 33%, #EF4135 66%, #FFFFFF 66%); }
+    .guadeloupe-flag { background: linear-gradient(90deg, #ED2939 50%, #002395 50%); }
+    .martinique-flag { background: linear-gradient(90deg, #009739 33%, #002395 33%, #002395 66%, #FCD116 66%); }
+    .guyane-flag { background: linear-gradient(90deg, #009739 50%, #FCD116 50%); }
+    .mayotte-flag { background: linear-gradient(90deg, #FFFFFF 25%, #ED2939 25%, #ED2939 50%, #002395 50%, #002395 75%, #FCD116 75%); }
+    .spierre-flag { background: linear-gradient(90deg, #002395 33%, #FFFFFF 33%, #FFFFFF 66%, #ED2939 66%); }
+    .stbarth-flag { background: linear-gradient(90deg, #FFFFFF 50%, #FCD116 50%); }
+    .stmartin-flag { background: linear-gradient(90deg, #ED2939 50%, #002395 50%); }
+    .wallis-flag { background: linear-gradient(90deg, #ED2939 33%, #002395 33%, #002395 66%, #FCD116 66%); }
+    .polynesie-flag { background: linear-gradient(90deg, #ED2939 25%, #FFFFFF 25%, #FFFFFF 50%, #FCD116 50%, #FCD116 75%, #002395 75%); }
+    .caledonie-flag { background: linear-gradient(90deg, #002395 33%, #FCD116 33%, #FCD116 66%, #ED2939 66%); }
+    .territory-selector {
+        background-color: #f8f9fa;
+        padding: 1rem;
+        border-radius: 10px;
+        border: 2px solid #0055A4;
+        margin-bottom: 1rem;
+    }
+    .loading-spinner {
+        display: flex;
+        justify-content: center;
+        align-items: center;
+        height: 200px;
+    }
+</style>
+"""
+
+def configure_page():
+    """Configuration de la page et styles, au début de chaque exécution du script"""
+    st.set_page_config(
+        page_title="Dashboard Octroi de Mer - DROM-COM",
+        page_icon="🏝️",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    st.markdown(CSS, unsafe_allow_html=True)
+
+def init_session_state():
+    """Initialisation de l'état de session"""
+    if 'live_overlays' not in st.session_state:
+        st.session_state.live_overlays = {}
+    if 'exports' not in st.session_state:
+        st.session_state.exports = {}
+    if 'selected_territory' not in st.session_state:
+        st.session_state.selected_territory = 'REUNION'
+    if 'last_update' not in st.session_state:
+        st.session_state.last_update = datetime.now()
+    if 'metrics_session' not in st.session_state:
+        overlays = st.session_state.live_overlays
+        st.session_state.metrics_session = get_metrics().register_session(
+            lambda: sum(engine.memory_usage() for engine in list(overlays.values()))
+        )
+
+def _style_variation(valeur):
+    """Style conditionnel d'une variation, aligné sur les classes .positive/.negative/.neutral"""
+    if valeur > 0:
+        return 'background-color: #d4edda; color: #155724'
+    if valeur < 0:
+        return 'background-color: #f8d7da; color: #721c24'
+    return 'background-color: #e2e3e5; color: #383d41'
+
+class OctroiMerDashboard:
+    def __init__(self, data_source=None):
+        self.territories = get_territories_definitions()
+        self.data_source = data_source or get_data_source()
+        # Scénario des tirages simulés (celui de la source, sinon celui du processus)
+        self.scenario = getattr(self.data_source, 'scenario', None) or get_scenario()
+        self.warm_up = start_warm_up() if data_source is None else None
+        self.profiler = RenderProfiler()
+        self.details_container = None
+        self.filters = HistoryFilter()
+    
+    def _load_territory(self, territory_code):
+        """Charge un territoire depuis la source de données (entrée du magasin partagé)"""
+        return build_territory_entry(self.data_source, territory_code)
+    
+    def _hold_territory(self, store, territory_code):
+        """Référence le territoire affiché par la session pour le protéger de l'éviction"""
+        lease = st.session_state.get('territory_lease')
+        if lease is not None and lease.territory_code == territory_code:
+            return
+        st.session_state.territory_lease = TerritoryLease(store, territory_code)
+        if lease is not None:
+            lease.release()
+    
+    def get_territory_data(self, territory_code):
+        """Récupère les données d'un territoire (magasin partagé + calque de la session)"""
+        store = get_territory_store()
+        if territory_code == st.session_state.selected_territory:
+            self._hold_territory(store, territory_code)
+        
+        if territory_code in store:
+            entry = store.get(territory_code, self._load_territory)
+        else:
+            with st.spinner(f"Chargement des données pour {self.territories[territory_code]['nom_complet']}..."):
+                entry = store.get(territory_code, self._load_territory)
+        
+        engine = self.get_live_engine(territory_code, entry, create=False)
+        if engine is None or engine.version == 0:
+            return entry
+        
+        # Les mises à jour en direct de la session s'appliquent sur une copie
+        return {**entry, 'current_data': engine.snapshot(), 'last_update': engine.last_update,
+                'query_index': engine.query_index(entry['query_index']),
+                'live_version': engine.etat}
+    
+    def get_view_data(self, territory_code):
+        """Données d'un territoire restreintes à la période et aux catégories de la barre latérale"""
+        return self.filters.apply(self.get_territory_data(territory_code))
+    
+    def get_live_engine(self, territory_code, entry=None, create=True):
+        """Moteur des mises à jour en direct de la session pour un territoire"""
+        engine = st.session_state.live_overlays.get(territory_code)
+        if engine is None and not create:
+            return None
+        if entry is None:
+            entry = get_territory_store().get(territory_code, self._load_territory)
+        
+        if engine is None:
+            engine = LiveUpdateEngine(entry['current_data'], entry['data_version'])
+            st.session_state.live_overlays[territory_code] = engine
+        elif engine.base_version != entry['data_version']:
+            engine.rebase(entry['current_data'], entry['data_version'],
+                          get_refresh_scheduler().version(territory_code))
+        return engine
+    
+    @staticmethod
+    def _live_version(data):
+        """Version de l'instantané courant : version chargée + état du calque en direct
+        
+        L'état ne dépend que des lots appliqués : les sessions au même état partagent
+        les figures du cache.
+        """
+        return (data['data_version'], data.get('live_version', 0))
+    
+    def _plotly_chart(self, chart_id, version, build_fig, params=None, territory_code=None):
+        """Affiche une figure servie par le cache partagé (territoire, version, filtre, graphique, paramètres)"""
+        key = (
+            territory_code or st.session_state.selected_territory,
+            version,
+            None if territory_code else self.filters.key,
+            chart_id,
+            tuple(sorted((params or {}).items()))
+        )
+        with self.profiler.span(chart_id, 'graphique'):
+            spec = get_figure_cache().get_or_build(key, build_fig)
+            self.profiler.record_payload(len(spec))
+            st.plotly_chart(json.loads(spec), config={'displayModeBar': False})
+    
+    def display_export(self, vue, frame, nom, positions=None):
+        """Export de la vue courante, écrit bloc par bloc sans bloquer le rendu
+        
+        `positions` restreint l'export à ces lignes de `frame`, extraites seulement
+        pendant l'écriture : le rendu ne copie pas la vue filtrée.
+        """
+        exports = st.session_state.exports
+        with st.expander("⬇️ Exporter cette vue"):
+            col1, col2 = st.columns(2)
+            with col1:
+                format_export = st.selectbox("Format", list(FORMATS), key=f"export_format_{vue}")
+            with col2:
+                st.write("")
+                lignes = len(frame) if positions is None else len(positions)
+                if st.button(f"Exporter {lignes:,} lignes", key=f"export_{vue}"):
+                    if vue in exports:
+                        exports[vue].discard()
+                    exports[vue] = ExportJob(frame, format_export, nom, positions=positions).start()
+            
+            job = exports.get(vue)
+            if job is None:
+                return
+            
+            def suivi():
+                if not job.termine:
+                    st.progress(job.progression, text=f"Export {job.format} : {job.ecrites:,}/{job.total:,} lignes")
+                    return
+                if en_cours:
+                    st.rerun()
+                if job.erreur:
+                    st.error(f"Échec de l'export : {job.erreur}")
+                    return
+                st.download_button(
+                    f"Télécharger {job.nom_fichier} ({job.taille / 1024 / 1024:.1f} Mo)",
+                    job.read_bytes,
+                    file_name=job.nom_fichier,
+                    mime=job.mime,
+                    on_click='ignore',
+                    key=f"export_telecharger_{vue}"
+                )
+                st.caption(f"{job.total:,} lignes écrites en {job.duree:.1f} s")
+            
+            # Le suivi se réexécute seul tant que l'écriture est en cours
+            en_cours = not job.termine
+            st.fragment(suivi, run_every=1.0 if en_cours else None)()
+    
+    def get_rollups(self, territory_code):
+        """Agrégats pré-calculés de l'historique d'un territoire (période et catégories filtrées)"""
+        data = self.get_view_data(territory_code)
+        return get_rollups(territory_code, data['data_version'], data['historical_data'], filtre=data.get('filtre'))
+    
+    def update_live_data(self, territory_code):
+        """Met à jour les données en temps réel (lot de deltas appliqué au calque de la session)"""
+        if territory_code in get_territory_store():
+            engine = self.get_live_engine(territory_code)
+            # Lot tiré du flux 'manuel' à la version du calque : reproductible d'une session à l'autre
+            version = engine.version
+            engine.apply(*engine.random_batch(self.scenario.rng(territory_code, 'manuel', version)),
+                         origine=('manuel', version))
+    
+    def sync_live_feed(self, territory_code):
+        """Applique à la session les lots publiés par le planificateur depuis sa dernière lecture"""
+        scheduler = get_refresh_scheduler()
+        engine = self.get_live_engine(territory_code)
+        scheduler.watch(territory_code, len(engine.base))
+        scheduler.start()
+        
+        for version, lot in scheduler.batches_since(territory_code, engine.feed_version):
+            # Lot tiré avant un rechargement qui a changé les secteurs : sauté
+            if len(lot[0]) == len(engine.base):
+                engine.apply(*lot, origine=('direct', version))
+            engine.feed_version = version
+        return engine.version
+    
+    def display_live_metrics(self, auto_refresh):
+        """Métriques clés ; en rafraîchissement automatique, seul ce fragment est réexécuté"""
+        if not auto_refresh:
+            self.display_key_metrics()
+            return
+        
+        def live_metrics():
+            self.sync_live_feed(st.session_state.selected_territory)
+            self.display_key_metrics()
+        
+        st.fragment(live_metrics, run_every=get_refresh_scheduler().interval)()
+    
+    def display_territory_selector(self):
+        """Affiche le sélecteur de territoire optimisé"""
+        st.markdown('<div class="territory-selector">', unsafe_allow_html=True)
+        
+        col1, col2, col3 = st.columns([2, 1, 1])
+        
+        with col1:
+            territory_options = {v['nom_complet']: k for k, v in self.territories.items() if v['taux_octroi_actif']}
+            
+            # Utilisation de session_state pour éviter le rerun
+            current_name = self.territories[st.session_state.selected_territory]['nom_complet']
+            selected_territory_name = st.selectbox(
+                "🌍 SÉLECTIONNEZ UN TERRITOIRE:",
+                options=list(territory_options.keys()),
+                index=list(territory_options.keys()).index(current_name),
+                key="territory_selector_main"
+            )
+            
+            new_territory = territory_options[selected_territory_name]
+            if new_territory != st.session_state.selected_territory:
+                st.session_state.selected_territory = new_territory
+                # Précharger les données en arrière-plan
+                self.get_territory_data(new_territory)
+                st.success(f"✅ Changement vers {selected_territory_name} effectué!")
+        
+        with col2:
+            territory_info = self.territories[st.session_state.selected_territory]
+            st.metric("Type", territory_info['type'])
+        
+        with col3:
+            st.metric("Population", f"{territory_info['population']:,}")
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    def display_header(self):
+        """Affiche l'en-tête du dashboard"""
+        territory_info = self.territories[st.session_state.selected_territory]
+        
+        st.markdown(f'<h1 class="main-header">🏝️ Dashboard Octroi de Mer - {territory_info["nom_complet"]}</h1>', 
+                   unsafe_allow_html=True)
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            st.markdown('<div class="live-badge">🔴 DONNÉES FISCALES EN TEMPS RÉEL</div>', 
+                       unsafe_allow_html=True)
+            st.markdown(f"**Surveillance et analyse des recettes de l'Octroi de Mer par secteur économique**")
+        
+        # Bannière drapeau du territoire
+        st.markdown(f"""
+        <div class="territory-flag {territory_info['drapeau']}">
+            <strong>{territory_info['nom_complet']} - Octroi de Mer</strong><br>
+            <small>Type: {territory_info['type']} | Population: {territory_info['population']:,} | PIB: {territory_info['pib']} M€</small>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        current_time = datetime.now().strftime('%H:%M:%S')
+        st.sidebar.markdown(f"**🕐 Dernière mise à jour: {current_time}**")
+    
+    def display_key_metrics(self):
+        """Affiche les métriques clés de l'Octroi de Mer"""
+        data = self.get_territory_data(st.session_state.selected_territory)
+        current_data = data['current_data']
+        
+        st.markdown('<h3 class="section-header">📊 INDICATEURS CLÉS OCTROI DE MER</h3>', 
+                   unsafe_allow_html=True)
+        
+        # Métriques tenues à jour par le moteur en direct (sinon calculées sur l'instantané)
+        engine = self.get_live_engine(st.session_state.selected_territory, create=False)
+        if engine is not None:
+            metriques = engine.metrics()
+        else:
+            metriques = summarize_current(current_data)
+            metriques['variation_moyenne'] = metriques['variation_somme'] / metriques['secteurs']
+        revenu_total = metriques['revenu_total']
+        variation_moyenne = metriques['variation_moyenne']
+        volume_total = metriques['volume_total']
+        secteurs_hausse = metriques['secteurs_hausse']
+        nb_secteurs = metriques['secteurs']
+        
+        revenu_annuel_projete = revenu_total * 12
+        territory_info = self.territories[st.session_state.selected_territory]
+        revenu_par_habitant = revenu_total / territory_info['population'] * 1000
+        
+        # Écarts de comparaison simulés, tirés en un bloc du flux 'metriques' du territoire
+        rng = self.scenario.rng(st.session_state.selected_territory, 'metriques')
+        ecarts = rng.uniform([2, -5, -2, -1], [8, 5, 2, 3])
+        ecart_volume = int(rng.integers(-5, 10, endpoint=True))
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric(
+                "Revenu Mensuel Octroi de Mer",
+                f"{revenu_total/1e6:.1f} M€",
+                f"{variation_moyenne:+.2f}%",
+                delta_color="normal"
+            )
+        
+        with col2:
+            st.metric(
+                "Revenu Annuel Projeté",
+                f"{revenu_annuel_projete/1e6:.1f} M€",
+                f"{ecarts[0]:.1f}% vs année précédente"
+            )
+        
+        with col3:
+            st.metric(
+                "Secteurs en Croissance",
+                f"{secteurs_hausse}/{nb_secteurs}",
+                f"{secteurs_hausse - (nb_secteurs - secteurs_hausse):+d} vs décroissance"
+            )
+        
+        with col4:
+            volume_total_formatted = f"{volume_total/1000:.0f}K"
+            st.metric(
+                "Volume Total Importations",
+                volume_total_formatted,
+                f"{ecart_volume}% vs mois dernier"
+            )
+        
+        # Métriques spécifiques au territoire
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric(
+                "Revenu par Habitant",
+                f"{revenu_par_habitant:.1f} €",
+                f"{ecarts[1]:.1f}% vs moyenne DROM-COM"
+            )
+        
+        with col2:
+            st.metric(
+                "Taux d'Octroi Moyen",
+                f"{current_data['taux_normal'].mean():.1f}%",
+                f"{ecarts[2]:.1f}% vs période précédente"
+            )
+        
+        with col3:
+            st.metric(
+                "Contribution au PIB",
+                f"{(revenu_annuel_projete/territory_info['pib']/1e6)*100:.2f}%",
+                f"{ecarts[3]:.1f}% vs objectif"
+            )
+    
+    def create_octroi_overview(self):
+        """Crée la vue d'ensemble de l'Octroi de Mer"""
+        data = self.get_view_data(st.session_state.selected_territory)
+        
+        st.markdown('<h3 class="section-header">🏛️ VUE D\'ENSEMBLE OCTROI DE MER</h3>', 
+                   unsafe_allow_html=True)
+        
+        tab1, tab2, tab3, tab4 = st.tabs(["Évolution Revenus", "Répartition Secteurs", "Top Contribuables", "Analyse Taux"])
+        
+        with tab1:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Évolution des revenus totaux
+                def fig_evolution():
+                    evolution_totale = self.get_rollups(st.session_state.selected_territory)['total_par_date']
+                    fig = px.line(evolution_totale, 
+                                 x='date', 
+                                 y='revenu_mensuel_M',
+                                 title=f'Évolution des Revenus - {self.territories[st.session_state.selected_territory]["nom_complet"]}',
+                                 color_discrete_sequence=['#0055A4'])
+                    fig.update_layout(yaxis_title="Revenus (Millions €)")
+                    return fig
+                self._plotly_chart('overview_evolution', data['data_version'], fig_evolution)
+            
+            with col2:
+                # Performance par catégorie
+                def fig_performance():
+                    performance_categories = data['current_data'].groupby('categorie', observed=True).agg({
+                        'variation_pct': 'mean',
+                        'revenu_mensuel': 'sum'
+                    }).reset_index()
+                    fig = px.bar(performance_categories, 
+                                x='categorie', 
+                                y='variation_pct',
+                                title='Performance Mensuelle par Catégorie (%)',
+                                color='categorie',
+                                color_discrete_sequence=px.colors.qualitative.Set3)
+                    fig.update_layout(yaxis_title="Variation (%)")
+                    return fig
+                self._plotly_chart('overview_performance_categories', self._live_version(data), fig_performance)
+        
+        with tab2:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                self._plotly_chart('overview_repartition', self._live_version(data), lambda: px.pie(
+                    data['current_data'], 
+                    values='revenu_mensuel', 
+                    names='secteur',
+                    title='Répartition des Revenus par Secteur',
+                    color_discrete_sequence=px.colors.qualitative.Set3))
+            
+            with col2:
+                def fig_volumes():
+                    fig = px.bar(data['current_data'], 
+                                x='secteur', 
+                                y='volume_importation',
+                                title='Volume d\'Importation par Secteur',
+                                color_discrete_sequence=px.colors.qualitative.Set3)
+                    fig.update_layout(yaxis_title="Volume d'Importation")
+                    return fig
+                self._plotly_chart('overview_volumes', self._live_version(data), fig_volumes)
+        
+        with tab3:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                self._plotly_chart('overview_top_contributeurs', self._live_version(data), lambda: px.bar(
+                    data['current_data'].nlargest(10, 'revenu_mensuel'), 
+                    x='revenu_mensuel', 
+                    y='secteur',
+                    orientation='h',
+                    title='Top 10 des Secteurs Contribuant aux Revenus',
+                    color='revenu_mensuel',
+                    color_continuous_scale='Blues'))
+            
+            with col2:
+                self._plotly_chart('overview_top_croissance', self._live_version(data), lambda: px.bar(
+                    data['current_data'].nlargest(10, 'variation_pct'), 
+                    x='variation_pct', 
+                    y='secteur',
+                    orientation='h',
+                    title='Top 10 des Croissances Sectorielles (%)',
+                    color='variation_pct',
+                    color_continuous_scale='Greens'))
+        
+        with tab4:
+            st.subheader("Analyse des Taux d'Octroi de Mer")
+            
+            self._plotly_chart('overview_taux_volume', data['data_version'], lambda: px.scatter(
+                data['product_data'], 
+                x='taux_octroi', 
+                y='volume',
+                size='volume',
+                color='secteur',
+                title='Taux d\'Octroi vs Volume d\'Importation',
+                hover_name='produit',
+                size_max=40))
+            
+            st.dataframe(data['rate_index'].table_produits, 
+                        use_container_width=True)
+            self.display_export('produits', data['rate_index'].table_produits,
+                                f"octroi_{st.session_state.selected_territory.lower()}_produits")
+    
+    def create_secteurs_live(self):
+        """Affiche les secteurs en temps réel"""
+        data = self.get_view_data(st.session_state.selected_territory)
+        
+        st.markdown('<h3 class="section-header">🏢 SECTEURS ÉCONOMIQUES EN TEMPS RÉEL</h3>', 
+                   unsafe_allow_html=True)
+        
+        tab1, tab2, tab3 = st.tabs(["Tableau des Revenus", "Analyse Catégorie", "Simulateur"])
+        
+        with tab1:
+            self.display_revenue_table(data)
+        
+        with tab2:
+            categorie_selectionnee = st.selectbox("Sélectionnez une catégorie:", 
+                                                data['current_data']['categorie'].unique())
+            
+            if categorie_selectionnee:
+                secteurs_categorie = data['current_data'][
+                    data['current_data']['categorie'] == categorie_selectionnee
+                ]
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    self._plotly_chart('secteurs_performance', self._live_version(data), lambda: px.bar(
+                        secteurs_categorie, 
+                        x='secteur', 
+                        y='variation_pct',
+                        title=f'Performance des Secteurs - {categorie_selectionnee}',
+                        color='variation_pct',
+                        color_continuous_scale='RdYlGn'),
+                        params={'categorie': categorie_selectionnee})
+                
+                with col2:
+                    self._plotly_chart('secteurs_repartition', self._live_version(data), lambda: px.pie(
+                        secteurs_categorie, 
+                        values='revenu_mensuel', 
+                        names='secteur',
+                        title=f'Répartition des Revenus - {categorie_selectionnee}'),
+                        params={'categorie': categorie_selectionnee})
+        
+        with tab3:
+            st.subheader("Simulateur de Calcul d'Octroi de Mer")
+            
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                produit_selectionne = st.selectbox("Produit:", 
+                                                 data['product_data']['produit'].unique())
+                valeur_produit = st.number_input("Valeur du produit (€)", 
+                                               min_value=0.0, value=1000.0)
+            
+            with col2:
+                volume_import = st.number_input("Volume/Quantité", 
+                                              min_value=1, value=100)
+                type_taux = st.selectbox("Type de taux:", 
+                                       list(TYPES_TAUX))
+            
+            with col3:
+                pays_origine = st.selectbox("Pays d'origine:", 
+                                          list(COEFFICIENTS_ORIGINE))
+                calculer = st.button("Calculer l'Octroi de Mer")
+            
+            try:
+                produit_data = data['rate_index'].lookup(produit_selectionne) if calculer else None
+            except KeyError:
+                produit_data = None
+                st.error(f"Aucun taux de secteur pour {produit_selectionne} dans ce territoire.")
+            
+            if produit_data is not None:
+                taux_applique = produit_data[TYPES_TAUX[type_taux]]
+                coefficient = COEFFICIENTS_ORIGINE[pays_origine]
+                montant_octroi = valeur_produit * (taux_applique / 100) * coefficient
+                
+                st.success(f"""
+                **Résultat du calcul:**
+                - Produit: {produit_selectionne}
+                - Secteur: {produit_data['secteur']}
+                - Taux appliqué: {taux_applique}%
+                - Origine: {pays_origine} (coefficient {coefficient:g})
+                - Valeur imposable: {valeur_produit:,.2f}€
+                - **Montant Octroi de Mer: {montant_octroi:,.2f}€**
+                """)
+            
+            self.display_batch_calculator(data)
+    
+    def display_revenue_table(self, data):
+        """Tableau des revenus filtré, trié et paginé côté serveur
+        
+        Seule la page affichée est stylée et envoyée au navigateur, le coût de
+        rendu ne dépend donc pas du nombre de lignes.
+        """
+        current_data = data['current_data']
+        query_index = data['query_index']
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            categorie_filtre = st.selectbox("Catégorie:", ['Toutes'] + list(query_index.categories))
+        with col2:
+            performance_filtre = st.selectbox("Performance:", ['Tous'] + list(query_index.performances))
+        with col3:
+            tri_filtre = st.selectbox("Trier par:", list(COLONNES_TRI))
+        
+        # Filtres et tri : intersection d'un ordre précalculé et des masques
+        positions = query_index.query(
+            COLONNES_TRI[tri_filtre],
+            categorie=None if categorie_filtre == 'Toutes' else categorie_filtre,
+            performance=None if performance_filtre == 'Tous' else performance_filtre
+        )
+        
+        # Pagination
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            taille_page = st.selectbox("Lignes par page:", [25, 50, 100, 250], key="revenus_taille_page")
+        nb_pages = max(1, -(-len(positions) // taille_page))
+        with col2:
+            page = st.number_input("Page:", min_value=1, max_value=nb_pages, value=1, step=1,
+                                   key="revenus_page")
+        page = min(int(page), nb_pages)
+        debut = (page - 1) * taille_page
+        with col3:
+            st.caption(f"{len(positions)} secteur(s) — page {page}/{nb_pages}")
+        
+        page_data = current_data.iloc[positions[debut:debut + taille_page]][[
+            'secteur', 'categorie', 'nom_complet', 'taux_normal', 'taux_reduit',
+            'revenu_mensuel', 'variation_pct', 'variation_abs', 'volume_importation'
+        ]]
+        
+        self.display_export('secteurs', current_data,
+                            f"octroi_{st.session_state.selected_territory.lower()}_secteurs", positions=positions)
+        
+        st.dataframe(
+            page_data.style.map(_style_variation, subset=['variation_pct']),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'secteur': st.column_config.TextColumn("Secteur"),
+                'categorie': st.column_config.TextColumn("Catégorie"),
+                'nom_complet': st.column_config.TextColumn("Libellé", width="large"),
+                'taux_normal': st.column_config.NumberColumn("Taux normal", format="%.1f%%"),
+                'taux_reduit': st.column_config.NumberColumn("Taux réduit", format="%.1f%%"),
+                'revenu_mensuel': st.column_config.NumberColumn("Revenu mensuel (€)", format="%.0f"),
+                'variation_pct': st.column_config.NumberColumn("Variation", format="%+.2f%%"),
+                'variation_abs': st.column_config.NumberColumn("Variation (€)", format="%+.0f"),
+                'volume_importation': st.column_config.NumberColumn("Volume", format="%.0f")
+            }
+        )
+    
+    def display_batch_calculator(self, data):
+        """Calcul par lot d'un fichier de déclarations téléversé"""
+        st.markdown("#### 📄 Calcul par lot")
+        st.caption("CSV avec les colonnes `secteur` (ou `produit`), `valeur` et, facultativement, "
+                   "`type_taux` et `pays_origine`.")
+        fichier = st.file_uploader("Fichier de déclarations", type=['csv'], key="declarations_batch")
+        if fichier is None:
+            return
+        
+        declarations = pd.read_csv(fichier)
+        colonnes_manquantes = {'valeur'} - set(declarations.columns)
+        if not {'secteur', 'produit'} & set(declarations.columns):
+            colonnes_manquantes.add('secteur ou produit')
+        if colonnes_manquantes:
+            st.error(f"Colonnes manquantes : {', '.join(sorted(colonnes_manquantes))}")
+            return
+        
+        lignes, agregats = calculer_octroi_batch(declarations, data['rate_index'])
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Lignes calculées", f"{agregats['lignes'] - agregats['lignes_rejetees']:,}",
+                      f"{agregats['lignes_rejetees']:,} rejetées", delta_color="off")
+        with col2:
+            st.metric("Valeur imposable", f"{agregats['valeur_totale']:,.0f} €")
+        with col3:
+            st.metric("Montant Octroi de Mer", f"{agregats['montant_total']:,.0f} €")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.dataframe(agregats['par_secteur'], use_container_width=True)
+        with col2:
+            st.dataframe(agregats['par_origine'], use_container_width=True)
+        
+        st.dataframe(lignes.head(1000), use_container_width=True)
+        self.display_export('simulateur', lignes, "octroi_mer_calcul")
+    
+    def create_categorie_analysis(self):
+        """Analyse par catégorie détaillée"""
+        data = self.get_view_data(st.session_state.selected_territory)
+        
+        st.markdown('<h3 class="section-header">📊 ANALYSE PAR CATÉGORIE DÉTAILLÉE</h3>', 
+                   unsafe_allow_html=True)
+        
+        tab1, tab2, tab3 = st.tabs(["Performance Catégorielle", "Comparaison Catégories", "Tendances"])
+        
+        with tab1:
+            def categorie_performance():
+                return data['current_data'].groupby('categorie', observed=True).agg({
+                    'variation_pct': 'mean',
+                    'volume_importation': 'sum',
+                    'revenu_mensuel': 'sum',
+                    'secteur': 'count'
+                }).reset_index()
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                self._plotly_chart('categories_performance', self._live_version(data), lambda: px.bar(
+                    categorie_performance(), 
+                    x='categorie', 
+                    y='variation_pct',
+                    title='Performance Moyenne par Catégorie (%)',
+                    color='variation_pct',
+                    color_continuous_scale='RdYlGn'))
+            
+            with col2:
+                self._plotly_chart('categories_performance_revenus', self._live_version(data), lambda: px.scatter(
+                    categorie_performance(), 
+                    x='revenu_mensuel', 
+                    y='variation_pct',
+                    size='volume_importation',
+                    color='categorie',
+                    title='Performance vs Revenus par Catégorie',
+                    hover_name='categorie',
+                    size_max=60))
+        
+        with tab2:
+            def fig_evolution_categories():
+                categorie_evolution = self.get_rollups(st.session_state.selected_territory)['par_mois_categorie']
+                fig = px.line(categorie_evolution, 
+                             x='date', 
+                             y='revenu_octroi',
+                             color='categorie',
+                             title=f'Évolution Comparative - {self.territories[st.session_state.selected_territory]["nom_complet"]}',
+                             color_discrete_sequence=px.colors.qualitative.Set3)
+                fig.update_layout(yaxis_title="Revenus Octroi de Mer (€)")
+                return fig
+            self._plotly_chart('categories_evolution', data['data_version'], fig_evolution_categories)
+        
+        with tab3:
+            st.subheader("Tendances et Perspectives par Catégorie")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown("""
+                ### 📈 Catégories en Croissance
+                
+                **🏭 BTP & Construction:**
+                - Boom immobilier
+                - Projets d'infrastructure publique
+                - Reconstruction post-catastrophe
+                
+                **💊 Santé & Pharmaceutique:**
+                - Vieillissement de la population
+                - Investissements santé publique
+                - Innovations médicales
+                
+                **🛒 Biens de Consommation:**
+                - Croissance démographique
+                - Augmentation pouvoir d'achat
+                - Développement retail
+                """)
+            
+            with col2:
+                st.markdown("""
+                ### 📉 Catégories en Décroissance
+                
+                **⛽ Énergie Traditionnelle:**
+                - Transition vers énergies renouvelables
+                - Politiques environnementales
+                - Électrification transports
+                
+                **🚗 Automobile:**
+                - Saturation du marché
+                - Prix élevés des véhicules
+                - Alternative transports publics
+                
+                **🍷 Boissons Alcoolisées:**
+                - Campagnes santé publique
+                - Changement habitudes consommation
+                - Fiscalité accrue
+                """)
+    
+    def create_evolution_analysis(self):
+        """Analyse de l'évolution des revenus"""
+        data = self.get_view_data(st.session_state.selected_territory)
+        
+        st.markdown('<h3 class="section-header">📈 ÉVOLUTION DES REVENUS</h3>', 
+                   unsafe_allow_html=True)
+        
+        tab1, tab2, tab3 = st.tabs(["Analyse Historique", "Saisonnalité", "Projections"])
+        nom_territoire = self.territories[st.session_state.selected_territory]["nom_complet"]
+        
+        def rollups():
+            return self.get_rollups(st.session_state.selected_territory)
+        
+        with tab1:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                self._plotly_chart('evolution_cumul', data['data_version'], lambda: px.line(
+                    rollups()['total_mensuel'], 
+                    x='date_group', 
+                    y='cumulative_revenue',
+                    title=f'Revenus Cumulatifs - {nom_territoire} (€)'))
+            
+            with col2:
+                self._plotly_chart('evolution_heatmap', data['data_version'], lambda: px.imshow(
+                    rollups()['heatmap'],
+                    title=f'Revenus Mensuels par Année - {nom_territoire} (M€)',
+                    color_continuous_scale='Blues',
+                    aspect="auto"))
+            
+            self.display_export('historique', data['historical_data'],
+                                f"octroi_{st.session_state.selected_territory.lower()}_historique")
+        
+        with tab2:
+            def fig_saisonnalite():
+                fig = px.line(rollups()['saisonnalite'], 
+                             x='mois', 
+                             y='revenu_M',
+                             title=f'Saisonnalité des Revenus - {nom_territoire}',
+                             markers=True)
+                fig.update_layout(xaxis_title="Mois", yaxis_title="Revenus Moyens (Millions €)")
+                fig.update_xaxes(tickvals=list(range(1, 13)), 
+                               ticktext=['Jan', 'Fév', 'Mar', 'Avr', 'Mai', 'Jun', 
+                                       'Jul', 'Aoû', 'Sep', 'Oct', 'Nov', 'Dec'])
+                return fig
+            self._plotly_chart('evolution_saisonnalite', data['data_version'], fig_saisonnalite)
+        
+        with tab3:
+            st.subheader("Projections des Revenus")
+            
+            # Modèles ajustés sur tout l'historique des catégories retenues : la période
+            # de la barre latérale ne restreint que l'historique affiché
+            categories = self.filters.categories
+            forecasts = get_forecasts(st.session_state.selected_territory, data['data_version'],
+                                      data['partitions'].select(categories=categories), filtre=categories)
+            serie = st.selectbox("Série", forecasts['historique'].columns, key="projection_serie")
+            
+            def fig_projections():
+                fig = px.line(forecast_frame(forecasts, serie, filtre=self.filters), 
+                             x='date', 
+                             y='valeur',
+                             color='type',
+                             title=f'Projection des Revenus - {nom_territoire} - {serie} - 12 Mois',
+                             color_discrete_sequence=['#0055A4', '#F4A6A6', '#F4A6A6', '#EF4135'])
+                fig.update_traces(line_dash='dot', selector={'name': 'Borne basse (95%)'})
+                fig.update_traces(line_dash='dot', fill='tonexty', fillcolor='rgba(239, 65, 53, 0.12)',
+                                  selector={'name': 'Borne haute (95%)'})
+                fig.update_layout(yaxis_title="Revenus (€)")
+                return fig
+            self._plotly_chart('evolution_projections', data['data_version'], fig_projections,
+                               params={'serie': serie})
+            
+            prevision = forecasts['prevision'][serie]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Revenus prévus (12 mois)", f"{prevision.sum() / 1e6:,.1f} M€")
+            with col2:
+                cumul = forecasts['cumul'].loc[serie]
+                st.metric("Intervalle à 95% du cumul (12 mois)",
+                          f"{cumul['bas'] / 1e6:,.1f} – {cumul['haut'] / 1e6:,.1f} M€")
+            with col3:
+                derniers_12_mois = forecasts['historique'][serie].iloc[-12:].sum()
+                st.metric("Évolution vs 12 derniers mois",
+                          f"{(prevision.sum() / derniers_12_mois - 1) * 100 if derniers_12_mois else 0:+.1f}%")
+            st.caption("Décomposition saisonnière et lissage de Holt, ajustés sur l'historique mensuel "
+                       "de chaque série ; bornes de l'intervalle de prévision à 95%. L'intervalle du cumul "
+                       "tient compte de la propagation des erreurs d'un mois à l'autre.")
+    
+    def create_anomaly_analysis(self):
+        """Secteurs dont les revenus ou les volumes rompent avec leur profil saisonnier"""
+        territory_code = st.session_state.selected_territory
+        data = self.get_view_data(territory_code)
+        # Les scores portent sur tout l'historique ; le filtre ne restreint que l'affichage
+        detecteur = get_anomaly_engine().detector(territory_code, data['data_version'], data['partitions'].data)
+        secteurs = data['current_data']['secteur'].astype(str)
+        
+        st.markdown('<h3 class="section-header">🚨 DÉTECTION D\'ANOMALIES</h3>', 
+                   unsafe_allow_html=True)
+        st.caption("Chaque mois est désaisonnalisé puis comparé aux 12 mois précédents : "
+                   "score robuste = 0,6745 × (valeur − médiane) / écart absolu médian.")
+        
+        seuil = st.slider("Seuil de signalement (|score|)", 2.0, 8.0, SEUIL_ANOMALIE, 0.5, key="anomalies_seuil")
+        libelles = {'revenu_octroi': 'Revenus', 'volume_importation': 'Volumes'}
+        
+        tab1, tab2, tab3 = st.tabs(["Instantané en Direct", "Historique", "Carte des Scores"])
+        
+        with tab1:
+            courant = score_current(detecteur, data['current_data'])
+            courant = courant[courant['secteur'].isin(secteurs)]
+            scores = courant[[f'{metrique}_score' for metrique in METRIQUES]]
+            signales = courant[(scores.abs() >= seuil).any(axis=1)]
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Secteurs signalés", f"{len(signales)}/{len(courant)}")
+            with col2:
+                st.metric("Score max. revenus", f"{courant['revenu_octroi_score'].abs().max():.1f}")
+            with col3:
+                st.metric("Score max. volumes", f"{courant['volume_importation_score'].abs().max():.1f}")
+            
+            st.dataframe(
+                courant.style.map(lambda score: _style_variation(-1 if abs(score) >= seuil else 0),
+                                  subset=list(scores.columns)),
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    'secteur': st.column_config.TextColumn("Secteur"),
+                    'revenu_octroi_valeur': st.column_config.NumberColumn("Revenu (€)", format="%.0f"),
+                    'revenu_octroi_attendu': st.column_config.NumberColumn("Revenu attendu (€)", format="%.0f"),
+                    'revenu_octroi_score': st.column_config.NumberColumn("Score revenu", format="%+.2f"),
+                    'volume_importation_valeur': st.column_config.NumberColumn("Volume", format="%.0f"),
+                    'volume_importation_attendu': st.column_config.NumberColumn("Volume attendu", format="%.0f"),
+                    'volume_importation_score': st.column_config.NumberColumn("Score volume", format="%+.2f")
+                }
+            )
+        
+        with tab2:
+            anomalies = detecteur.flagged(seuil)
+            anomalies = anomalies[anomalies['secteur'].isin(secteurs)
+                                  & self.filters.month_mask(anomalies['mois'].dt.to_period('M'))]
+            st.caption(f"{len(anomalies)} point(s) signalé(s) sur {detecteur.scores.size} "
+                       f"({len(detecteur.mois)} mois × {len(detecteur.series)} séries)")
+            st.dataframe(
+                anomalies.assign(metrique=anomalies['metrique'].map(libelles)),
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    'mois': st.column_config.DateColumn("Mois", format="MM/YYYY"),
+                    'secteur': st.column_config.TextColumn("Secteur"),
+                    'metrique': st.column_config.TextColumn("Métrique"),
+                    'valeur': st.column_config.NumberColumn("Valeur", format="%.0f"),
+                    'attendu': st.column_config.NumberColumn("Attendu", format="%.0f"),
+                    'score': st.column_config.NumberColumn("Score", format="%+.2f")
+                }
+            )
+        
+        with tab3:
+            metrique = st.radio("Métrique", list(METRIQUES), format_func=libelles.get, horizontal=True,
+                                key="anomalies_metrique")
+            def scores():
+                table = detecteur.score_table(metrique)
+                return table.loc[table.index.isin(secteurs), self.filters.month_mask(detecteur.mois)]
+            self._plotly_chart('anomalies_scores', (data['data_version'], len(detecteur.mois)), lambda: px.imshow(
+                scores(),
+                title=f'Scores d\'anomalie - {libelles[metrique]} - {self.territories[territory_code]["nom_complet"]}',
+                color_continuous_scale='RdBu_r',
+                color_continuous_midpoint=0,
+                aspect="auto"), params={'metrique': metrique})
+    
+    def create_territory_comparison(self):
+        """Crée une vue de comparaison entre territoires"""
+        version, comparison_data = get_comparison_engine().refresh(get_territory_store(), self.data_source)
+        
+        def chart(chart_id, build_fig, params=None):
+            self._plotly_chart(chart_id, version, build_fig, params=params, territory_code='DROM-COM')
+        
+        st.markdown('<h3 class="section-header">🌍 COMPARAISON INTER-TERRITOIRES</h3>', 
+                   unsafe_allow_html=True)
+        
+        tab1, tab2, tab3 = st.tabs(["Vue d'Ensemble", "Performance", "Analyse Détaillée"])
+        
+        with tab1:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                def fig_revenus():
+                    fig = px.bar(comparison_data, 
+                                x='nom_complet', 
+                                y='revenu_octroi_total',
+                                title='Revenus Totaux par Territoire',
+                                color='type',
+                                color_discrete_map={'DROM': '#0055A4', 'COM': '#EF4135'})
+                    fig.update_layout(yaxis_title="Revenus (€)")
+                    return fig
+                chart('comparaison_revenus', fig_revenus)
+            
+            with col2:
+                def fig_revenus_habitant():
+                    fig = px.bar(comparison_data, 
+                                x='nom_complet', 
+                                y='revenu_par_habitant',
+                                title='Revenus par Habitant',
+                                color='type',
+                                color_discrete_map={'DROM': '#0055A4', 'COM': '#EF4135'})
+                    fig.update_layout(yaxis_title="Revenus par Habitant (€)")
+                    return fig
+                chart('comparaison_revenus_habitant', fig_revenus_habitant)
+        
+        with tab2:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                def fig_revenus_pib():
+                    fig = px.scatter(comparison_data, 
+                                   x='pib', 
+                                   y='revenu_octroi_total',
+                                   size='population',
+                                   color='type',
+                                   title='Revenus Octroi de Mer vs PIB',
+                                   hover_name='nom_complet',
+                                   color_discrete_map={'DROM': '#0055A4', 'COM': '#EF4135'},
+                                   size_max=60)
+                    fig.update_layout(xaxis_title="PIB (M€)", yaxis_title="Revenus Octroi de Mer (€)")
+                    return fig
+                chart('comparaison_revenus_pib', fig_revenus_pib)
+            
+            with col2:
+                def fig_population():
+                    fig = px.scatter(comparison_data, 
+                                   x='population', 
+                                   y='revenu_par_habitant',
+                                   size='superficie',
+                                   color='type',
+                                   title='Population vs Revenus par Habitant',
+                                   hover_name='nom_complet',
+                                   color_discrete_map={'DROM': '#0055A4', 'COM': '#EF4135'},
+                                   size_max=60)
+                    fig.update_layout(xaxis_title="Population", yaxis_title="Revenus par Habitant (€)")
+                    return fig
+                chart('comparaison_population', fig_population)
+        
+        with tab3:
+            st.subheader("Tableau Comparatif Détaillé")
+            
+            territoires_a_comparer = st.multiselect(
+                "Sélectionnez les territoires à comparer:",
+                options=comparison_data['nom_complet'].tolist(),
+                default=comparison_data['nom_complet'].tolist()[:5]
+            )
+            
+            if territoires_a_comparer:
+                donnees_filtrees = comparison_data[
+                    comparison_data['nom_complet'].isin(territoires_a_comparer)
+                ]
+                
+                # Create the display dataframe with renamed columns
+                display_df = donnees_filtrees[
+                    ['nom_complet', 'type', 'population', 'superficie', 'pib', 
+                     'revenu_octroi_total', 'revenu_par_habitant', 'densite', 
+                     'pib_par_habitant', 'contribution_octroi_pib']
+                ].rename(columns={
+                    'nom_complet': 'Territoire',
+                    'type': 'Type',
+                    'population': 'Population',
+                    'superficie': 'Superficie (km²)',
+                    'pib': 'PIB (M€)',
+                    'revenu_octroi_total': 'Revenu Mensuel (€)',
+                    'revenu_par_habitant': 'Revenu/Habitant (€)',
+                    'densite': 'Densité (hab/km²)',
+                    'pib_par_habitant': 'PIB/Habitant (€)',
+                    'contribution_octroi_pib': 'Contribution Octroi/PIB (%)'
+                })
+                
+                # Sort by the renamed column
+                display_df = display_df.sort_values('Revenu Mensuel (€)', ascending=False)
+                
+                st.dataframe(display_df, use_container_width=True)
+                self.display_export('comparaison', display_df, "octroi_comparaison_territoires")
+                
+                col1, col2 = st.columns(2)
+                selection = {'territoires': tuple(territoires_a_comparer)}
+                
+                with col1:
+                    def fig_contribution():
+                        fig = px.bar(donnees_filtrees, 
+                                    x='nom_complet', 
+                                    y='contribution_octroi_pib',
+                                    title='Contribution Octroi de Mer au PIB (%)',
+                                    color='type',
+                                    color_discrete_map={'DROM': '#0055A4', 'COM': '#EF4135'})
+                        fig.update_layout(yaxis_title="Contribution au PIB (%)")
+                        return fig
+                    chart('comparaison_contribution_pib', fig_contribution, params=selection)
+                
+                with col2:
+                    def fig_pib_habitant():
+                        fig = px.bar(donnees_filtrees, 
+                                    x='nom_complet', 
+                                    y='pib_par_habitant',
+                                    title='PIB par Habitant (€)',
+                                    color='type',
+                                    color_discrete_map={'DROM': '#0055A4', 'COM': '#EF4135'})
+                        fig.update_layout(yaxis_title="PIB par Habitant (€)")
+                        return fig
+                    chart('comparaison_pib_habitant', fig_pib_habitant, params=selection)
+    
+    def display_technical_details(self):
+        """Détails techniques de la sidebar : profil de rendu, préchauffage et mémoire du magasin partagé"""
+        with st.expander("🔧 Détails techniques", expanded=True):
+            self.display_render_profile()
+            st.markdown(f"**Scénario :** {self.scenario.nom} (graine {self.scenario.seed}, clé `{self.scenario.key}`)")
+            
+            rapport = self.warm_up
+            if not rapport or not rapport['actif']:
+                st.markdown("**Préchauffage :** désactivé")
+            elif not rapport['termine']:
+                st.markdown("**Préchauffage :** en cours…")
+            elif rapport['erreur']:
+                st.error(f"Préchauffage interrompu : {rapport['erreur']}")
+            else:
+                st.markdown(f"**Préchauffage :** {len(rapport['durees'])} territoires "
+                            f"en {rapport['duree_totale']:.2f} s")
+                durees = pd.DataFrame(
+                    [(self.territories[code]['nom_complet'], duree * 1000) for code, duree in rapport['durees'].items()],
+                    columns=['Territoire', 'Chargement (ms)']
+                ).sort_values('Chargement (ms)', ascending=False)
+                st.dataframe(durees, hide_index=True, use_container_width=True)
+                for code, erreur in rapport['erreurs'].items():
+                    st.warning(f"{self.territories[code]['nom_complet']} non préchargé : {erreur}")
+            
+            store = get_territory_store()
+            memoire = []
+            for code, info in self.territories.items():
+                if code not in store:
+                    continue
+                entry = store.get(code, self._load_territory)
+                rapport_memoire = get_memory_report(code, entry['data_version'], entry['historical_data'])
+                memoire.append((info['nom_complet'], rapport_memoire['avant'] / 1e6, rapport_memoire['apres'] / 1e6))
+            if memoire:
+                memoire = pd.DataFrame(memoire, columns=['Territoire', 'Avant (Mo)', 'Après (Mo)'])
+                memoire['Gain (%)'] = (1 - memoire['Après (Mo)'] / memoire['Avant (Mo)']) * 100
+                st.markdown("**Historique en mémoire (schéma compact) :**")
+                st.dataframe(memoire, hide_index=True, use_container_width=True)
+    
+    def display_render_profile(self):
+        """Profil de rendu de l'exécution courante et export de la trace JSON"""
+        profil = self.profiler.table()
+        if not profil:
+            return
+        sections = [ligne for ligne in profil if ligne['Type'] == 'section']
+        st.markdown(f"**Rendu :** {sum(ligne['Durée (ms)'] for ligne in sections):.0f} ms, "
+                    f"{sum(ligne['Éléments'] for ligne in sections)} éléments, "
+                    f"{self.profiler.payload / 1024:.0f} Ko de figures")
+        st.dataframe(
+            pd.DataFrame(profil), hide_index=True, use_container_width=True,
+            column_config={
+                'Durée (ms)': st.column_config.NumberColumn(format="%.1f"),
+                'pandas (ms)': st.column_config.NumberColumn(format="%.1f"),
+                'Figures (Ko)': st.column_config.NumberColumn(format="%.1f")
+            }
+        )
+        st.download_button(
+            "⬇️ Trace JSON (Chrome/Perfetto)",
+            json.dumps(self.profiler.to_chrome_trace()),
+            file_name="profil_rendu.json",
+            mime="application/json"
+        )
+    
+    def create_sidebar(self):
+        """Crée la sidebar avec les contrôles"""
+        st.sidebar.markdown("## 🎛️ CONTRÔLES D'ANALYSE")
+        
+        data = self.get_territory_data(st.session_state.selected_territory)
+        partitions = data['partitions']
+        premiere_date = partitions.premier_mois.start_time.date()
+        derniere_date = max(partitions.dernier_mois.end_time.date(), datetime.now().date())
+        
+        st.sidebar.markdown("### 📅 Période d'analyse")
+        date_debut = st.sidebar.date_input("Date de début", 
+                                         value=premiere_date,
+                                         min_value=premiere_date,
+                                         max_value=derniere_date)
+        date_fin = st.sidebar.date_input("Date de fin", 
+                                       value=derniere_date,
+                                       min_value=premiere_date,
+                                       max_value=derniere_date)
+        
+        st.sidebar.markdown("### 🏢 Sélection des catégories")
+        categories_selectionnees = st.sidebar.multiselect(
+            "Catégories à afficher:",
+            partitions.categories,
+            default=partitions.categories
+        )
+        if not categories_selectionnees:
+            st.sidebar.caption("Aucune catégorie sélectionnée : toutes sont affichées.")
+        
+        # Filtres appliqués par la couche de données à toutes les sections du territoire
+        self.filters = HistoryFilter.from_controls(partitions, date_debut, date_fin,
+                                                   categories_selectionnees or partitions.categories)
+        
+        st.sidebar.markdown("### ⚙️ Options")
+        auto_refresh = st.sidebar.checkbox("Rafraîchissement automatique", value=False)
+        show_details = st.sidebar.checkbox("Afficher détails techniques", value=False, key="show_details")
+        comparison_mode = st.sidebar.checkbox("Mode comparaison", value=False)
+        lazy_navigation = st.sidebar.checkbox("Navigation paresseuse", value=True,
+                                              help="Seule la section affichée est calculée")
+        
+        if st.sidebar.button("🔄 Rafraîchir les données"):
+            self.update_live_data(st.session_state.selected_territory)
+            st.success("Données mises à jour!")
+        
+        if show_details:
+            # Rempli en fin d'exécution, une fois le profil de rendu complet
+            self.details_container = st.sidebar.container()
+        
+        st.sidebar.markdown("---")
+        st.sidebar.markdown("### 💹 INDICATEURS ÉCONOMIQUES")
+        
+        # Indicateur → (valeur centrale, écart, bornes de la variation), tirés du flux 'indicateurs'
+        references = {
+            'Inflation': (2.8, 0.2, -0.1, 0.1),
+            'Croissance PIB': (3.2, 0.3, -0.2, 0.2),
+            'Taux Chômage': (18.5, 0.5, -0.3, 0.1),
+            'Importations Total': (4.8, 0.2, -1, 2)
+        }
+        centre, ecart, bas, haut = np.array(list(references.values()), dtype=float).T
+        rng = self.scenario.rng('DROM-COM', 'indicateurs')
+        valeurs, variations = rng.uniform(centre - ecart, centre + ecart), rng.uniform(bas, haut)
+        indicateurs = {
+            indicateur: {'valeur': valeur, 'variation': variation}
+            for indicateur, valeur, variation in zip(references, valeurs, variations)
+        }
+        
+        for indicateur, data in indicateurs.items():
+            st.sidebar.metric(
+                indicateur,
+                f"{data['valeur']:.1f}%",
+                f"{data['variation']:+.1f}%"
+            )
+        
+        return {
+            'date_debut': date_debut,
+            'date_fin': date_fin,
+            'categories_selectionnees': categories_selectionnees,
+            'auto_refresh': auto_refresh,
+            'show_details': show_details,
+            'comparison_mode': comparison_mode,
+            'lazy_navigation': lazy_navigation
+        }
+    
+    def display_insights(self, comparison_mode):
+        """Onglet des insights stratégiques"""
+        if comparison_mode:
+            st.markdown("## 💡 INSIGHTS STRATÉGIQUES")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown("""
+                ### 🎯 TENDANCES FISCALES INTER-TERRITOIRES
+                
+                **📈 Dynamiques Sectorielles:**
+                - Forte croissance BTP et construction (tous territoires)
+                - Spécialisations selon territoires (tourisme, mines, etc.)
+                - Déclin progressif énergies fossiles
+                
+                **🏝️ Facteurs Spécifiques:**
+                - Taille et densité de population
+                - Spécialisations économiques
+                - Proximité géographique
+                
+                **💰 Impact Économique:**
+                - Financement services publics
+                - Soutien à l'économie locale
+                - Redistribution territoriale
+                """)
+            
+            with col2:
+                st.markdown("""
+                ### 🚨 DÉFIS ET OPPORTUNITÉS
+                
+                **⚡ Défis à Relever:**
+                - Évolution réglementaire européenne
+                - Contrôles douaniers renforcés
+                - Fraude et optimisation fiscale
+                
+                **💡 Opportunités:**
+                - Digitalisation des procédures
+                - Élargissement assiette fiscale
+                - Cooperation régionale
+                
+                **🔮 Perspectives:**
+                - Croissance modérée des revenus
+                - Diversification des sources
+                - Modernisation continue
+                """)
+            
+            st.markdown("""
+            ### 📋 RECOMMANDATIONS OPÉRATIONNELLES
+            
+            1. **Optimisation Contrôle:** Renforcer les contrôles sur les secteurs à forts enjeux
+            2. **Digitalisation:** Accélérer la dématérialisation des déclarations
+            3. **Formation:** Former les agents aux nouvelles réglementations
+            4. **Communication:** Améliorer l'information des contribuables
+            5. **Innovation:** Développer de nouveaux outils d'analyse de données
+            6. **Harmonisation:** Standardiser les procédures entre territoires
+            7. **Spécialisation:** Adapter les contrôles aux spécificités territoriales
+            """)
+        else:
+            st.markdown("## 💡 INSIGHTS STRATÉGIQUES")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown(f"""
+                ### 🎯 TENDANCES FISCALES - {self.territories[st.session_state.selected_territory]['nom_complet']}
+                
+                **📈 Dynamiques Sectorielles:**
+                - Forte croissance BTP et construction
+                - Stabilité secteur agroalimentaire
+                - Déclin progressif énergies fossiles
+                
+                **🏝️ Facteurs Locaux:**
+                - Croissance démographique soutenue
+                - Développement infrastructures
+                - Tourisme en augmentation
+                """)
+            
+            with col2:
+                st.markdown("""
+                ### 🚨 DÉFIS ET OPPORTUNITÉS
+                
+                **⚡ Défis à Relever:**
+                - Évolution réglementaire européenne
+                - Contrôles douaniers renforcés
+                - Fraude et optimisation fiscale
+                
+                **💡 Opportunités:**
+                - Digitalisation des procédures
+                - Élargissement assiette fiscale
+                - Cooperation régionale
+                """)
+            
+            st.markdown("""
+            ### 📋 RECOMMANDATIONS OPÉRATIONNELLES
+            
+            1. **Optimisation Contrôle:** Renforcer les contrôles sur les secteurs à forts enjeux
+            2. **Digitalisation:** Accélérer la dématérialisation des déclarations
+            3. **Formation:** Former les agents aux nouvelles réglementations
+            4. **Communication:** Améliorer l'information des contribuables
+            5. **Innovation:** Développer de nouveaux outils d'analyse de données
+            """)
+    
+    def display_about(self, comparison_mode):
+        """Onglet « À propos »"""
+        if comparison_mode:
+            st.markdown("## 📋 À propos de ce dashboard")
+            st.markdown(f"""
+            Ce dashboard présente une analyse en temps réel des recettes de l'Octroi de Mer 
+            pour l'ensemble des DROM-COM.
+            
+            **Territoire actuel:** {self.territories[st.session_state.selected_territory]['nom_complet']}
+            
+            **Couverture:**
+            - {len([t for t in self.territories.values() if t['taux_octroi_actif']])} territoires avec Octroi de Mer actif
+            - 10+ secteurs économiques principaux par territoire
+            - Données historiques depuis 2022
+            - Analyse par catégorie et produit
+            
+            **⚡ Performance:**
+            - Cache intelligent pour un chargement rapide
+            - Mises à jour en temps réel optimisées
+            - Navigation fluide entre territoires
+            
+            **⚠️ Avertissement:** 
+            Ce dashboard est un outil d'aide à la décision.
+            Les données peuvent être sujettes à révision.
+            """)
+            
+            st.markdown("---")
+            st.markdown("""
+            **📞 Contact:**
+            - Direction Générale des Douanes et Droits Indirects
+            - Site web: www.douane.gouv.fr
+            - Email: contact@douane.finances.gouv.fr
+            """)
+        else:
+            st.markdown("## 📋 À propos de ce dashboard")
+            st.markdown(f"""
+            Ce dashboard présente une analyse en temps réel des recettes de l'Octroi de Mer 
+            à {self.territories[st.session_state.selected_territory]['nom_complet']}.
+            
+            **Couverture:**
+            - {len(self.get_territory_data(st.session_state.selected_territory)['secteurs'])} secteurs économiques principaux
+            - Données historiques depuis 2022
+            - Analyse par catégorie et produit
+            
+            **⚡ Performance:**
+            - Cache intelligent pour un chargement rapide
+            - Mises à jour en temps réel optimisées
+            
+            **⚠️ Avertissement:** 
+            Ce dashboard est un outil d'aide à la décision.
+            Les données peuvent être sujettes à révision.
+            """)
+            
+            st.markdown("---")
+            st.markdown("""
+            **📞 Contact:**
+            - Direction Générale des Douanes et Droits Indirects
+            - Site web: www.douane.gouv.fr
+            - Email: contact@douane.finances.gouv.fr
+            """)
+    
+    def get_sections(self, comparison_mode):
+        """Sections de navigation : (libellé, fonction de rendu)"""
+        sections = [
+            ("📈 Vue d'Ensemble", self.create_octroi_overview),
+            ("🏢 Secteurs", self.create_secteurs_live),
+            ("📊 Catégories", self.create_categorie_analysis),
+            ("📈 Évolution", self.create_evolution_analysis),
+            ("🚨 Anomalies", self.create_anomaly_analysis),
+            ("💡 Insights", lambda: self.display_insights(comparison_mode)),
+            ("ℹ️ À Propos", lambda: self.display_about(comparison_mode))
+        ]
+        if comparison_mode:
+            sections.insert(0, ("🌍 Comparaison Territoires", self.create_territory_comparison))
+        return sections
+    
+    def render_section(self, label, builder):
+        """Exécute une section et retourne sa durée de rendu (le détail va au profil de rendu)"""
+        debut = time.perf_counter()
+        with self.profiler.span(label, 'section'):
+            builder()
+        return time.perf_counter() - debut
+    
+    def display_sections(self, controls):
+        """Navigation entre sections : paresseuse (seule la section active s'exécute) ou par onglets"""
+        sections = self.get_sections(controls['comparison_mode'])
+        
+        if controls['lazy_navigation']:
+            labels = [label for label, _ in sections]
+            section_active = st.radio("Section", labels, horizontal=True,
+                                      key="section_active", label_visibility="collapsed")
+            duree = self.render_section(section_active, dict(sections)[section_active])
+            st.caption(f"⏱️ Section rendue en {duree * 1000:.0f} ms")
+        else:
+            for tab, (label, builder) in zip(st.tabs([label for label, _ in sections]), sections):
+                with tab:
+                    self.render_section(label, builder)
+    
+    def run_dashboard(self):
+        """Exécute le dashboard complet"""
+        # Profil de rendu uniquement si les détails techniques sont affichés
+        self.profiler = RenderProfiler(active=st.session_state.get('show_details', False)).start()
+        span = self.profiler.span
+        try:
+            # Préchargement des données du territoire sélectionné
+            with span('Préchargement', 'section'):
+                self.get_territory_data(st.session_state.selected_territory)
+            
+            # Affichage du sélecteur de territoire
+            with span('Sélecteur de territoire', 'section'):
+                self.display_territory_selector()
+            
+            # Territoire sans historique (aucun extrait chargé) : rien à analyser
+            territory_code = st.session_state.selected_territory
+            if not len(self.get_territory_data(territory_code)['historical_data']):
+                st.info(f"Aucune donnée disponible pour {self.territories[territory_code]['nom_complet']}.")
+                return
+            
+            # Sidebar
+            with span('Sidebar', 'section'):
+                controls = self.create_sidebar()
+            
+            # Header
+            with span('En-tête', 'section'):
+                self.display_header()
+            
+            # Métriques clés
+            with span('Métriques clés', 'section'):
+                self.display_live_metrics(controls['auto_refresh'])
+            
+            # Navigation entre sections
+            self.display_sections(controls)
+        finally:
+            self.profiler.stop()
+        
+        if self.details_container is not None:
+            with self.details_container:
+                self.display_technical_details()
+
+def main():
+    """Point d'entrée : une exécution du script Streamlit"""
+    debut = time.perf_counter()
+    configure_page()
+    init_session_state()
+    start_metrics_exporter()
+    try:
+        dashboard = OctroiMerDashboard()
+        dashboard.run_dashboard()
+    finally:
+        get_metrics().observe('octroi_rerun_duration_seconds', time.perf_counter() - debut)
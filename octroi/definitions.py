@@ -0,0 +1,322 @@
+"""Définitions des territoires et de leurs secteurs économiques"""
+from .metrics import instrumented_cache_data
+
+# Fonctions globales avec cache pour éviter les problèmes de hashage
+@instrumented_cache_data(ttl=3600)
+def get_territories_definitions():
+    """Définit les territoires DROM-COM"""
+    return {
+        'REUNION': {
+            'nom_complet': 'La Réunion',
+            'type': 'DROM',
+            'population': 860000,
+            'superficie': 2511,
+            'pib': 19.8,
+            'drapeau': 'reunion-flag',
+            'monnaie': 'EUR',
+            'taux_octroi_actif': True
+        },
+        'GUADELOUPE': {
+            'nom_complet': 'Guadeloupe',
+            'type': 'DROM',
+            'population': 384000,
+            'superficie': 1628,
+            'pib': 9.1,
+            'drapeau': 'guadeloupe-flag',
+            'monnaie': 'EUR',
+            'taux_octroi_actif': True
+        },
+        'MARTINIQUE': {
+            'nom_complet': 'Martinique',
+            'type': 'DROM',
+            'population': 376000,
+            'superficie': 1128,
+            'pib': 8.9,
+            'drapeau': 'martinique-flag',
+            'monnaie': 'EUR',
+            'taux_octroi_actif': True
+        },
+        'GUYANE': {
+            'nom_complet': 'Guyane',
+            'type': 'DROM',
+            'population': 290000,
+            'superficie': 83534,
+            'pib': 4.8,
+            'drapeau': 'guyane-flag',
+            'monnaie': 'EUR',
+            'taux_octroi_actif': True
+        },
+        'MAYOTTE': {
+            'nom_complet': 'Mayotte',
+            'type': 'DROM',
+            'population': 270000,
+            'superficie': 374,
+            'pib': 2.4,
+            'drapeau': 'mayotte-flag',
+            'monnaie': 'EUR',
+            'taux_octroi_actif': True
+        },
+        'STPIERRE': {
+            'nom_complet': 'Saint-Pierre-et-Miquelon',
+            'type': 'COM',
+            'population': 6000,
+            'superficie': 242,
+            'pib': 0.2,
+            'drapeau': 'spierre-flag',
+            'monnaie': 'EUR',
+            'taux_octroi_actif': True
+        },
+        'STBARTH': {
+            'nom_complet': 'Saint-Barthélemy',
+            'type': 'COM',
+            'population': 10000,
+            'superficie': 21,
+            'pib': 0.6,
+            'drapeau': 'stbarth-flag',
+            'monnaie': 'EUR',
+            'taux_octroi_actif': False
+        },
+        'STMARTIN': {
+            'nom_complet': 'Saint-Martin',
+            'type': 'COM',
+            'population': 32000,
+            'superficie': 54,
+            'pib': 0.9,
+            'drapeau': 'stmartin-flag',
+            'monnaie': 'EUR',
+            'taux_octroi_actif': False
+        },
+        'WALLIS': {
+            'nom_complet': 'Wallis-et-Futuna',
+            'type': 'COM',
+            'population': 11500,
+            'superficie': 142,
+            'pib': 0.2,
+            'drapeau': 'wallis-flag',
+            'monnaie': 'XPF',
+            'taux_octroi_actif': True
+        },
+        'POLYNESIE': {
+            'nom_complet': 'Polynésie française',
+            'type': 'COM',
+            'population': 280000,
+            'superficie': 4167,
+            'pib': 7.2,
+            'drapeau': 'polynesie-flag',
+            'monnaie': 'XPF',
+            'taux_octroi_actif': True
+        },
+        'CALEDONIE': {
+            'nom_complet': 'Nouvelle-Calédonie',
+            'type': 'COM',
+            'population': 271000,
+            'superficie': 18575,
+            'pib': 9.7,
+            'drapeau': 'caledonie-flag',
+            'monnaie': 'XPF',
+            'taux_octroi_actif': True
+        }
+    }
+
+@instrumented_cache_data(ttl=3600)
+def get_secteurs_definitions(territory_code):
+    """Définit les secteurs économiques pour un territoire donné"""
+    # Facteurs d'ajustement selon le territoire
+    territory_factor = {
+        'REUNION': 1.0,
+        'GUADELOUPE': 0.95,
+        'MARTINIQUE': 0.9,
+        'GUYANE': 0.7,
+        'MAYOTTE': 0.5,
+        'STPIERRE': 0.3,
+        'STBARTH': 0.4,
+        'STMARTIN': 0.45,
+        'WALLIS': 0.25,
+        'POLYNESIE': 0.8,
+        'CALEDONIE': 0.85
+    }
+    
+    factor = territory_factor.get(territory_code, 1.0)
+    
+    # Secteurs de base avec ajustements selon le territoire
+    secteurs_base = {
+        'AGRICULTURE': {
+            'nom_complet': 'Produits Agricoles',
+            'categorie': 'Alimentation',
+            'sous_categorie': 'Fruits & Légumes',
+            'taux_normal': 2.5,
+            'taux_reduit': 1.3,
+            'taux_specifique': 0.0,
+            'couleur': '#28a745',
+            'poids_total': 15.2 * factor,
+            'volume_importation': 450000 * factor,
+            'description': 'Fruits, légumes, produits agricoles frais'
+        },
+        'AGROALIMENTAIRE': {
+            'nom_complet': 'Industrie Agroalimentaire',
+            'categorie': 'Alimentation',
+            'sous_categorie': 'Produits Transformés',
+            'taux_normal': 3.2,
+            'taux_reduit': 1.8,
+            'taux_specifique': 0.5,
+            'couleur': '#20c997',
+            'poids_total': 22.8 * factor,
+            'volume_importation': 320000 * factor,
+            'description': 'Produits alimentaires transformés'
+        },
+        'BOISSONS': {
+            'nom_complet': 'Boissons et Alcools',
+            'categorie': 'Alimentation',
+            'sous_categorie': 'Liquides',
+            'taux_normal': 5.8,
+            'taux_reduit': 3.2,
+            'taux_specifique': 8.5,
+            'couleur': '#fd7e14',
+            'poids_total': 8.5 * factor,
+            'volume_importation': 180000 * factor,
+            'description': 'Boissons alcoolisées et non-alcoolisées'
+        },
+        'BTP': {
+            'nom_complet': 'Matériaux de Construction',
+            'categorie': 'Industrie',
+            'sous_categorie': 'Matériaux',
+            'taux_normal': 4.2,
+            'taux_reduit': 2.1,
+            'taux_specifique': 1.5,
+            'couleur': '#6f42c1',
+            'poids_total': 12.3 * factor,
+            'volume_importation': 280000 * factor,
+            'description': 'Ciment, fer, matériaux construction'
+        },
+        'AUTOMOBILE': {
+            'nom_complet': 'Véhicules et Pièces',
+            'categorie': 'Transport',
+            'sous_categorie': 'Véhicules',
+            'taux_normal': 6.5,
+            'taux_reduit': 3.8,
+            'taux_specifique': 12.2,
+            'couleur': '#dc3545',
+            'poids_total': 9.8 * factor,
+            'volume_importation': 75000 * factor,
+            'description': 'Voitures, pièces détachées'
+        },
+        'ENERGIE': {
+            'nom_complet': 'Produits Pétroliers',
+            'categorie': 'Énergie',
+            'sous_categorie': 'Carburants',
+            'taux_normal': 3.8,
+            'taux_reduit': 2.2,
+            'taux_specifique': 0.8,
+            'couleur': '#ffc107',
+            'poids_total': 14.7 * factor,
+            'volume_importation': 420000 * factor,
+            'description': 'Carburants, lubrifiants'
+        },
+        'BIENS_EQUIPEMENT': {
+            'nom_complet': 'Biens d\'Équipement',
+            'categorie': 'Industrie',
+            'sous_categorie': 'Machines',
+            'taux_normal': 4.8,
+            'taux_reduit': 2.9,
+            'taux_specifique': 3.2,
+            'couleur': '#6610f2',
+            'poids_total': 7.2 * factor,
+            'volume_importation': 95000 * factor,
+            'description': 'Machines, équipements industriels'
+        },
+        'BIENS_CONSOMMATION': {
+            'nom_complet': 'Biens de Consommation',
+            'categorie': 'Commerce',
+            'sous_categorie': 'Divers',
+            'taux_normal': 5.2,
+            'taux_reduit': 3.1,
+            'taux_specifique': 4.5,
+            'couleur': '#e83e8c',
+            'poids_total': 16.5 * factor,
+            'volume_importation': 210000 * factor,
+            'description': 'Électroménager, meubles, textiles'
+        },
+        'PHARMACEUTIQUE': {
+            'nom_complet': 'Produits Pharmaceutiques',
+            'categorie': 'Santé',
+            'sous_categorie': 'Médicaments',
+            'taux_normal': 1.2,
+            'taux_reduit': 0.8,
+            'taux_specifique': 0.3,
+            'couleur': '#0066CC',
+            'poids_total': 4.8 * factor,
+            'volume_importation': 65000 * factor,
+            'description': 'Médicaments, produits santé'
+        },
+        'TIC': {
+            'nom_complet': 'Technologies Information',
+            'categorie': 'High-Tech',
+            'sous_categorie': 'Électronique',
+            'taux_normal': 4.5,
+            'taux_reduit': 2.7,
+            'taux_specifique': 6.8,
+            'couleur': '#17a2b8',
+            'poids_total': 5.2 * factor,
+            'volume_importation': 88000 * factor,
+            'description': 'Ordinateurs, téléphones, électronique'
+        }
+    }
+    
+    # Ajustements spécifiques selon le territoire
+    if territory_code == 'POLYNESIE':
+        secteurs_base['TOURISME'] = {
+            'nom_complet': 'Tourisme et Hôtellerie',
+            'categorie': 'Services',
+            'sous_categorie': 'Tourisme',
+            'taux_normal': 3.5,
+            'taux_reduit': 1.5,
+            'taux_specifique': 0.0,
+            'couleur': '#0077be',
+            'poids_total': 18.0 * factor,
+            'volume_importation': 150000 * factor,
+            'description': 'Équipements touristiques, produits pour hôtellerie'
+        }
+    
+    elif territory_code == 'CALEDONIE':
+        secteurs_base['MINIER'] = {
+            'nom_complet': 'Industrie Minière',
+            'categorie': 'Industrie',
+            'sous_categorie': 'Mines',
+            'taux_normal': 2.8,
+            'taux_reduit': 1.2,
+            'taux_specifique': 0.0,
+            'couleur': '#8B4513',
+            'poids_total': 15.0 * factor,
+            'volume_importation': 120000 * factor,
+            'description': 'Équipements miniers, produits métallurgiques'
+        }
+    
+    elif territory_code == 'GUYANE':
+        secteurs_base['SPATIAL'] = {
+            'nom_complet': 'Industrie Spatiale',
+            'categorie': 'High-Tech',
+            'sous_categorie': 'Aérospatiale',
+            'taux_normal': 1.5,
+            'taux_reduit': 0.5,
+            'taux_specifique': 0.0,
+            'couleur': '#1a1a2e',
+            'poids_total': 8.0 * factor,
+            'volume_importation': 50000 * factor,
+            'description': 'Équipements spatiaux, technologies aérospatiales'
+        }
+    
+    elif territory_code in ['STBARTH', 'STMARTIN']:
+        secteurs_base['LUXE'] = {
+            'nom_complet': 'Produits de Luxe',
+            'categorie': 'Commerce',
+            'sous_categorie': 'Luxe',
+            'taux_normal': 6.0,
+            'taux_reduit': 3.0,
+            'taux_specifique': 8.0,
+            'couleur': '#c0c0c0',
+            'poids_total': 20.0 * factor,
+            'volume_importation': 80000 * factor,
+            'description': 'Produits de luxe, montres, bijoux, haute couture'
+        }
+    
+    return secteurs_base
@@ -0,0 +1,208 @@
+"""Export des vues : écriture par blocs (CSV, Parquet, Excel) dans un fil d'arrière-plan"""
+import os
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+
+import pandas as pd
+
+# Format → (extension, type MIME)
+FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+
+# Lignes par bloc écrit
+TAILLE_BLOC = 100_000
+
+# Limite de lignes d'une feuille Excel (au-delà, une feuille suivante est ouverte)
+LIGNES_PAR_FEUILLE = 1_048_575
+
+def iter_chunks(frame, taille=TAILLE_BLOC, positions=None):
+    """Blocs successifs d'un DataFrame (vues par position, sans copie de l'ensemble)
+    
+    Avec `positions`, seules ces lignes sont écrites, dans cet ordre : chaque bloc
+    est extrait à son tour, la vue filtrée n'est jamais matérialisée en entier.
+    """
+    total = len(frame) if positions is None else len(positions)
+    # Un DataFrame vide donne un bloc vide : le fichier garde ses en-têtes
+    for debut in range(0, max(total, 1), taille):
+        if positions is None:
+            yield frame.iloc[debut:debut + taille]
+        else:
+            yield frame.iloc[positions[debut:debut + taille]]
+
+def _export_frame(bloc):
+    # Un index nommé (mois de l'historique…) devient une colonne, les périodes des dates
+    noms = [nom for nom in bloc.index.names if nom is not None and nom not in bloc.columns]
+    bloc = (bloc.reset_index(level=noms) if noms else bloc).reset_index(drop=True)
+    periodes = {colonne: bloc[colonne].dt.to_timestamp() for colonne in bloc.columns
+                if isinstance(bloc[colonne].dtype, pd.PeriodDtype)}
+    return bloc.assign(**periodes) if periodes else bloc
+
+def write_csv(chunks, chemin, progression):
+    try:
+        import pyarrow
+        import pyarrow.csv
+    except ImportError:
+        pyarrow = None
+    if pyarrow is None:
+        with open(chemin, 'w', encoding='utf-8', newline='') as f:
+            for i, bloc in enumerate(chunks):
+                bloc.to_csv(f, header=i == 0, index=False)
+                progression(len(bloc))
+        return
+    
+    # Écriture Arrow : hors du GIL, les autres sessions ne ralentissent pas
+    writer = None
+    try:
+        for bloc in chunks:
+            table = _arrow_table(pyarrow, bloc)
+            if writer is None:
+                schema = pyarrow.schema([
+                    champ.with_type(pyarrow.timestamp('s')) if pyarrow.types.is_timestamp(champ.type) else champ
+                    for champ in table.schema
+                ])
+                writer = pyarrow.csv.CSVWriter(chemin, schema)
+            writer.write_table(table.cast(schema))
+            progression(len(bloc))
+    finally:
+        if writer is not None:
+            writer.close()
+
+def _arrow_table(pyarrow, bloc):
+    table = pyarrow.Table.from_pandas(bloc, preserve_index=False)
+    # Les colonnes catégorielles sont écrites comme du texte
+    return table.cast(pyarrow.schema([
+        champ.with_type(champ.type.value_type) if pyarrow.types.is_dictionary(champ.type) else champ
+        for champ in table.schema
+    ]))
+
+def write_parquet(chunks, chemin, progression):
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("L'export Parquet nécessite pyarrow (pip install pyarrow)") from exc
+    writer = None
+    try:
+        # Un groupe de lignes par bloc
+        for bloc in chunks:
+            table = pyarrow.Table.from_pandas(bloc, preserve_index=False)
+            if writer is None:
+                writer = pyarrow.parquet.ParquetWriter(chemin, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            progression(len(bloc))
+    finally:
+        if writer is not None:
+            writer.close()
+
+def write_excel(chunks, chemin, progression):
+    try:
+        from openpyxl import Workbook
+    except ImportError as exc:
+        raise ImportError("L'export Excel nécessite openpyxl (pip install openpyxl)") from exc
+    # Classeur en écriture seule : les lignes partent sur disque au fil de l'eau
+    classeur = Workbook(write_only=True)
+    feuille, lignes_feuille, entete = None, 0, None
+    for bloc in chunks:
+        if entete is None:
+            entete = [str(colonne) for colonne in bloc.columns]
+        if feuille is None:
+            feuille = classeur.create_sheet("Données 1")
+            feuille.append(entete)
+        valeurs = bloc.astype(object).where(bloc.notna(), None)
+        for ligne in valeurs.itertuples(index=False, name=None):
+            if lignes_feuille >= LIGNES_PAR_FEUILLE:
+                feuille = classeur.create_sheet(f"Données {len(classeur.worksheets) + 1}")
+                feuille.append(entete)
+                lignes_feuille = 0
+            feuille.append(ligne)
+            lignes_feuille += 1
+        progression(len(bloc))
+    classeur.save(chemin)
+
+WRITERS = {
+    'CSV': write_csv,
+    'Parquet': write_parquet,
+    'Excel': write_excel
+}
+
+def _remove(chemin):
+    if os.path.exists(chemin):
+        os.remove(chemin)
+
+def export_dir():
+    """Dossier des fichiers exportés (OCTROI_EXPORT_DIR, sinon dossier temporaire)"""
+    dossier = os.environ.get('OCTROI_EXPORT_DIR') or os.path.join(tempfile.gettempdir(), 'octroi_exports')
+    os.makedirs(dossier, exist_ok=True)
+    return dossier
+
+class ExportJob:
+    """Export d'un DataFrame écrit bloc par bloc dans un fil d'arrière-plan
+    
+    Le fichier est écrit sous un nom temporaire puis renommé une fois complet : le
+    rendu de la session n'attend jamais l'écriture et lit seulement l'avancement.
+    Les entrées du magasin étant immuables, le fil lit la vue sans la copier ; une
+    vue filtrée et triée est passée comme `positions` dans `frame` et extraite bloc
+    par bloc. Le fichier est supprimé avec l'export (remplacement ou fin de la session).
+    """
+    
+    def __init__(self, frame, format_export, nom, taille_bloc=TAILLE_BLOC, dossier=None, positions=None):
+        extension, self.mime = FORMATS[format_export]
+        self.format = format_export
+        self.nom_fichier = f"{nom}.{extension}"
+        self.chemin = os.path.join(dossier or export_dir(), f"{nom}_{uuid.uuid4().hex[:8]}.{extension}")
+        self.total = len(frame) if positions is None else len(positions)
+        self.ecrites = 0
+        self.erreur = None
+        self.duree = None
+        self.termine = False
+        self._frame = frame
+        self._positions = positions
+        self._taille_bloc = taille_bloc
+        self._thread = threading.Thread(target=self._run, name='octroi-export', daemon=True)
+        self._finalizer = weakref.finalize(self, _remove, self.chemin)
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def _avancer(self, lignes):
+        self.ecrites += lignes
+    
+    def _run(self):
+        debut = time.perf_counter()
+        temporaire = f"{self.chemin}.partiel"
+        try:
+            chunks = (_export_frame(bloc) for bloc in iter_chunks(self._frame, self._taille_bloc, self._positions))
+            WRITERS[self.format](chunks, temporaire, self._avancer)
+            os.replace(temporaire, self.chemin)
+        except Exception as exc:
+            self.erreur = f"{type(exc).__name__}: {exc}"
+            _remove(temporaire)
+        finally:
+            self._frame = self._positions = None
+            self.duree = time.perf_counter() - debut
+            self.termine = True
+    
+    @property
+    def progression(self):
+        return 1.0 if self.termine or not self.total else self.ecrites / self.total
+    
+    @property
+    def taille(self):
+        return os.path.getsize(self.chemin) if self.termine and not self.erreur else 0
+    
+    def read_bytes(self):
+        """Contenu du fichier, lu au moment du téléchargement"""
+        with open(self.chemin, 'rb') as f:
+            return f.read()
+    
+    def discard(self):
+        """Supprime le fichier exporté"""
+        if self.termine:
+            self._finalizer()
@@ -0,0 +1,79 @@
+"""Cache des figures Plotly et import différé de plotly.express"""
+import importlib
+import os
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from .metrics import cache_samples, get_metrics
+
+class LazyModule:
+    """Module importé au premier accès à l'un de ses attributs"""
+    
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+# Les figures ne sont construites qu'en cas d'absence du cache : plotly.express
+# n'est importé qu'à la première construction
+px = LazyModule('plotly.express')
+
+class FigureCache:
+    """Cache borné des spécifications JSON des figures Plotly, partagé par le processus
+    
+    Clé : (territoire, version des données, identifiant du graphique, filtres). Une
+    figure inchangée est servie depuis son JSON sérialisé sans repasser par Plotly
+    Express ; au-delà de max_entries, les figures les moins récemment servies sont
+    évincées.
+    """
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_build(self, key, build_fig):
+        """Spécification JSON de la figure, construite par build_fig en cas d'absence"""
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+                self.hits += 1
+                return spec
+            self.misses += 1
+        
+        # Construction hors verrou : les autres sessions ne sont pas bloquées
+        spec = build_fig().to_json()
+        with self._lock:
+            self._specs[key] = spec
+            self._specs.move_to_end(key)
+            while len(self._specs) > self.max_entries:
+                self._specs.popitem(last=False)
+                self.evictions += 1
+        return spec
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'entrees': len(self._specs),
+                'octets': sum(len(spec) for spec in self._specs.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+@st.cache_resource
+def get_figure_cache():
+    """Cache de figures du processus (taille via OCTROI_FIGURE_CACHE_SIZE)"""
+    cache = FigureCache(int(os.environ.get('OCTROI_FIGURE_CACHE_SIZE', 512)))
+    get_metrics().add_collector(lambda: cache_samples('figures', cache.stats()))
+    return cache
@@ -0,0 +1,204 @@
+"""Prévisions des revenus : décomposition saisonnière et lissage de Holt, par lots"""
+import numpy as np
+import pandas as pd
+
+from .metrics import instrumented_cache_data
+
+PERIODE = 12
+
+# Constantes de lissage (niveau × tendance) évaluées pour chaque série
+GRILLE_ALPHA = np.array([0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+GRILLE_BETA = np.array([0.01, 0.05, 0.1, 0.2, 0.3])
+
+# Quantile de la loi normale pour un intervalle à 95 %
+Z_95 = 1.959964
+
+SERIE_TOTALE = 'Total territoire'
+
+def seasonal_indices(series, mois, periode=PERIODE):
+    """Indices saisonniers multiplicatifs (séries × mois de l'année)
+    
+    Rapport de chaque observation à la moyenne mobile centrée 2×12, moyenné par
+    mois de l'année puis normalisé (moyenne 1). Sans deux cycles complets, ou pour
+    un mois jamais observé, l'indice vaut 1.
+    """
+    n_series, n_mois = series.shape
+    indices = np.ones((n_series, periode))
+    if n_mois < 2 * periode:
+        return indices
+    
+    cumul = np.concatenate([np.zeros((n_series, 1)), np.cumsum(series, axis=1)], axis=1)
+    moyennes = (cumul[:, periode:] - cumul[:, :-periode]) / periode
+    tendance = (moyennes[:, :-1] + moyennes[:, 1:]) / 2
+    centre = series[:, periode // 2:n_mois - periode // 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rapports = np.where(tendance > 0, centre / tendance, np.nan)
+    
+    mois_centre = mois[periode // 2:n_mois - periode // 2]
+    valides = ~np.isnan(rapports)
+    for m in range(periode):
+        colonnes = mois_centre == m + 1
+        observes = valides[:, colonnes].sum(axis=1)
+        somme = np.where(valides[:, colonnes], rapports[:, colonnes], 0.0).sum(axis=1)
+        indices[:, m] = np.where(observes > 0, somme / np.maximum(observes, 1), 1.0)
+    
+    indices /= indices.mean(axis=1, keepdims=True)
+    return indices
+
+class HoltSeasonalModel:
+    """Modèles ajustés d'un lot de séries mensuelles (séries × mois)
+    
+    Chaque série est désaisonnalisée (indices multiplicatifs), puis lissée par la
+    méthode de Holt (niveau et tendance additifs). Toutes les séries et toutes les
+    constantes de la grille avancent ensemble, mois par mois, dans des tableaux
+    (constantes × séries) : le coût ne dépend que du nombre de mois. Chaque série
+    retient les constantes de plus faible erreur quadratique à un pas, dont l'écart
+    type donne les intervalles de prévision.
+    """
+    
+    def __init__(self, series, mois, periode=PERIODE):
+        series = np.asarray(series, dtype=float)
+        mois = np.asarray(mois)
+        n_series, n_mois = series.shape
+        self.periode = periode
+        self.dernier_mois = int(mois[-1])
+        self.saison = seasonal_indices(series, mois, periode)
+        y = series / self.saison[:, mois - 1]
+        
+        alpha = np.repeat(GRILLE_ALPHA, len(GRILLE_BETA))[:, None]
+        beta = np.tile(GRILLE_BETA, len(GRILLE_ALPHA))[:, None]
+        
+        # Initialisation : premier mois, pente entre les deux premiers cycles
+        niveau = np.broadcast_to(y[:, 0], (len(alpha), n_series)).copy()
+        if n_mois >= 2 * periode:
+            pente = (y[:, periode:2 * periode].mean(axis=1) - y[:, :periode].mean(axis=1)) / periode
+        elif n_mois >= 2:
+            pente = y[:, 1] - y[:, 0]
+        else:
+            pente = np.zeros(n_series)
+        tendance = np.broadcast_to(pente, (len(alpha), n_series)).copy()
+        
+        sse = np.zeros((len(alpha), n_series))
+        for t in range(1, n_mois):
+            prevu = niveau + tendance
+            sse += (y[:, t] - prevu) ** 2
+            nouveau = alpha * y[:, t] + (1 - alpha) * prevu
+            tendance = beta * (nouveau - niveau) + (1 - beta) * tendance
+            niveau = nouveau
+        
+        meilleur = np.argmin(sse, axis=0)
+        colonnes = np.arange(n_series)
+        self.alpha = alpha[meilleur, 0]
+        self.beta = beta[meilleur, 0]
+        self.niveau = niveau[meilleur, colonnes]
+        self.tendance = tendance[meilleur, colonnes]
+        self.sigma = np.sqrt(sse[meilleur, colonnes] / max(n_mois - 1, 1))
+    
+    def forecast(self, horizon, z=Z_95):
+        """Prévision et bornes de l'intervalle (séries × horizon), revenus positifs"""
+        h = np.arange(1, horizon + 1)
+        mois_futurs = (self.dernier_mois + h - 1) % self.periode
+        saison = self.saison[:, mois_futurs]
+        centrale = self.niveau[:, None] + h * self.tendance[:, None]
+        
+        # Variance à h pas du lissage de Holt : σ² (1 + Σ_{j<h} (α + jαβ)²)
+        j = np.arange(horizon)
+        poids = (self.alpha[:, None] + j * (self.alpha * self.beta)[:, None]) ** 2
+        poids[:, 0] = 1.0
+        ecart = z * self.sigma[:, None] * np.sqrt(np.cumsum(poids, axis=1))
+        
+        prevision = np.maximum(centrale * saison, 0)
+        bas = np.maximum((centrale - ecart) * saison, 0)
+        haut = np.maximum((centrale + ecart) * saison, 0)
+        return prevision, bas, haut
+
+    def forecast_total(self, horizon, z=Z_95):
+        """Cumul prévu sur horizon mois et bornes de son intervalle (une valeur par série)
+        
+        Les erreurs des mois successifs sont corrélées : une innovation se propage au
+        niveau et à la tendance des mois suivants. L'écart type du cumul se déduit du
+        poids de chaque innovation dans la somme, et non de la somme des bornes
+        mensuelles, qui supposerait des erreurs parfaitement corrélées.
+        """
+        prevision, _, _ = self.forecast(horizon, z)
+        h = np.arange(horizon)
+        saison = self.saison[:, (self.dernier_mois + h) % self.periode]
+        
+        # Poids de l'innovation du mois k dans l'erreur du mois h : 1 si h = k, α + (h − k)αβ si h > k
+        decalage = h[:, None] - h[None, :]
+        poids = self.alpha[:, None, None] + decalage * (self.alpha * self.beta)[:, None, None]
+        poids = np.where(decalage > 0, poids, (decalage == 0).astype(float))
+        contributions = (saison[:, :, None] * poids).sum(axis=1)
+        ecart = z * self.sigma * np.sqrt((contributions ** 2).sum(axis=1))
+        
+        total = prevision.sum(axis=1)
+        return total, np.maximum(total - ecart, 0), total + ecart
+
+def monthly_series(historical_data, colonne='revenu_octroi', total=True):
+    """Valeurs mensuelles d'une colonne (mois × secteurs), précédées du total du territoire"""
+    mois = historical_data.index if isinstance(historical_data.index, pd.PeriodIndex) \
+        else pd.PeriodIndex(historical_data['date'], freq='M', name='mois')
+    par_secteur = (
+        historical_data[colonne]
+        .groupby([mois, historical_data['secteur'].to_numpy()], observed=True).sum()
+        .unstack(fill_value=0.0)
+    )
+    par_secteur = par_secteur.reindex(
+        pd.period_range(par_secteur.index.min(), par_secteur.index.max(), freq='M', name='mois')
+    ).ffill().fillna(0.0)
+    par_secteur.columns = par_secteur.columns.astype(str)
+    if not total:
+        return par_secteur
+    return pd.concat([par_secteur.sum(axis=1).rename(SERIE_TOTALE), par_secteur], axis=1)
+
+def build_forecasts(historical_data, horizon=12):
+    """Ajuste en un lot les modèles du total et de chaque secteur, puis prévoit horizon mois"""
+    historique = monthly_series(historical_data)
+    modele = HoltSeasonalModel(historique.to_numpy().T, historique.index.month.to_numpy())
+    prevision, bas, haut = modele.forecast(horizon)
+    total, total_bas, total_haut = modele.forecast_total(horizon)
+    
+    dates = pd.period_range(historique.index[-1] + 1, periods=horizon, freq='M', name='mois')
+    
+    def cadre(valeurs):
+        return pd.DataFrame(valeurs.T, index=dates, columns=historique.columns)
+    
+    return {
+        'historique': historique,
+        'prevision': cadre(prevision),
+        'bas': cadre(bas),
+        'haut': cadre(haut),
+        'cumul': pd.DataFrame({'prevision': total, 'bas': total_bas, 'haut': total_haut},
+                              index=historique.columns),
+        'parametres': pd.DataFrame({
+            'alpha': modele.alpha,
+            'beta': modele.beta,
+            'sigma': modele.sigma
+        }, index=historique.columns)
+    }
+
+def forecast_frame(forecasts, serie, mois_historique=24, filtre=None):
+    """Historique récent, prévision et bornes d'une série, au format long des graphiques
+    
+    Un filtre (HistoryFilter) ne retient que les mois de l'historique affiché
+    compris dans sa période ; la prévision reste celle de l'historique complet.
+    """
+    historique = forecasts['historique'][serie].iloc[-mois_historique:]
+    if filtre is not None:
+        historique = historique[filtre.month_mask(historique.index)]
+    parties = [
+        (historique, 'Historique'),
+        (forecasts['bas'][serie], 'Borne basse (95%)'),
+        (forecasts['haut'][serie], 'Borne haute (95%)'),
+        (forecasts['prevision'][serie], 'Prévision')
+    ]
+    return pd.concat([
+        pd.DataFrame({'date': valeurs.index.to_timestamp(how='end').normalize(), 'valeur': valeurs.to_numpy(),
+                      'type': libelle})
+        for valeurs, libelle in parties
+    ], ignore_index=True)
+
+@instrumented_cache_data(ttl=1800, max_entries=64)
+def get_forecasts(territory_code, data_version, _historical_data, filtre=None, horizon=12):
+    """Prévisions d'un territoire, ajustées une seule fois par version des données et catégories (filtre)"""
+    return build_forecasts(_historical_data, horizon)
@@ -0,0 +1,260 @@
+"""Générateurs des données simulées et construction de l'instantané courant"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .metrics import instrumented_cache_data
+from .scenario import Scenario
+from .schema import enforce_schema, enforce_history_schema
+
+# Colonnes de l'instantané courant ; les valeurs numériques suivent nom et catégorie
+COLONNES_COURANT = [
+    'territoire', 'secteur', 'nom_complet', 'categorie',
+    'revenu_mensuel', 'variation_pct', 'variation_abs', 'volume_importation',
+    'taux_normal', 'taux_reduit', 'taux_specifique', 'poids_total',
+    'revenu_annee_precedente', 'projection_annee_courante'
+]
+
+def _historical_dates():
+    """Mois couverts par l'historique (fin de mois depuis 2022)"""
+    return pd.date_range('2022-01-01', datetime.now(), freq='M')
+
+def _seasonal_bounds(territory_code, mois):
+    """Bornes basse/haute de l'impact saisonnier pour chaque mois"""
+    # Hémisphère sud : haute saison en été austral
+    if territory_code in ['REUNION', 'MAYOTTE']:
+        haute_saison, basse_saison = [12, 1, 2], [6, 7, 8]
+    else:
+        haute_saison, basse_saison = [6, 7, 8], [12, 1, 2]
+    
+    conditions = [np.isin(mois, haute_saison), np.isin(mois, basse_saison)]
+    bas = np.select(conditions, [1.1, 0.9], default=0.95)
+    haut = np.select(conditions, [1.3, 1.1], default=1.05)
+    return bas, haut
+
+def _generate_historical_data_vectorized(territory_code, secteurs, dates, rng):
+    """Moteur vectorisé : tous les facteurs sont tirés en un bloc (mois × secteurs)"""
+    codes = list(secteurs.keys())
+    n_mois, n_secteurs = len(dates), len(codes)
+    poids = np.array([info['poids_total'] for info in secteurs.values()], dtype=float)
+    volumes = np.array([info['volume_importation'] for info in secteurs.values()], dtype=float)
+    taux = np.array([info['taux_normal'] for info in secteurs.values()], dtype=float)
+    categories = np.array([info['categorie'] for info in secteurs.values()], dtype=object)
+    
+    # Un seul tirage, dans l'ordre du moteur historique :
+    # par mois [covid, saison, puis (base, bruit, volume, taux) pour chaque secteur]
+    tirages = rng.random((n_mois, 2 + 4 * n_secteurs))
+    u_secteurs = tirages[:, 2:].reshape(n_mois, n_secteurs, 4)
+    
+    # Impact COVID simplifié
+    covid_bas = np.where(dates.year == 2022, 0.9, 1.0)
+    covid_haut = np.where(dates.year == 2022, 1.1, 1.2)
+    covid_impact = covid_bas + (covid_haut - covid_bas) * tirages[:, 0]
+    
+    # Variation saisonnière
+    saison_bas, saison_haut = _seasonal_bounds(territory_code, dates.month)
+    seasonal_impact = saison_bas + (saison_haut - saison_bas) * tirages[:, 1]
+    
+    base_revenue = poids * (0.8 + (1.2 - 0.8) * u_secteurs[:, :, 0]) * 1000000
+    revenu = (base_revenue * covid_impact[:, None] * seasonal_impact[:, None]
+              * (0.95 + (1.05 - 0.95) * u_secteurs[:, :, 1]))
+    volume = volumes * (0.8 + (1.2 - 0.8) * u_secteurs[:, :, 2])
+    taux_moyen = taux * (0.9 + (1.1 - 0.9) * u_secteurs[:, :, 3])
+    
+    return pd.DataFrame({
+        'date': np.repeat(dates.values, n_secteurs),
+        'territoire': territory_code,
+        'secteur': np.tile(np.array(codes, dtype=object), n_mois),
+        'revenu_octroi': revenu.ravel(),
+        'volume_importation': volume.ravel(),
+        'categorie': np.tile(categories, n_mois),
+        'taux_moyen': taux_moyen.ravel()
+    })
+
+def _generate_historical_data_loop(territory_code, secteurs, dates, rng):
+    """Moteur historique ligne à ligne, conservé comme référence du moteur vectorisé"""
+    data = []
+    
+    for date in dates:
+        # Impact COVID simplifié
+        if date.year == 2022:
+            covid_impact = rng.uniform(0.9, 1.1)
+        else:
+            covid_impact = rng.uniform(1.0, 1.2)
+        
+        # Variation saisonnière
+        if territory_code in ['REUNION', 'MAYOTTE']:
+            if date.month in [12, 1, 2]:
+                seasonal_impact = rng.uniform(1.1, 1.3)
+            elif date.month in [6, 7, 8]:
+                seasonal_impact = rng.uniform(0.9, 1.1)
+            else:
+                seasonal_impact = rng.uniform(0.95, 1.05)
+        else:
+            if date.month in [6, 7, 8]:
+                seasonal_impact = rng.uniform(1.1, 1.3)
+            elif date.month in [12, 1, 2]:
+                seasonal_impact = rng.uniform(0.9, 1.1)
+            else:
+                seasonal_impact = rng.uniform(0.95, 1.05)
+        
+        for secteur_code, info in secteurs.items():
+            base_revenue = info['poids_total'] * rng.uniform(0.8, 1.2) * 1000000
+            revenu = base_revenue * covid_impact * seasonal_impact * rng.uniform(0.95, 1.05)
+            volume = info['volume_importation'] * rng.uniform(0.8, 1.2)
+            
+            data.append({
+                'date': date,
+                'territoire': territory_code,
+                'secteur': secteur_code,
+                'revenu_octroi': revenu,
+                'volume_importation': volume,
+                'categorie': info['categorie'],
+                'taux_moyen': info['taux_normal'] * rng.uniform(0.9, 1.1)
+            })
+    
+    return pd.DataFrame(data)
+
+@instrumented_cache_data(ttl=1800)
+def generate_historical_data(territory_code, secteurs, scenario=None, engine='vectorized'):
+    """Génère les données historiques (moteur NumPy vectorisé, flux 'historique' du scénario)"""
+    rng = (scenario or Scenario()).rng(territory_code, 'historique')
+    dates = _historical_dates()
+    if engine == 'loop':
+        return enforce_history_schema(_generate_historical_data_loop(territory_code, secteurs, dates, rng))
+    return enforce_history_schema(_generate_historical_data_vectorized(territory_code, secteurs, dates, rng))
+
+@instrumented_cache_data(ttl=300)
+def generate_current_data(territory_code, secteurs, historical_data, scenario=None):
+    """Génère l'instantané courant simulé (un tirage vectorisé du flux 'courant' du scénario)"""
+    codes = list(secteurs.keys())
+    infos = list(secteurs.values())
+    
+    # Dernier mois d'historique de chaque secteur
+    dernier = historical_data.groupby('secteur', observed=True)['revenu_octroi'].last()
+    dernier.index = dernier.index.astype(str)
+    dernier = dernier.reindex(codes).to_numpy(dtype=float)
+    
+    # Par secteur : variation mensuelle, volume, année précédente, projection
+    rng = (scenario or Scenario()).rng(territory_code, 'courant')
+    tirages = rng.uniform([-0.08, 0.8, 0.9, 1.05], [0.08, 1.2, 1.1, 1.15], (len(codes), 4))
+    change_pct = tirages[:, 0]
+    change_abs = dernier * change_pct
+    
+    def champ(nom):
+        return [info[nom] for info in infos]
+    
+    return enforce_schema(pd.DataFrame({
+        'territoire': territory_code,
+        'secteur': codes,
+        'nom_complet': champ('nom_complet'),
+        'categorie': champ('categorie'),
+        'revenu_mensuel': dernier + change_abs,
+        'variation_pct': change_pct * 100,
+        'variation_abs': change_abs,
+        'volume_importation': np.array(champ('volume_importation'), dtype=float) * tirages[:, 1],
+        'taux_normal': champ('taux_normal'),
+        'taux_reduit': champ('taux_reduit'),
+        'taux_specifique': champ('taux_specifique'),
+        'poids_total': champ('poids_total'),
+        'revenu_annee_precedente': dernier * tirages[:, 2],
+        'projection_annee_courante': dernier * tirages[:, 3]
+    }))
+
+@instrumented_cache_data(ttl=600)
+def generate_product_data(territory_code):
+    """Génère les données par produit optimisées"""
+    produits_base = [
+        {'produit': 'Véhicules particuliers', 'secteur': 'AUTOMOBILE', 'taux_octroi': 12.2, 'volume': 12000},
+        {'produit': 'Carburants', 'secteur': 'ENERGIE', 'taux_octroi': 2.2, 'volume': 420000},
+        {'produit': 'Boissons alcoolisées', 'secteur': 'BOISSONS', 'taux_octroi': 8.5, 'volume': 85000},
+        {'produit': 'Matériaux construction', 'secteur': 'BTP', 'taux_octroi': 2.1, 'volume': 280000},
+        {'produit': 'Produits alimentaires', 'secteur': 'AGROALIMENTAIRE', 'taux_octroi': 1.8, 'volume': 320000},
+        {'produit': 'Fruits et légumes', 'secteur': 'AGRICULTURE', 'taux_octroi': 1.3, 'volume': 450000},
+        {'produit': 'Équipements électroniques', 'secteur': 'TIC', 'taux_octroi': 2.7, 'volume': 88000},
+        {'produit': 'Médicaments', 'secteur': 'PHARMACEUTIQUE', 'taux_octroi': 0.8, 'volume': 65000},
+        {'produit': 'Meubles et ameublement', 'secteur': 'BIENS_CONSOMMATION', 'taux_octroi': 3.1, 'volume': 45000},
+        {'produit': 'Machines industrielles', 'secteur': 'BIENS_EQUIPEMENT', 'taux_octroi': 2.9, 'volume': 35000},
+    ]
+    
+    # Ajout de produits spécifiques selon le territoire
+    if territory_code == 'POLYNESIE':
+        produits_base.extend([
+            {'produit': 'Équipements hôteliers', 'secteur': 'TOURISME', 'taux_octroi': 1.5, 'volume': 25000},
+            {'produit': 'Produits de plage', 'secteur': 'TOURISME', 'taux_octroi': 3.0, 'volume': 15000},
+            {'produit': 'Matériel de plongée', 'secteur': 'TOURISME', 'taux_octroi': 2.5, 'volume': 8000}
+        ])
+    
+    elif territory_code == 'CALEDONIE':
+        produits_base.extend([
+            {'produit': 'Équipements miniers', 'secteur': 'MINIER', 'taux_octroi': 1.2, 'volume': 12000},
+            {'produit': 'Produits métallurgiques', 'secteur': 'MINIER', 'taux_octroi': 2.8, 'volume': 18000}
+        ])
+    
+    elif territory_code == 'GUYANE':
+        produits_base.extend([
+            {'produit': 'Composants spatiaux', 'secteur': 'SPATIAL', 'taux_octroi': 0.5, 'volume': 5000},
+            {'produit': 'Équipements de télécommunication', 'secteur': 'SPATIAL', 'taux_octroi': 1.0, 'volume': 8000}
+        ])
+    
+    elif territory_code in ['STBARTH', 'STMARTIN']:
+        produits_base.extend([
+            {'produit': 'Montres de luxe', 'secteur': 'LUXE', 'taux_octroi': 6.0, 'volume': 2000},
+            {'produit': 'Bijoux précieux', 'secteur': 'LUXE', 'taux_octroi': 8.0, 'volume': 1500},
+            {'produit': 'Haute couture', 'secteur': 'LUXE', 'taux_octroi': 5.0, 'volume': 3000}
+        ])
+    
+    # Ajustement des volumes selon le territoire
+    territory_factor = {
+        'REUNION': 1.0, 'GUADELOUPE': 0.95, 'MARTINIQUE': 0.9, 'GUYANE': 0.7,
+        'MAYOTTE': 0.5, 'STPIERRE': 0.3, 'STBARTH': 0.4, 'STMARTIN': 0.45,
+        'WALLIS': 0.25, 'POLYNESIE': 0.8, 'CALEDONIE': 0.85
+    }
+    
+    factor = territory_factor.get(territory_code, 1.0)
+    for produit in produits_base:
+        produit['volume'] *= factor
+    
+    return pd.DataFrame(produits_base)
+
+def build_current_data_from_history(territory_code, secteurs, historical_data):
+    """Construit l'instantané courant à partir des deux derniers mois d'historique"""
+    mensuel = historical_data.pivot_table(index='date', columns='secteur', observed=True,
+                                          values='revenu_octroi', aggfunc='sum').sort_index()
+    volumes = historical_data.pivot_table(index='date', columns='secteur', observed=True,
+                                          values='volume_importation', aggfunc='sum').sort_index().astype(float)
+    current_data = []
+    
+    for secteur_code, info in secteurs.items():
+        if secteur_code not in mensuel.columns:
+            continue
+        serie = mensuel[secteur_code].dropna()
+        dernier = serie.iloc[-1]
+        precedent = serie.iloc[-2] if len(serie) > 1 else dernier
+        annee_precedente = serie.iloc[-13] if len(serie) > 12 else precedent
+        cumul_12_mois = serie.iloc[-12:].sum()
+        cumul_precedent = serie.iloc[-24:-12].sum() if len(serie) > 12 else cumul_12_mois
+        change_abs = dernier - precedent
+        change_pct = change_abs / precedent if precedent else 0.0
+        
+        current_data.append({
+            'territoire': territory_code,
+            'secteur': secteur_code,
+            'nom_complet': info['nom_complet'],
+            'categorie': info['categorie'],
+            'revenu_mensuel': dernier,
+            'variation_pct': change_pct * 100,
+            'variation_abs': change_abs,
+            'volume_importation': volumes[secteur_code].dropna().iloc[-1],
+            'taux_normal': info['taux_normal'],
+            'taux_reduit': info['taux_reduit'],
+            'taux_specifique': info['taux_specifique'],
+            'poids_total': info['poids_total'],
+            'revenu_annee_precedente': annee_precedente,
+            'projection_annee_courante': dernier * (cumul_12_mois / cumul_precedent if cumul_precedent else 1.0)
+        })
+    
+    # Sans historique, l'instantané est vide mais garde ses colonnes et leurs types
+    courant = pd.DataFrame(current_data, columns=COLONNES_COURANT)
+    return enforce_schema(courant.astype({colonne: float for colonne in COLONNES_COURANT[4:]}))
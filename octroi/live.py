@@ -0,0 +1,279 @@
+"""Mises à jour en direct : moteur incrémental et planificateur partagé"""
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+import streamlit as st
+
+from .scenario import Scenario, get_scenario, stable_int
+
+def summarize_current(current_data):
+    """Agrégats des métriques clés calculés sur un instantané courant"""
+    variation = current_data['variation_pct'].to_numpy(dtype=float)
+    return {
+        'revenu_total': float(current_data['revenu_mensuel'].sum()),
+        'volume_total': float(current_data['volume_importation'].sum()),
+        'variation_somme': float(variation.sum()),
+        'secteurs_hausse': int((variation > 0).sum()),
+        'secteurs': len(current_data)
+    }
+
+def draw_live_batch(rng, n, probabilite=0.3):
+    """Tire un lot de deltas : ~30% des secteurs varient de ±2%"""
+    masque = rng.random(n) < probabilite
+    variation = rng.uniform(-0.02, 0.02, n)
+    facteur_volume = rng.uniform(0.98, 1.02, n)
+    return masque, variation, facteur_volume
+
+class LiveUpdateEngine:
+    """Moteur incrémental des mises à jour en direct d'un instantané courant
+    
+    Les colonnes en direct sont tenues dans des tableaux NumPy. Un lot de deltas
+    s'applique en une seule opération masquée, est ajouté à un journal versionné
+    borné et met à jour les agrégats des métriques clés à partir des seuls deltas.
+    """
+    COLONNES = ('revenu_mensuel', 'variation_pct', 'volume_importation')
+    
+    def __init__(self, base_current, base_version, journal_max=256, resync_every=64):
+        self.base = base_current
+        self.base_version = base_version
+        self.values = {col: base_current[col].to_numpy(dtype=float, copy=True) for col in self.COLONNES}
+        self.uid = uuid.uuid4().hex
+        self.version = 0
+        # Empreinte de la suite des lots appliqués : deux sessions au même état la partagent
+        self.etat = 0
+        self.feed_version = 0
+        self.journal = deque(maxlen=journal_max)
+        self.last_update = None
+        self.resync_every = resync_every
+        self._totaux = summarize_current(base_current)
+        self._snapshot = None
+        self._snapshot_version = None
+        self._query_index = None
+        self._query_index_version = None
+    
+    def random_batch(self, rng, probabilite=0.3):
+        """Tire un lot de deltas pour les secteurs de l'instantané"""
+        return draw_live_batch(rng, len(self.base), probabilite)
+    
+    def apply(self, masque, variation, facteur_volume, origine=None):
+        """Applique un lot de deltas (masque, variation relative, facteur de volume)
+        
+        origine identifie un lot reproductible (flux et numéro) ; sans elle, le lot
+        est propre à la session et l'état qu'il produit n'est partagé avec aucune autre.
+        """
+        positions = np.flatnonzero(masque)
+        variation = np.asarray(variation, dtype=float)[positions]
+        facteur_volume = np.asarray(facteur_volume, dtype=float)[positions]
+        self._apply_positions(positions, variation, facteur_volume)
+        self.version += 1
+        self.etat = stable_int(self.etat, origine if origine is not None else (self.uid, self.version), bits=63)
+        self.last_update = datetime.now()
+        self.journal.append({
+            'version': self.version,
+            'etat': self.etat,
+            'positions': positions,
+            'variation': variation,
+            'facteur_volume': facteur_volume
+        })
+        if self.version % self.resync_every == 0:
+            self._resync()
+        return self.version
+    
+    def _apply_positions(self, positions, variation, facteur_volume):
+        revenu = self.values['revenu_mensuel']
+        variation_pct = self.values['variation_pct']
+        volume = self.values['volume_importation']
+        
+        ancien_revenu = revenu[positions]
+        ancienne_variation = variation_pct[positions]
+        ancien_volume = volume[positions]
+        
+        revenu[positions] = ancien_revenu * (1 + variation)
+        variation_pct[positions] = variation * 100
+        volume[positions] = ancien_volume * facteur_volume
+        
+        # Agrégats mis à jour à partir des seuls deltas
+        totaux = self._totaux
+        totaux['revenu_total'] += float((revenu[positions] - ancien_revenu).sum())
+        totaux['volume_total'] += float((volume[positions] - ancien_volume).sum())
+        totaux['variation_somme'] += float((variation_pct[positions] - ancienne_variation).sum())
+        totaux['secteurs_hausse'] += int((variation_pct[positions] > 0).sum() - (ancienne_variation > 0).sum())
+    
+    def _resync(self):
+        """Recalcule exactement les sommes pour borner la dérive d'arrondi"""
+        self._totaux['revenu_total'] = float(self.values['revenu_mensuel'].sum())
+        self._totaux['volume_total'] = float(self.values['volume_importation'].sum())
+        self._totaux['variation_somme'] = float(self.values['variation_pct'].sum())
+    
+    def changes_since(self, version):
+        """Entrées du journal postérieures à une version"""
+        return [change for change in self.journal if change['version'] > version]
+    
+    def rebase(self, base_current, base_version, feed_version=None):
+        """Rejoue le journal sur un nouvel instantané de base (après rechargement)
+        
+        Les lots du planificateur déjà rejoués ne doivent pas être relus : la
+        session garde sa position dans le flux. Sans rejeu possible, elle repart
+        de feed_version (la version courante du planificateur).
+        """
+        # Le rejeu n'a de sens que si le journal est complet et les secteurs inchangés
+        rejouable = len(self.journal) == self.version and len(base_current) == len(self.base)
+        changes, last_update, position = list(self.journal), self.last_update, self.feed_version
+        self.__init__(base_current, base_version, self.journal.maxlen, self.resync_every)
+        if rejouable:
+            for change in changes:
+                self._apply_positions(change['positions'], change['variation'], change['facteur_volume'])
+                self.version = change['version']
+                self.etat = change['etat']
+                self.journal.append(change)
+            self.last_update = last_update
+            self.feed_version = position
+        else:
+            self.feed_version = position if feed_version is None else feed_version
+    
+    def metrics(self):
+        """Métriques clés courantes, sans rescanner l'instantané"""
+        totaux = self._totaux
+        return {
+            'revenu_total': totaux['revenu_total'],
+            'volume_total': totaux['volume_total'],
+            'variation_moyenne': totaux['variation_somme'] / totaux['secteurs'] if totaux['secteurs'] else 0.0,
+            'secteurs_hausse': totaux['secteurs_hausse'],
+            'secteurs': totaux['secteurs']
+        }
+    
+    def memory_usage(self):
+        """Empreinte propre du moteur (octets) : colonnes en direct, journal et instantané"""
+        octets = sum(valeurs.nbytes for valeurs in self.values.values())
+        octets += sum(change['positions'].nbytes + change['variation'].nbytes + change['facteur_volume'].nbytes
+                      for change in self.journal)
+        if self._snapshot is not None:
+            octets += int(self._snapshot.memory_usage(index=True, deep=True).sum())
+        return octets
+    
+    def snapshot(self):
+        """Instantané courant avec les valeurs en direct (reconstruit une fois par version)"""
+        if self._snapshot_version != self.version:
+            snapshot = self.base.copy()
+            for col in self.COLONNES:
+                snapshot[col] = self.values[col]
+            self._snapshot = snapshot
+            self._snapshot_version = self.version
+        return self._snapshot
+    
+    def query_index(self, base_index):
+        """Index de requête de l'instantané courant (reconstruit une fois par version)"""
+        if self._query_index_version != self.version:
+            self._query_index = base_index.with_live_values(self.snapshot())
+            self._query_index_version = self.version
+        return self._query_index
+
+class RefreshScheduler:
+    """Planificateur de rafraîchissement partagé par toutes les sessions du processus
+    
+    Un seul thread d'arrière-plan tire, à chaque intervalle, un lot de deltas par
+    territoire suivi et le publie avec un numéro de version. Les sessions appliquent
+    les lots publiés depuis leur dernière lecture : aucun thread de script n'attend,
+    et le coût d'un tick ne dépend pas du nombre de sessions.
+    """
+    
+    def __init__(self, interval, journal_max=64, scenario=None, territoires_actifs=None):
+        self.interval = interval
+        self.scenario = scenario or Scenario()
+        self.journal_max = journal_max
+        self.territoires_actifs = territoires_actifs
+        self.ticks = 0
+        self._feeds = {}
+        self._versions = {}
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def watch(self, territory_code, n_secteurs):
+        """Inscrit un territoire au flux de mises à jour
+        
+        Si le nombre de secteurs a changé (territoire rechargé), les lots déjà
+        publiés ne s'appliquent plus : le journal est vidé, la version continue.
+        Un territoire de nouveau suivi reprend à la version où il s'était arrêté.
+        """
+        with self._lock:
+            feed = self._feeds.get(territory_code)
+            if feed is None:
+                self._feeds[territory_code] = {
+                    'secteurs': n_secteurs,
+                    'version': self._versions.pop(territory_code, 0),
+                    'lots': deque(maxlen=self.journal_max)
+                }
+            elif feed['secteurs'] != n_secteurs:
+                feed['secteurs'] = n_secteurs
+                feed['lots'].clear()
+    
+    def unwatch(self, territory_code):
+        """Retire un territoire du flux (sa version est gardée pour la reprise)"""
+        with self._lock:
+            feed = self._feeds.pop(territory_code, None)
+            if feed is not None:
+                self._versions[territory_code] = feed['version']
+    
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='octroi-refresh', daemon=True)
+                self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.tick()
+    
+    def tick(self):
+        """Publie un lot de deltas pour chaque territoire suivi
+        
+        Les territoires qu'aucune session ne consulte plus (territoires_actifs)
+        sont retirés du flux avant le tirage.
+        """
+        with self._lock:
+            # Sous le verrou : une session qui vient de s'inscrire tient déjà son bail
+            if self.territoires_actifs is not None:
+                actifs = self.territoires_actifs()
+                for territory_code in [code for code in self._feeds if code not in actifs]:
+                    self.unwatch(territory_code)
+            for territory_code, feed in self._feeds.items():
+                feed['version'] += 1
+                # Lot n du flux 'direct' du territoire : le même pour tout processus du scénario
+                rng = self.scenario.rng(territory_code, 'direct', feed['version'])
+                feed['lots'].append((feed['version'], draw_live_batch(rng, feed['secteurs'])))
+            self.ticks += 1
+    
+    def version(self, territory_code):
+        with self._lock:
+            feed = self._feeds.get(territory_code)
+            return feed['version'] if feed else self._versions.get(territory_code, 0)
+    
+    def batches_since(self, territory_code, version):
+        """Lots publiés après une version donnée, du plus ancien au plus récent"""
+        with self._lock:
+            feed = self._feeds.get(territory_code)
+            if feed is None:
+                return []
+            return [(v, lot) for v, lot in feed['lots'] if v > version]
+
+@st.cache_resource
+def get_refresh_scheduler():
+    """Planificateur partagé du processus (intervalle via OCTROI_REFRESH_SECONDS)
+    
+    Seuls les territoires tenus par une session (bail du magasin partagé) restent
+    suivis.
+    """
+    # Import différé : le magasin dépend de ce module via l'index de requête
+    from .store import get_territory_store
+    store = get_territory_store()
+    return RefreshScheduler(float(os.environ.get('OCTROI_REFRESH_SECONDS', 30)), scenario=get_scenario(),
+                            territoires_actifs=store.leased)
@@ -0,0 +1,254 @@
+"""Métriques du processus au format texte Prometheus (caches, réexécutions, sessions)"""
+import functools
+import inspect
+import os
+import threading
+import time
+import uuid
+import weakref
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+# Bornes (secondes) de l'histogramme des durées de réexécution
+BORNES_REEXECUTION = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class SessionHandle:
+    """Présence d'une session, gardée dans son état : disparaît avec elle"""
+    
+    def __init__(self, mesure_memoire):
+        self.id = uuid.uuid4().hex[:8]
+        self.mesure_memoire = mesure_memoire
+
+class MetricsRegistry:
+    """Registre des métriques du processus
+    
+    Compteurs et jauges sont indexés par (nom, étiquettes). Les collecteurs
+    enregistrés (magasin, cache des figures…) sont interrogés au moment de
+    l'exposition, ce qui évite de dupliquer leurs compteurs.
+    """
+    
+    def __init__(self, bornes=BORNES_REEXECUTION):
+        self.bornes = bornes
+        self._lock = threading.Lock()
+        self._descriptions = {}
+        self._valeurs = defaultdict(float)
+        self._histogrammes = {}
+        self._collecteurs = []
+        self._cles_calculees = defaultdict(set)
+        self._sessions = weakref.WeakValueDictionary()
+    
+    def describe(self, nom, type_metrique, aide):
+        self._descriptions[nom] = (type_metrique, aide)
+    
+    def inc(self, nom, etiquettes=(), valeur=1):
+        with self._lock:
+            self._valeurs[(nom, tuple(etiquettes))] += valeur
+    
+    def observe(self, nom, valeur):
+        """Ajoute une observation à un histogramme"""
+        with self._lock:
+            compte, somme, buckets = self._histogrammes.get(nom, (0, 0.0, [0] * len(self.bornes)))
+            for i, borne in enumerate(self.bornes):
+                if valeur <= borne:
+                    buckets[i] += 1
+            self._histogrammes[nom] = (compte + 1, somme + valeur, buckets)
+    
+    def cache_miss(self, cache, cle):
+        """Calcul d'un cache ; un calcul d'une clé déjà calculée signale une éviction"""
+        with self._lock:
+            self._valeurs[('octroi_cache_misses_total', (('cache', cache),))] += 1
+            if cle is not None:
+                if cle in self._cles_calculees[cache]:
+                    self._valeurs[('octroi_cache_evictions_total', (('cache', cache),))] += 1
+                self._cles_calculees[cache].add(cle)
+    
+    def add_collector(self, collecteur):
+        """collecteur() → itérable de (nom, étiquettes, valeur), lu à chaque exposition"""
+        with self._lock:
+            self._collecteurs.append(collecteur)
+    
+    def register_session(self, mesure_memoire):
+        """Enregistre une session ; mesure_memoire() donne son empreinte en octets"""
+        handle = SessionHandle(mesure_memoire)
+        with self._lock:
+            self._sessions[handle.id] = handle
+        return handle
+    
+    def _echantillons(self):
+        with self._lock:
+            echantillons = [(nom, dict(etiquettes), valeur) for (nom, etiquettes), valeur in self._valeurs.items()]
+            histogrammes = dict(self._histogrammes)
+            collecteurs = list(self._collecteurs)
+            sessions = list(self._sessions.values())
+        
+        # Appels = succès + calculs : les succès se déduisent des deux compteurs
+        appels = {e['cache']: v for n, e, v in echantillons if n == 'octroi_cache_calls_total'}
+        calculs = {e['cache']: v for n, e, v in echantillons if n == 'octroi_cache_misses_total'}
+        echantillons = [e for e in echantillons if e[0] != 'octroi_cache_calls_total']
+        echantillons += [('octroi_cache_hits_total', {'cache': cache}, total - calculs.get(cache, 0))
+                         for cache, total in appels.items()]
+        
+        for collecteur in collecteurs:
+            echantillons.extend(collecteur())
+        
+        echantillons.append(('octroi_active_sessions', {}, len(sessions)))
+        for handle in sessions:
+            echantillons.append(('octroi_session_memory_bytes', {'session': handle.id}, handle.mesure_memoire()))
+        return echantillons, histogrammes
+    
+    def render(self):
+        """Exposition au format texte Prometheus 0.0.4"""
+        echantillons, histogrammes = self._echantillons()
+        par_nom = defaultdict(list)
+        for nom, etiquettes, valeur in echantillons:
+            par_nom[nom].append((etiquettes, valeur))
+        
+        lignes = []
+        for nom in sorted(par_nom):
+            type_metrique, aide = self._descriptions.get(nom, ('untyped', ''))
+            lignes += [f'# HELP {nom} {aide}', f'# TYPE {nom} {type_metrique}']
+            for etiquettes, valeur in sorted(par_nom[nom], key=lambda e: sorted(e[0].items())):
+                lignes.append(f'{nom}{_etiquettes(etiquettes)} {_valeur(valeur)}')
+        
+        for nom, (compte, somme, buckets) in sorted(histogrammes.items()):
+            _, aide = self._descriptions.get(nom, ('histogram', ''))
+            lignes += [f'# HELP {nom} {aide}', f'# TYPE {nom} histogram']
+            for borne, cumul in zip(self.bornes, buckets):
+                lignes.append(f'{nom}_bucket{{le="{borne}"}} {cumul}')
+            lignes += [f'{nom}_bucket{{le="+Inf"}} {compte}', f'{nom}_sum {_valeur(somme)}', f'{nom}_count {compte}']
+        return '\n'.join(lignes) + '\n'
+
+def _etiquettes(etiquettes):
+    if not etiquettes:
+        return ''
+    paires = ','.join(
+        '{}="{}"'.format(cle, str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for cle, valeur in sorted(etiquettes.items())
+    )
+    return '{' + paires + '}'
+
+def _valeur(valeur):
+    return repr(float(valeur)) if isinstance(valeur, float) and not valeur.is_integer() else str(int(valeur))
+
+@st.cache_resource
+def get_metrics():
+    """Registre des métriques partagé du processus"""
+    registre = MetricsRegistry()
+    registre.describe('octroi_cache_hits_total', 'counter', "Appels servis par le cache")
+    registre.describe('octroi_cache_misses_total', 'counter', "Appels calculés (absents du cache)")
+    registre.describe('octroi_cache_evictions_total', 'counter',
+                      "Entrées évincées (pour st.cache_data : clés recalculées après expiration ou éviction)")
+    registre.describe('octroi_cache_entries', 'gauge', "Entrées présentes dans le cache")
+    registre.describe('octroi_cache_bytes', 'gauge', "Mémoire occupée par le cache (octets)")
+    registre.describe('octroi_rerun_duration_seconds', 'histogram', "Durée d'une exécution du script")
+    registre.describe('octroi_active_sessions', 'gauge', "Sessions actives")
+    registre.describe('octroi_session_memory_bytes', 'gauge', "Mémoire propre d'une session (calques en direct)")
+    return registre
+
+def cache_samples(cache, stats):
+    """Échantillons d'un cache à partir de ses statistiques (hits, misses, evictions…)"""
+    correspondances = {
+        'hits': 'octroi_cache_hits_total',
+        'misses': 'octroi_cache_misses_total',
+        'evictions': 'octroi_cache_evictions_total',
+        'entrees': 'octroi_cache_entries',
+        'octets': 'octroi_cache_bytes',
+        'memoire_octets': 'octroi_cache_bytes'
+    }
+    return [(nom, {'cache': cache}, stats[cle]) for cle, nom in correspondances.items() if cle in stats]
+
+def _cle_valeur(valeur):
+    if isinstance(valeur, (dict, list)):
+        return repr(valeur)
+    try:
+        hash(valeur)
+    except TypeError:
+        # Non hachable (DataFrame…) : l'identité de l'objet, faute de mieux
+        return ('id', id(valeur))
+    return valeur
+
+def _cle_appel(signature, args, kwargs):
+    """Clé approchée d'un appel, pour reconnaître un recalcul
+    
+    Comme st.cache_data, les paramètres préfixés par _ ne comptent pas dans la clé.
+    """
+    try:
+        arguments = signature.bind(*args, **kwargs)
+    except TypeError:
+        return None
+    arguments.apply_defaults()
+    return hash(tuple((nom, _cle_valeur(valeur)) for nom, valeur in arguments.arguments.items()
+                      if not nom.startswith('_')))
+
+def instrumented_cache_data(**options):
+    """st.cache_data avec compteurs d'appels, de calculs et de recalculs par fonction"""
+    def decorateur(fonction):
+        nom = fonction.__name__
+        signature = inspect.signature(fonction)
+        
+        @functools.wraps(fonction)
+        def calcul(*args, **kwargs):
+            get_metrics().cache_miss(nom, _cle_appel(signature, args, kwargs))
+            return fonction(*args, **kwargs)
+        cache = st.cache_data(**options)(calcul)
+        
+        @functools.wraps(fonction)
+        def appel(*args, **kwargs):
+            get_metrics().inc('octroi_cache_calls_total', (('cache', nom),))
+            return cache(*args, **kwargs)
+        appel.clear = cache.clear
+        return appel
+    return decorateur
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        corps = get_metrics().render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+    
+    def log_message(self, format, *args):
+        pass
+
+def write_metrics_file(chemin):
+    """Écrit l'exposition dans un fichier (remplacement atomique, pour le node exporter)"""
+    temporaire = f'{chemin}.tmp'
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        f.write(get_metrics().render())
+    os.replace(temporaire, chemin)
+
+@st.cache_resource
+def start_metrics_exporter():
+    """Expose les métriques une fois par processus
+    
+    OCTROI_METRICS_PORT ouvre un point HTTP local (/metrics) ; OCTROI_METRICS_FILE
+    écrit le fichier toutes les OCTROI_METRICS_INTERVAL secondes (15 par défaut).
+    """
+    exporteur = {'port': None, 'fichier': None}
+    port = os.environ.get('OCTROI_METRICS_PORT')
+    if port:
+        serveur = ThreadingHTTPServer((os.environ.get('OCTROI_METRICS_HOST', '127.0.0.1'), int(port)), _MetricsHandler)
+        threading.Thread(target=serveur.serve_forever, name='octroi-metrics-http', daemon=True).start()
+        exporteur['port'] = serveur.server_address[1]
+    
+    chemin = os.environ.get('OCTROI_METRICS_FILE')
+    if chemin:
+        intervalle = float(os.environ.get('OCTROI_METRICS_INTERVAL', 15))
+        
+        def ecrire():
+            while True:
+                try:
+                    write_metrics_file(chemin)
+                except OSError:
+                    pass
+                time.sleep(intervalle)
+        threading.Thread(target=ecrire, name='octroi-metrics-file', daemon=True).start()
+        exporteur['fichier'] = chemin
+    return exporteur
@@ -0,0 +1,132 @@
+"""Historique partitionné par catégorie et filtres de la barre latérale (période, catégories)"""
+import numpy as np
+import pandas as pd
+
+class PartitionedHistory:
+    """Historique d'un territoire rangé par catégorie, puis par mois
+    
+    Chaque catégorie occupe une plage contiguë de lignes, triée par mois : une
+    fenêtre de mois se trouve par recherche dichotomique dans chaque plage
+    retenue. Une sélection ne lit que ses lignes ; si elle tient en une seule
+    plage, c'est une vue de l'historique, sans copie.
+    """
+    
+    def __init__(self, historical_data):
+        mois = historical_data.index if isinstance(historical_data.index, pd.PeriodIndex) \
+            else pd.PeriodIndex(historical_data['date'], freq='M', name='mois')
+        categories = historical_data['categorie']
+        if not isinstance(categories.dtype, pd.CategoricalDtype):
+            categories = categories.astype('category')
+        codes = categories.cat.codes.to_numpy()
+        ordinaux = mois.asi8
+        
+        # Rangement stable (catégorie, mois) ; rien à copier si l'historique l'est déjà
+        ordre = np.lexsort((ordinaux, codes))
+        if np.array_equal(ordre, np.arange(len(ordre))):
+            self.data = historical_data
+        else:
+            self.data = historical_data.iloc[ordre]
+            codes, ordinaux = codes[ordre], ordinaux[ordre]
+        self.mois = ordinaux
+        
+        limites = np.flatnonzero(np.diff(codes)) + 1
+        debuts = np.concatenate([[0], limites]) if len(codes) else np.array([], dtype=int)
+        fins = np.concatenate([limites, [len(codes)]]) if len(codes) else np.array([], dtype=int)
+        self.partitions = {
+            categories.cat.categories[codes[debut]]: (int(debut), int(fin))
+            for debut, fin in zip(debuts, fins)
+        }
+        self.premier_mois = pd.Period(ordinal=int(ordinaux.min()), freq='M') if len(ordinaux) else None
+        self.dernier_mois = pd.Period(ordinal=int(ordinaux.max()), freq='M') if len(ordinaux) else None
+    
+    @property
+    def categories(self):
+        return list(self.partitions)
+    
+    def ranges(self, debut=None, fin=None, categories=None):
+        """Plages de lignes [début, fin) retenues par une fenêtre de mois et des catégories"""
+        plages = []
+        for categorie, (a, b) in self.partitions.items():
+            if categories is not None and categorie not in categories:
+                continue
+            bas = a if debut is None else a + int(np.searchsorted(self.mois[a:b], debut.ordinal, 'left'))
+            haut = b if fin is None else a + int(np.searchsorted(self.mois[a:b], fin.ordinal, 'right'))
+            if bas < haut:
+                plages.append((bas, haut))
+        return plages
+    
+    def select(self, debut=None, fin=None, categories=None):
+        """Lignes de l'historique dans la fenêtre [debut, fin] (mois inclus) et les catégories"""
+        plages = self.ranges(debut, fin, categories)
+        if not plages:
+            return self.data.iloc[:0]
+        # Plages adjacentes fusionnées : toutes les catégories sur toute la période = une seule plage
+        fusion = [list(plages[0])]
+        for bas, haut in plages[1:]:
+            if bas == fusion[-1][1]:
+                fusion[-1][1] = haut
+            else:
+                fusion.append([bas, haut])
+        if len(fusion) == 1:
+            return self.data.iloc[fusion[0][0]:fusion[0][1]]
+        return self.data.take(np.concatenate([np.arange(bas, haut) for bas, haut in fusion]))
+
+class HistoryFilter:
+    """Période et catégories retenues dans la barre latérale
+    
+    None signifie « sans restriction » : le filtre inactif renvoie les données
+    chargées telles quelles et partage leurs caches.
+    """
+    
+    def __init__(self, debut=None, fin=None, categories=None):
+        self.debut = debut
+        self.fin = fin
+        self.categories = tuple(sorted(categories)) if categories is not None else None
+    
+    @classmethod
+    def from_controls(cls, partitions, date_debut, date_fin, categories_selectionnees):
+        """Filtre des contrôles, normalisé : une borne qui couvre tout l'historique est levée"""
+        debut, fin = pd.Period(date_debut, freq='M'), pd.Period(date_fin, freq='M')
+        if debut > fin:
+            debut, fin = fin, debut
+        # La fenêtre garde au moins un mois d'historique
+        if partitions.dernier_mois is not None:
+            debut = min(debut, partitions.dernier_mois)
+            fin = max(fin, partitions.premier_mois)
+        return cls(
+            debut=debut if partitions.premier_mois is not None and debut > partitions.premier_mois else None,
+            fin=fin if partitions.dernier_mois is not None and fin < partitions.dernier_mois else None,
+            categories=None if set(partitions.categories) <= set(categories_selectionnees)
+            else categories_selectionnees
+        )
+    
+    @property
+    def key(self):
+        """Clé des caches dépendant du filtre (None pour le filtre inactif)"""
+        if self.debut is None and self.fin is None and self.categories is None:
+            return None
+        return (str(self.debut) if self.debut is not None else None,
+                str(self.fin) if self.fin is not None else None,
+                self.categories)
+    
+    def month_mask(self, mois):
+        """Masque des mois (périodes mensuelles) compris dans la fenêtre"""
+        mois = pd.PeriodIndex(mois, freq='M')
+        masque = np.ones(len(mois), dtype=bool)
+        if self.debut is not None:
+            masque &= mois >= self.debut
+        if self.fin is not None:
+            masque &= mois <= self.fin
+        return masque
+    
+    def apply(self, data):
+        """Vue filtrée d'une entrée de territoire : historique, instantané courant et index"""
+        if self.key is None:
+            return data
+        vue = {**data, 'filtre': self.key,
+               'historical_data': data['partitions'].select(self.debut, self.fin, self.categories)}
+        if self.categories is not None:
+            positions = data['query_index'].positions(self.categories)
+            vue['current_data'] = data['current_data'].iloc[positions]
+            vue['query_index'] = data['query_index'].subset(positions)
+        return vue
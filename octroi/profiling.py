@@ -0,0 +1,128 @@
+"""Profilage du rendu : durée, temps pandas, éléments Streamlit et taille des figures"""
+import sys
+import time
+from contextlib import contextmanager
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+class RenderProfiler:
+    """Profil d'une exécution du script, par section et par graphique
+    
+    Chaque span mesure sa durée, le temps passé dans du code pandas (suivi des
+    appels par sys.setprofile), le nombre d'éléments Streamlit émis (messages delta
+    interceptés sur le contexte d'exécution) et la taille des figures servies. Les
+    spans s'imbriquent : une section inclut ses graphiques. Inactif, le profileur
+    ne coûte rien.
+    """
+    
+    def __init__(self, active=False):
+        self.active = active
+        self.spans = []
+        self.elements = 0
+        self.payload = 0
+        self.temps_pandas = 0.0
+        self._origine = time.perf_counter()
+        self._profondeur_pandas = 0
+        self._debut_pandas = None
+        self._ctx = None
+    
+    def start(self):
+        """Branche les compteurs sur le fil du script"""
+        if not self.active:
+            return self
+        self._ctx = get_script_run_ctx()
+        if self._ctx is not None:
+            enqueue = self._ctx.enqueue
+            
+            def compter(msg):
+                if msg.HasField('delta'):
+                    self.elements += 1
+                enqueue(msg)
+            self._ctx.enqueue = compter
+        sys.setprofile(self._profile)
+        return self
+    
+    def stop(self):
+        """Débranche les compteurs"""
+        if not self.active:
+            return
+        sys.setprofile(None)
+        if self._ctx is not None:
+            del self._ctx.enqueue
+            self._ctx = None
+    
+    def _profile(self, frame, event, arg):
+        # Temps inclusif des appels entrés dans pandas depuis du code hors pandas
+        if event == 'call':
+            if self._profondeur_pandas:
+                self._profondeur_pandas += 1
+            elif '/pandas/' in frame.f_code.co_filename:
+                self._profondeur_pandas = 1
+                self._debut_pandas = time.perf_counter()
+        elif event == 'return' and self._profondeur_pandas:
+            self._profondeur_pandas -= 1
+            if not self._profondeur_pandas:
+                self.temps_pandas += time.perf_counter() - self._debut_pandas
+    
+    @contextmanager
+    def span(self, nom, categorie):
+        """Mesure un bloc (section ou graphique)"""
+        if not self.active:
+            yield
+            return
+        debut = time.perf_counter()
+        pandas, elements, payload = self.temps_pandas, self.elements, self.payload
+        try:
+            yield
+        finally:
+            fin = time.perf_counter()
+            self.spans.append({
+                'nom': nom,
+                'categorie': categorie,
+                'debut': debut - self._origine,
+                'duree': fin - debut,
+                'pandas': self.temps_pandas - pandas,
+                'elements': self.elements - elements,
+                'payload': self.payload - payload
+            })
+    
+    def record_payload(self, nbytes):
+        """Ajoute la taille d'une figure envoyée au navigateur"""
+        self.payload += nbytes
+    
+    def table(self):
+        """Spans dans l'ordre d'exécution (lignes prêtes à afficher)"""
+        return [
+            {
+                'Bloc': span['nom'],
+                'Type': span['categorie'],
+                'Durée (ms)': span['duree'] * 1000,
+                'pandas (ms)': span['pandas'] * 1000,
+                'Éléments': span['elements'],
+                'Figures (Ko)': span['payload'] / 1024
+            }
+            for span in sorted(self.spans, key=lambda span: span['debut'])
+        ]
+    
+    def to_chrome_trace(self):
+        """Trace au format Chrome Trace Event (chrome://tracing, Perfetto, speedscope)"""
+        return {
+            'displayTimeUnit': 'ms',
+            'traceEvents': [
+                {
+                    'name': span['nom'],
+                    'cat': span['categorie'],
+                    'ph': 'X',
+                    'ts': span['debut'] * 1e6,
+                    'dur': span['duree'] * 1e6,
+                    'pid': 1,
+                    'tid': 1,
+                    'args': {
+                        'pandas_ms': span['pandas'] * 1000,
+                        'elements': span['elements'],
+                        'payload_octets': span['payload']
+                    }
+                }
+                for span in self.spans
+            ]
+        }
@@ -0,0 +1,87 @@
+"""Index de requête du tableau des revenus (filtres et tris sans copie)"""
+import numpy as np
+
+from .live import LiveUpdateEngine
+
+# Colonnes de tri du tableau des revenus
+COLONNES_TRI = {
+    'Revenu mensuel': 'revenu_mensuel',
+    'Variation %': 'variation_pct',
+    'Volume importation': 'volume_importation',
+    'Taux normal': 'taux_normal'
+}
+
+class SecteurQueryIndex:
+    """Index de requête sur un instantané courant (filtres et tris sans copie)
+    
+    Les permutations de tri décroissant sont précalculées pour chaque clé de
+    COLONNES_TRI, et chaque catégorie ou tranche de performance dispose d'un
+    masque booléen. Une vue filtrée et triée est l'intersection d'une permutation
+    et d'un masque : un tableau de positions dans l'instantané.
+    """
+    
+    def __init__(self, current_data, categories=None):
+        if categories is None:
+            categories = {
+                categorie: (current_data['categorie'] == categorie).to_numpy()
+                for categorie in current_data['categorie'].unique()
+            }
+        self.categories = categories
+        self.taille = len(current_data)
+        self.ordres = {}
+        for colonne in COLONNES_TRI.values():
+            self.ordres[colonne] = np.argsort(-current_data[colonne].to_numpy(), kind='stable')
+        self.performances = self._performances(current_data['variation_pct'].to_numpy())
+    
+    @staticmethod
+    def _performances(variation):
+        return {
+            'En croissance': variation > 0,
+            'En décroissance': variation < 0,
+            'Stable': variation == 0
+        }
+    
+    def with_live_values(self, current_data):
+        """Index d'un instantané dont seules les colonnes en direct ont changé"""
+        index = SecteurQueryIndex.__new__(SecteurQueryIndex)
+        index.__dict__.update(self.__dict__)
+        index.ordres = dict(self.ordres)
+        for colonne in LiveUpdateEngine.COLONNES:
+            if colonne in index.ordres:
+                index.ordres[colonne] = np.argsort(-current_data[colonne].to_numpy(), kind='stable')
+        index.performances = self._performances(current_data['variation_pct'].to_numpy())
+        return index
+    
+    def positions(self, categories):
+        """Positions croissantes des lignes appartenant à l'une des catégories"""
+        masque = np.zeros(self.taille, dtype=bool)
+        for categorie in categories:
+            if categorie in self.categories:
+                masque |= self.categories[categorie]
+        return np.flatnonzero(masque)
+    
+    def subset(self, positions):
+        """Index d'un sous-ensemble de lignes (positions croissantes), sans nouveau tri"""
+        rangs = np.full(self.taille, -1)
+        rangs[positions] = np.arange(len(positions))
+        index = SecteurQueryIndex.__new__(SecteurQueryIndex)
+        index.taille = len(positions)
+        index.categories = {
+            categorie: masque[positions] for categorie, masque in self.categories.items() if masque[positions].any()
+        }
+        index.ordres = {colonne: rangs[ordre][rangs[ordre] >= 0] for colonne, ordre in self.ordres.items()}
+        index.performances = {nom: masque[positions] for nom, masque in self.performances.items()}
+        return index
+    
+    def query(self, tri, categorie=None, performance=None):
+        """Positions des lignes retenues, dans l'ordre décroissant de la clé de tri"""
+        masques = []
+        if categorie is not None:
+            masques.append(self.categories.get(categorie, np.zeros(self.taille, dtype=bool)))
+        if performance is not None:
+            masques.append(self.performances[performance])
+        ordre = self.ordres[tri]
+        if not masques:
+            return ordre
+        masque = masques[0] if len(masques) == 1 else np.logical_and(*masques)
+        return ordre[masque[ordre]]
@@ -0,0 +1,51 @@
+"""Scénarios de simulation : graines explicites et flux aléatoires reproductibles par territoire"""
+import hashlib
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import streamlit as st
+
+GRAINE_DEFAUT = 2025
+
+def stable_int(*parties, bits=32):
+    """Entier stable d'un processus à l'autre (hash() des chaînes varie à chaque lancement)"""
+    empreinte = hashlib.sha1(':'.join(str(partie) for partie in parties).encode('utf-8')).digest()
+    return int.from_bytes(empreinte[:8], 'big') >> (64 - bits)
+
+@dataclass(frozen=True)
+class Scenario:
+    """Scénario de simulation : un nom et une graine, immuable
+    
+    Chaque tirage passe par un flux nommé (historique, courant, direct…) propre à
+    un territoire : le flux est dérivé de la graine par SeedSequence, si bien que
+    deux sessions, deux réexécutions ou deux processus tirent les mêmes valeurs.
+    Le hash et la clé sont stables entre processus : le scénario sert d'argument
+    des caches et entre dans la clé des instantanés et la version des données.
+    """
+    nom: str = 'reference'
+    seed: int = GRAINE_DEFAUT
+    
+    @property
+    def key(self):
+        """Clé stable du scénario"""
+        return f"{self.nom}-{self.seed}-{stable_int(self.nom, self.seed):08x}"
+    
+    def __hash__(self):
+        return stable_int(self.nom, self.seed, bits=63)
+    
+    def seed_sequence(self, territory_code, flux, *indices):
+        """Séquence de graines du flux d'un territoire (indices : numéro de lot, version…)"""
+        return np.random.SeedSequence(
+            self.seed, spawn_key=(stable_int(territory_code), stable_int(flux), *indices)
+        )
+    
+    def rng(self, territory_code, flux, *indices):
+        """Générateur NumPy du flux d'un territoire"""
+        return np.random.default_rng(self.seed_sequence(territory_code, flux, *indices))
+
+@st.cache_resource
+def get_scenario():
+    """Scénario du processus (OCTROI_SCENARIO pour le nom, OCTROI_SEED pour la graine)"""
+    return Scenario(nom=os.environ.get('OCTROI_SCENARIO', 'reference'),
+                    seed=int(os.environ.get('OCTROI_SEED', GRAINE_DEFAUT)))
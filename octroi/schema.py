@@ -0,0 +1,59 @@
+"""Schéma compact des tables : catégories partagées, float32 et index mensuel"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .definitions import get_territories_definitions, get_secteurs_definitions
+
+# Colonnes de l'historique dont la précision float32 suffit (volumes, taux)
+HISTORIQUE_FLOAT32 = ('volume_importation', 'taux_moyen')
+
+@lru_cache(maxsize=1)
+def get_schema_dtypes():
+    """Types catégoriels partagés par tous les territoires (territoire, secteur, catégorie)"""
+    territoires = get_territories_definitions()
+    secteurs, categories = {}, {}
+    for territory_code in territoires:
+        for secteur_code, info in get_secteurs_definitions(territory_code).items():
+            secteurs.setdefault(secteur_code)
+            categories.setdefault(info['categorie'])
+    # Dictionnaires triés : les regroupements gardent l'ordre des chaînes d'origine
+    return {
+        'territoire': pd.CategoricalDtype(sorted(territoires)),
+        'secteur': pd.CategoricalDtype(sorted(secteurs)),
+        'categorie': pd.CategoricalDtype(sorted(categories))
+    }
+
+def _as_shared_categorical(serie, dtype):
+    # Les valeurs hors dictionnaire (extraits réels) l'étendent au lieu de devenir NaN
+    inconnues = pd.Index(serie.dropna().unique()).difference(dtype.categories)
+    if len(inconnues):
+        dtype = pd.CategoricalDtype(dtype.categories.union(inconnues))
+    return serie.astype(dtype)
+
+def enforce_schema(frame, float32_columns=()):
+    """Applique le schéma compact : catégories partagées et float32 pour les colonnes données"""
+    colonnes = {
+        col: _as_shared_categorical(frame[col], dtype)
+        for col, dtype in get_schema_dtypes().items() if col in frame
+    }
+    colonnes.update({col: frame[col].astype(np.float32) for col in float32_columns if col in frame})
+    return frame.assign(**colonnes)
+
+def enforce_history_schema(historical_data):
+    """Schéma compact de l'historique, indexé par mois (PeriodIndex mensuel)"""
+    historique = enforce_schema(historical_data, HISTORIQUE_FLOAT32)
+    if 'date' in historique:
+        historique.index = pd.PeriodIndex(historique['date'].dt.to_period('M'), name='mois')
+    return historique
+
+def schema_memory_report(historical_data):
+    """Empreinte mémoire de l'historique (octets) avant et après le schéma compact"""
+    types_origine = {col: object for col in get_schema_dtypes() if col in historical_data}
+    types_origine.update({col: np.float64 for col in HISTORIQUE_FLOAT32 if col in historical_data})
+    origine = historical_data.reset_index(drop=True).astype(types_origine)
+    return {
+        'avant': int(origine.memory_usage(index=True, deep=True).sum()),
+        'apres': int(historical_data.memory_usage(index=True, deep=True).sum())
+    }
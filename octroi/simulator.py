@@ -0,0 +1,145 @@
+"""Simulateur d'Octroi de Mer : index des taux et calcul par lots"""
+import numpy as np
+import pandas as pd
+
+# Types de taux proposés par le simulateur → colonne de taux du secteur
+TYPES_TAUX = {
+    'Normal': 'taux_normal',
+    'Réduit': 'taux_reduit',
+    'Spécifique': 'taux_specifique'
+}
+
+# Règles d'origine : part du taux due selon la provenance de la marchandise.
+# Les importations de métropole, de l'UE et des pays tiers supportent le taux plein ;
+# les livraisons en provenance d'un autre DOM sont exonérées.
+COEFFICIENTS_ORIGINE = {
+    'France': 1.0,
+    'UE': 1.0,
+    'Pays tiers': 1.0,
+    'DOM': 0.0
+}
+
+class RateIndex:
+    """Index des taux d'un territoire, construit une fois au chargement
+    
+    Les taux sont rangés dans un tableau compact (secteurs × types de taux) et
+    chaque produit pointe vers la ligne de son secteur. Les recherches, unitaires
+    (simulateur) ou par lot (fichiers de déclarations), passent par des tables de
+    hachage, sans parcourir les définitions ni les données produit.
+    """
+    
+    def __init__(self, secteurs, product_data=None):
+        self.secteurs = pd.Index(list(secteurs.keys()))
+        self.taux = np.array(
+            [[info[colonne] for colonne in TYPES_TAUX.values()] for info in secteurs.values()],
+            dtype=float
+        )
+        
+        if product_data is None:
+            product_data = pd.DataFrame(columns=['produit', 'secteur', 'taux_octroi', 'volume'])
+        self.produits = pd.Index(product_data['produit'])
+        self.produit_secteur = self.secteur_positions(product_data['secteur'])
+        self.taux_octroi = product_data['taux_octroi'].to_numpy(dtype=float)
+        self._positions_produit = {produit: pos for pos, produit in enumerate(self.produits)}
+        
+        # Table produit → secteur et taux, partagée par l'onglet produits
+        taux_produits = self.taux[self.produit_secteur.clip(0)]
+        taux_produits[self.produit_secteur < 0] = np.nan
+        self.table_produits = product_data[['produit', 'secteur', 'taux_octroi', 'volume']].assign(
+            **{colonne: taux_produits[:, i] for i, colonne in enumerate(TYPES_TAUX.values())}
+        )
+    
+    def secteur_positions(self, codes):
+        """Position de chaque code secteur dans l'index (-1 si inconnu)"""
+        return self.secteurs.get_indexer(codes)
+    
+    def produit_positions(self, produits):
+        """Position du secteur de chaque produit dans l'index (-1 si inconnu)"""
+        positions = self.produits.get_indexer(produits)
+        return np.where(positions >= 0, self.produit_secteur[positions.clip(0)], -1)
+    
+    def lookup(self, produit):
+        """Secteur et taux d'un produit, en temps constant (KeyError si produit ou secteur inconnu)"""
+        pos = self._positions_produit[produit]
+        secteur_pos = self.produit_secteur[pos]
+        if secteur_pos < 0:
+            # -1 indexerait le dernier secteur : même rejet que le calcul par lots
+            raise KeyError(f"secteur inconnu pour le produit {produit!r}")
+        taux = self.taux[secteur_pos]
+        return {
+            'secteur': self.secteurs[secteur_pos],
+            **{colonne: float(taux[i]) for i, colonne in enumerate(TYPES_TAUX.values())},
+            'taux_octroi': float(self.taux_octroi[pos])
+        }
+
+def _category_codes(values, categories):
+    """Codes entiers des valeurs dans une liste de catégories (-1 si inconnue)"""
+    return pd.Categorical(values, categories=categories).codes.astype(np.int64)
+
+def calculer_octroi_batch(declarations, rate_index, type_taux_defaut='Normal', origine_defaut='France'):
+    """Calcule l'Octroi de Mer de toutes les lignes d'un fichier de déclarations
+    
+    Colonnes attendues : ``secteur`` ou ``produit``, ``valeur`` (valeur imposable
+    en €), et facultativement ``type_taux`` (Normal/Réduit/Spécifique) et ``pays_origine``
+    (France/UE/Pays tiers/DOM). Retourne les lignes enrichies du taux appliqué et du
+    montant dû, et un dictionnaire d'agrégats. Les lignes dont le secteur (ou le
+    produit), le type de taux ou l'origine sont inconnus sont marquées rejetées.
+    """
+    n = len(declarations)
+    valeurs = pd.to_numeric(declarations['valeur'], errors='coerce').to_numpy(dtype=float)
+    types = declarations['type_taux'] if 'type_taux' in declarations else np.full(n, type_taux_defaut)
+    origines = declarations['pays_origine'] if 'pays_origine' in declarations else np.full(n, origine_defaut)
+    
+    if 'secteur' in declarations:
+        positions = rate_index.secteur_positions(declarations['secteur'])
+        cle_inconnue = 'secteur inconnu'
+    else:
+        positions = rate_index.produit_positions(declarations['produit'])
+        cle_inconnue = 'produit inconnu'
+    codes_taux = _category_codes(types, list(TYPES_TAUX))
+    codes_origine = _category_codes(origines, list(COEFFICIENTS_ORIGINE))
+    valides = (positions >= 0) & (codes_taux >= 0) & (codes_origine >= 0) & ~np.isnan(valeurs)
+    
+    taux = np.where(valides, rate_index.taux[positions.clip(0), codes_taux.clip(0)], np.nan)
+    coefficients = np.fromiter(COEFFICIENTS_ORIGINE.values(), dtype=float)[codes_origine.clip(0)]
+    montants = np.where(valides, valeurs * (taux / 100) * coefficients, 0.0)
+    
+    statut = np.select(
+        [positions < 0, codes_taux < 0, codes_origine < 0, np.isnan(valeurs)],
+        [cle_inconnue, 'type de taux inconnu', 'origine inconnue', 'valeur invalide'],
+        default='ok'
+    )
+    lignes = declarations.assign(
+        taux_applique=taux,
+        coefficient_origine=np.where(valides, coefficients, np.nan),
+        montant_octroi=montants,
+        statut=statut
+    )
+    
+    # Agrégats par secteur et par origine en une passe (bincount pondéré)
+    valeurs_valides = np.where(valides, valeurs, 0.0)
+    pos_valides = positions[valides]
+    orig_valides = codes_origine[valides]
+    n_secteurs, n_origines = len(rate_index.secteurs), len(COEFFICIENTS_ORIGINE)
+    par_secteur = pd.DataFrame({
+        'secteur': rate_index.secteurs,
+        'lignes': np.bincount(pos_valides, minlength=n_secteurs),
+        'valeur': np.bincount(pos_valides, weights=valeurs_valides[valides], minlength=n_secteurs),
+        'montant_octroi': np.bincount(pos_valides, weights=montants[valides], minlength=n_secteurs)
+    })
+    par_origine = pd.DataFrame({
+        'pays_origine': list(COEFFICIENTS_ORIGINE),
+        'lignes': np.bincount(orig_valides, minlength=n_origines),
+        'valeur': np.bincount(orig_valides, weights=valeurs_valides[valides], minlength=n_origines),
+        'montant_octroi': np.bincount(orig_valides, weights=montants[valides], minlength=n_origines)
+    })
+    
+    agregats = {
+        'lignes': n,
+        'lignes_rejetees': int(n - valides.sum()),
+        'valeur_totale': float(valeurs_valides.sum()),
+        'montant_total': float(montants.sum()),
+        'par_secteur': par_secteur[par_secteur['lignes'] > 0].reset_index(drop=True),
+        'par_origine': par_origine[par_origine['lignes'] > 0].reset_index(drop=True)
+    }
+    return lignes, agregats
@@ -0,0 +1,343 @@
+"""Backends de données : simulation, fichiers Parquet et instantanés mappés"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+
+import streamlit as st
+
+from .definitions import get_secteurs_definitions
+from .partitions import PartitionedHistory
+from .scenario import Scenario, get_scenario
+from .schema import enforce_history_schema
+from .generators import (
+    _historical_dates, build_current_data_from_history, generate_current_data,
+    generate_historical_data, generate_product_data
+)
+
+class DataSource:
+    """Source de données d'un territoire (interface commune des backends)"""
+    nom = 'abstraite'
+    
+    def load_territory(self, territory_code):
+        """Retourne les secteurs, l'historique, l'instantané courant et les produits
+        
+        'snapshot_key' est la clé des données effectivement lues (None sans
+        instantané) : la version des données en dérive.
+        """
+        raise NotImplementedError
+    
+    def snapshot_key(self, territory_code):
+        """Clé de validité des instantanés d'un territoire (None : pas d'instantané)"""
+        return None
+
+class SyntheticDataSource(DataSource):
+    """Backend simulé : données produites par les générateurs"""
+    nom = 'simulation'
+    
+    def __init__(self, scenario=None):
+        self.scenario = scenario or Scenario()
+    
+    def snapshot_key(self, territory_code):
+        # L'historique simulé s'arrête au mois courant ; ses tirages dépendent du scénario
+        return f"{self.nom}:{self.scenario.key}:{_historical_dates()[-1]:%Y-%m}"
+    
+    def load_territory(self, territory_code):
+        # Clé prise avant la génération : un changement de mois pendant le chargement
+        # ne peut pas étiqueter l'ancien historique avec la nouvelle clé
+        key = self.snapshot_key(territory_code)
+        secteurs = get_secteurs_definitions(territory_code)
+        historical_data = generate_historical_data(territory_code, secteurs, self.scenario)
+        current_data = generate_current_data(territory_code, secteurs, historical_data, self.scenario)
+        product_data = generate_product_data(territory_code)
+        
+        return {
+            'secteurs': secteurs,
+            'historical_data': historical_data,
+            'current_data': current_data,
+            'product_data': product_data,
+            'snapshot_key': key
+        }
+
+class FileDataSource(DataSource):
+    """Backend fichiers : extraits douaniers CSV convertis une fois en Parquet partitionné
+    
+    Le magasin est partitionné en Hive par territoire puis par mois
+    (``territoire=REUNION/mois=2024-01/...``) : la sélection d'un territoire ne lit
+    que son répertoire et que les colonnes demandées.
+    """
+    nom = 'fichiers'
+    COLONNES = ['date', 'territoire', 'secteur', 'categorie',
+                'revenu_octroi', 'volume_importation', 'taux_moyen']
+    MANIFESTE = '_ingestion.json'
+    
+    def __init__(self, store_dir, csv_dir=None):
+        self.store_dir = store_dir
+        self.csv_dir = csv_dir
+        # Une seule synchronisation à la fois (préchauffage en parallèle)
+        self._lock = threading.RLock()
+        os.makedirs(store_dir, exist_ok=True)
+    
+    @staticmethod
+    def _pyarrow():
+        try:
+            import pyarrow
+            import pyarrow.compute
+            import pyarrow.csv
+            import pyarrow.dataset
+            import pyarrow.ipc
+        except ImportError as exc:
+            raise ImportError("Le backend fichiers nécessite pyarrow (pip install pyarrow)") from exc
+        return pyarrow
+    
+    def _schema(self):
+        pa = self._pyarrow()
+        return pa.schema([
+            ('date', pa.timestamp('ns')),
+            ('territoire', pa.string()),
+            ('secteur', pa.string()),
+            ('categorie', pa.string()),
+            ('revenu_octroi', pa.float64()),
+            ('volume_importation', pa.float64()),
+            ('taux_moyen', pa.float64())
+        ])
+    
+    def _read_manifest(self):
+        chemin = os.path.join(self.store_dir, self.MANIFESTE)
+        if not os.path.exists(chemin):
+            return {}
+        with open(chemin, encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _write_manifest(self, manifeste):
+        with open(os.path.join(self.store_dir, self.MANIFESTE), 'w', encoding='utf-8') as f:
+            json.dump(manifeste, f, indent=2)
+    
+    def ingest_csv(self, csv_path, block_size=64 << 20):
+        """Convertit un extrait CSV en partitions Parquet, par blocs (sans tout charger)"""
+        pa = self._pyarrow()
+        schema = self._schema()
+        reader = pa.csv.open_csv(
+            csv_path,
+            read_options=pa.csv.ReadOptions(block_size=block_size),
+            convert_options=pa.csv.ConvertOptions(
+                column_types={field.name: field.type for field in schema},
+                include_columns=self.COLONNES
+            )
+        )
+        schema_partitionne = schema.append(pa.field('mois', pa.string()))
+        
+        def batches():
+            for batch in reader:
+                batch = batch.select(self.COLONNES)
+                mois = pa.compute.strftime(batch.column('date'), format='%Y-%m')
+                yield pa.RecordBatch.from_arrays(batch.columns + [mois], schema=schema_partitionne)
+        
+        stem = os.path.splitext(os.path.basename(csv_path))[0]
+        pa.dataset.write_dataset(
+            batches(),
+            self.store_dir,
+            schema=schema_partitionne,
+            format='parquet',
+            partitioning=pa.dataset.partitioning(
+                pa.schema([('territoire', pa.string()), ('mois', pa.string())]), flavor='hive'
+            ),
+            basename_template=f'{stem}-{{i}}.parquet',
+            existing_data_behavior='overwrite_or_ignore'
+        )
+    
+    def remove_ingested(self, stem):
+        """Supprime les fichiers Parquet issus d'un extrait, et les partitions ainsi vidées"""
+        motif = re.compile(rf'{re.escape(stem)}-\d+\.parquet')
+        for racine, _, fichiers in os.walk(self.store_dir, topdown=False):
+            for fichier in fichiers:
+                if motif.fullmatch(fichier):
+                    os.remove(os.path.join(racine, fichier))
+            if '=' in os.path.basename(racine) and not os.listdir(racine):
+                os.rmdir(racine)
+    
+    def sync(self):
+        """Convertit les CSV du répertoire source nouveaux ou modifiés depuis leur ingestion
+        
+        Un extrait modifié remplace toutes ses partitions : les fichiers de son
+        ingestion précédente sont supprimés avant la réécriture.
+        """
+        if not self.csv_dir or not os.path.isdir(self.csv_dir):
+            return []
+        with self._lock:
+            manifeste = self._read_manifest()
+            nouveaux = []
+            
+            for nom in sorted(os.listdir(self.csv_dir)):
+                if not nom.lower().endswith('.csv'):
+                    continue
+                chemin = os.path.join(self.csv_dir, nom)
+                stat = os.stat(chemin)
+                signature = [stat.st_size, stat.st_mtime]
+                if manifeste.get(nom) == signature:
+                    continue
+                self.remove_ingested(os.path.splitext(nom)[0])
+                self.ingest_csv(chemin)
+                manifeste[nom] = signature
+                nouveaux.append(nom)
+            
+            if nouveaux:
+                self._write_manifest(manifeste)
+            return nouveaux
+    
+    def load_history(self, territory_code, columns=None, mois_debut=None, mois_fin=None):
+        """Lit l'historique d'un territoire : uniquement sa partition et les colonnes demandées"""
+        pa = self._pyarrow()
+        repertoire = os.path.join(self.store_dir, f'territoire={territory_code}')
+        colonnes = [c for c in (columns or self.COLONNES) if c != 'territoire']
+        if os.path.isdir(repertoire):
+            dataset = pa.dataset.dataset(
+                repertoire, format='parquet',
+                partitioning=pa.dataset.partitioning(pa.schema([('mois', pa.string())]), flavor='hive')
+            )
+            filtre = None
+            if mois_debut is not None:
+                filtre = pa.dataset.field('mois') >= mois_debut
+            if mois_fin is not None:
+                borne = pa.dataset.field('mois') <= mois_fin
+                filtre = borne if filtre is None else filtre & borne
+            historique = dataset.to_table(columns=colonnes, filter=filtre).to_pandas()
+        else:
+            # Territoire sans extrait : historique vide, mais typé comme les autres
+            historique = self._schema().empty_table().select(colonnes).to_pandas()
+        if columns is None or 'territoire' in columns:
+            historique.insert(1, 'territoire', territory_code)
+        historique = historique.sort_values(['date', 'secteur'], kind='stable').reset_index(drop=True)
+        return enforce_history_schema(historique)
+    
+    def _manifest_key(self):
+        manifeste = json.dumps(self._read_manifest(), sort_keys=True)
+        return f"{self.nom}:{hashlib.sha1(manifeste.encode('utf-8')).hexdigest()}"
+    
+    def snapshot_key(self, territory_code):
+        with self._lock:
+            self.sync()
+            return self._manifest_key()
+    
+    def load_territory(self, territory_code):
+        secteurs = get_secteurs_definitions(territory_code)
+        # Clé et historique lus sous le même verrou : aucune ingestion entre les deux
+        with self._lock:
+            self.sync()
+            key = self._manifest_key()
+            historical_data = self.load_history(territory_code)
+        
+        return {
+            'secteurs': secteurs,
+            'historical_data': historical_data,
+            'current_data': build_current_data_from_history(territory_code, secteurs, historical_data),
+            'product_data': generate_product_data(territory_code),
+            'snapshot_key': key
+        }
+
+class SnapshotDataSource(DataSource):
+    """Instantanés sur disque devant un backend, ouverts en mémoire mappée
+    
+    Chaque territoire est sérialisé une fois dans un répertoire de fichiers Arrow IPC
+    non compressés (historique, instantané courant, produits) et d'un JSON des
+    secteurs. Au redémarrage, les colonnes numériques sont lues sans copie depuis
+    les pages mappées, que plusieurs processus serveur partagent via le cache du
+    système. Un instantané dont la clé ne correspond plus au backend est réécrit.
+    """
+    FORMAT = 2
+    FRAMES = ('historical_data', 'current_data', 'product_data')
+    
+    def __init__(self, source, snapshot_dir):
+        self.source = source
+        self.snapshot_dir = snapshot_dir
+        self.nom = f"{source.nom} (instantanés)"
+        os.makedirs(snapshot_dir, exist_ok=True)
+    
+    def _directory(self, territory_code):
+        return os.path.join(self.snapshot_dir, territory_code)
+    
+    def open(self, territory_code, key):
+        """Ouvre l'instantané d'un territoire s'il est à jour, sinon retourne None"""
+        pa = FileDataSource._pyarrow()
+        repertoire = self._directory(territory_code)
+        try:
+            with open(os.path.join(repertoire, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('format') != self.FORMAT or meta.get('cle') != key:
+            return None
+        
+        with open(os.path.join(repertoire, 'secteurs.json'), encoding='utf-8') as f:
+            data = {'secteurs': json.load(f)}
+        for nom in self.FRAMES:
+            table = pa.ipc.open_file(pa.memory_map(os.path.join(repertoire, f'{nom}.arrow'), 'r')).read_all()
+            # split_blocks évite la consolidation : les colonnes numériques restent mappées
+            data[nom] = table.to_pandas(split_blocks=True)
+        return data
+    
+    def write(self, territory_code, data, key):
+        """Écrit l'instantané d'un territoire (répertoire temporaire puis renommage)"""
+        pa = FileDataSource._pyarrow()
+        temporaire = os.path.join(self.snapshot_dir, f'.{territory_code}-{uuid.uuid4().hex}')
+        os.makedirs(temporaire)
+        try:
+            with open(os.path.join(temporaire, 'secteurs.json'), 'w', encoding='utf-8') as f:
+                json.dump(data['secteurs'], f, ensure_ascii=False)
+            for nom in self.FRAMES:
+                table = pa.Table.from_pandas(data[nom])
+                with pa.OSFile(os.path.join(temporaire, f'{nom}.arrow'), 'wb') as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+            with open(os.path.join(temporaire, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({'format': self.FORMAT, 'cle': key}, f)
+            
+            # Les processus qui mappent encore l'ancien instantané gardent leurs pages
+            repertoire = self._directory(territory_code)
+            if os.path.exists(repertoire):
+                ancien = f'{temporaire}-ancien'
+                os.replace(repertoire, ancien)
+                shutil.rmtree(ancien, ignore_errors=True)
+            os.replace(temporaire, repertoire)
+        except OSError:
+            # Un autre processus a publié le même instantané entre-temps
+            shutil.rmtree(temporaire, ignore_errors=True)
+    
+    def snapshot_key(self, territory_code):
+        return self.source.snapshot_key(territory_code)
+    
+    def load_territory(self, territory_code):
+        key = self.source.snapshot_key(territory_code)
+        if key is None:
+            return self.source.load_territory(territory_code)
+        data = self.open(territory_code, key)
+        if data is None:
+            data = self.source.load_territory(territory_code)
+            # Instantané étiqueté par la clé des données lues, qui peut être plus récente
+            key = data.get('snapshot_key') or key
+            # Historique écrit rangé par partition : à la réouverture, il est déjà dans
+            # l'ordre de PartitionedHistory, qui le garde sans copier les pages mappées
+            data['historical_data'] = PartitionedHistory(data['historical_data']).data
+            self.write(territory_code, data, key)
+        data['snapshot_key'] = key
+        return data
+
+@st.cache_resource
+def get_data_source():
+    """Backend de données du processus
+    
+    OCTROI_DATA_DIR active le backend fichiers, OCTROI_SNAPSHOT_DIR les instantanés
+    mappés en mémoire devant le backend. La simulation suit le scénario du processus.
+    """
+    store_dir = os.environ.get('OCTROI_DATA_DIR')
+    if store_dir:
+        source = FileDataSource(store_dir, csv_dir=os.environ.get('OCTROI_CSV_DIR'))
+    else:
+        source = SyntheticDataSource(get_scenario())
+    snapshot_dir = os.environ.get('OCTROI_SNAPSHOT_DIR')
+    if snapshot_dir:
+        return SnapshotDataSource(source, snapshot_dir)
+    return source
@@ -0,0 +1,202 @@
+"""Magasin partagé des territoires et préchauffage au démarrage"""
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict, Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from types import MappingProxyType
+
+import pandas as pd
+import streamlit as st
+
+from .definitions import get_territories_definitions
+from .metrics import cache_samples, get_metrics
+from .partitions import PartitionedHistory
+from .query import SecteurQueryIndex
+from .scenario import stable_int
+from .simulator import RateIndex
+from .sources import get_data_source
+
+class TerritoryDataStore:
+    """Magasin des données de territoire partagé par toutes les sessions du processus
+    
+    Chaque entrée est immuable (les sessions ne la modifient jamais et gardent leurs
+    mises à jour en direct dans un calque séparé). Les entrées sont comptées par
+    référence : seules celles qu'aucune session ne consulte peuvent être évincées,
+    dans l'ordre LRU, dès que le budget mémoire est dépassé.
+    """
+    
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._refcounts = Counter()
+        self._lock = threading.RLock()
+        self._load_locks = {}
+    
+    @staticmethod
+    def _memory_usage(data):
+        return int(sum(
+            value.memory_usage(index=True, deep=True).sum()
+            for value in data.values() if isinstance(value, pd.DataFrame)
+        ))
+    
+    def __contains__(self, territory_code):
+        with self._lock:
+            return territory_code in self._entries
+    
+    def get(self, territory_code, loader):
+        """Retourne l'entrée d'un territoire, chargée une seule fois via loader"""
+        with self._lock:
+            if territory_code in self._entries:
+                self._entries.move_to_end(territory_code)
+                self.hits += 1
+                return self._entries[territory_code]
+            load_lock = self._load_locks.setdefault(territory_code, threading.Lock())
+        
+        # Un seul chargement par territoire, même si plusieurs sessions le demandent
+        with load_lock:
+            with self._lock:
+                if territory_code in self._entries:
+                    self._entries.move_to_end(territory_code)
+                    self.hits += 1
+                    return self._entries[territory_code]
+                self.misses += 1
+            
+            data = loader(territory_code)
+            entry = MappingProxyType(dict(data))
+            with self._lock:
+                self._entries[territory_code] = entry
+                self._sizes[territory_code] = self._memory_usage(data)
+                self._evict()
+            return entry
+    
+    def acquire(self, territory_code):
+        with self._lock:
+            self._refcounts[territory_code] += 1
+    
+    def release(self, territory_code):
+        with self._lock:
+            self._refcounts[territory_code] -= 1
+            if self._refcounts[territory_code] <= 0:
+                del self._refcounts[territory_code]
+            self._evict()
+    
+    def leased(self):
+        """Territoires consultés par au moins une session"""
+        with self._lock:
+            return set(self._refcounts)
+    
+    def _evict(self):
+        """Évince les entrées non référencées les moins récemment utilisées"""
+        total = sum(self._sizes.values())
+        for territory_code in list(self._entries):
+            if total <= self.budget_bytes:
+                break
+            if self._refcounts[territory_code] > 0:
+                continue
+            del self._entries[territory_code]
+            total -= self._sizes.pop(territory_code)
+            self.evictions += 1
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'entrees': len(self._entries),
+                'memoire_octets': sum(self._sizes.values()),
+                'budget_octets': self.budget_bytes,
+                'references': dict(self._refcounts),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+class TerritoryLease:
+    """Référence d'une session sur une entrée du magasin, rendue à la fin de la session"""
+    
+    def __init__(self, store, territory_code):
+        self.territory_code = territory_code
+        store.acquire(territory_code)
+        self._finalizer = weakref.finalize(self, store.release, territory_code)
+    
+    def release(self):
+        self._finalizer()
+
+@st.cache_resource
+def get_territory_store():
+    """Magasin partagé du processus (budget via OCTROI_CACHE_BUDGET_MB)"""
+    budget_mb = float(os.environ.get('OCTROI_CACHE_BUDGET_MB', 1024))
+    store = TerritoryDataStore(int(budget_mb * 1024 * 1024))
+    get_metrics().add_collector(lambda: cache_samples('territoires', store.stats()))
+    return store
+
+def build_territory_entry(data_source, territory_code):
+    """Construit l'entrée du magasin partagé d'un territoire"""
+    data = data_source.load_territory(territory_code)
+    data['rate_index'] = RateIndex(data['secteurs'], data['product_data'])
+    data['query_index'] = SecteurQueryIndex(data['current_data'])
+    data['partitions'] = PartitionedHistory(data['historical_data'])
+    data['historical_data'] = data['partitions'].data
+    data['last_update'] = datetime.now()
+    # Version dérivée de la clé des données lues : un rechargement des mêmes données
+    # (même scénario, même extrait) retrouve les entrées de tous les caches
+    key = data.get('snapshot_key')
+    data['data_version'] = stable_int(territory_code, key, bits=63) if key is not None else time.time_ns()
+    return data
+
+def warm_up_store(store, data_source, territory_codes, max_workers=None, erreurs=None):
+    """Charge les territoires en parallèle dans le magasin partagé
+    
+    Retourne la durée de chargement de chaque territoire (en secondes). Les
+    territoires déjà présents dans le magasin sont servis immédiatement. Un
+    territoire qui échoue n'arrête pas les autres : son erreur est notée dans
+    `erreurs` (territoire → message) et il sera chargé à sa première consultation.
+    """
+    def charger(territory_code):
+        debut = time.perf_counter()
+        try:
+            store.get(territory_code, lambda code: build_territory_entry(data_source, code))
+        except Exception as exc:
+            if erreurs is not None:
+                erreurs[territory_code] = repr(exc)
+            return territory_code, None
+        return territory_code, time.perf_counter() - debut
+    
+    territory_codes = list(territory_codes)
+    if not territory_codes:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, len(territory_codes)),
+                            thread_name_prefix='octroi-warmup') as pool:
+        return {code: duree for code, duree in pool.map(charger, territory_codes) if duree is not None}
+
+@st.cache_resource
+def start_warm_up():
+    """Préchauffe le magasin au démarrage du serveur, en arrière-plan (OCTROI_WARMUP=0 pour désactiver)
+    
+    Retourne le rapport de préchauffage, complété au fil de l'eau par le thread.
+    """
+    rapport = {'actif': os.environ.get('OCTROI_WARMUP', '1') != '0', 'termine': False,
+               'durees': {}, 'duree_totale': None, 'erreur': None, 'erreurs': {}}
+    if not rapport['actif']:
+        return rapport
+    
+    territory_codes = [code for code, info in get_territories_definitions().items() if info['taux_octroi_actif']]
+    store, data_source = get_territory_store(), get_data_source()
+    workers = int(os.environ.get('OCTROI_WARMUP_WORKERS', 0)) or None
+    
+    def run():
+        debut = time.perf_counter()
+        try:
+            rapport['durees'] = warm_up_store(store, data_source, territory_codes, workers, rapport['erreurs'])
+        except Exception as exc:
+            rapport['erreur'] = repr(exc)
+        rapport['duree_totale'] = time.perf_counter() - debut
+        rapport['termine'] = True
+    
+    threading.Thread(target=run, name='octroi-warmup', daemon=True).start()
+    return rapport
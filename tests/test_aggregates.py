@@ -0,0 +1,25 @@
+"""Table de comparaison : territoires avec et sans historique"""
+import numpy as np
+
+from octroi.aggregates import ComparisonEngine, build_rollups
+from octroi.definitions import get_secteurs_definitions, get_territories_definitions
+from octroi.generators import generate_historical_data
+from octroi.scenario import Scenario
+from octroi.sources import FileDataSource
+
+def test_comparison_keeps_territory_without_history(tmp_path):
+    engine = ComparisonEngine(get_territories_definitions())
+    historique = generate_historical_data('REUNION', get_secteurs_definitions('REUNION'), Scenario(seed=3))
+    vide = FileDataSource(str(tmp_path)).load_history('GUYANE')
+    assert len(vide) == 0
+    
+    engine.update('REUNION', 1, lambda: build_rollups(historique)['total_mensuel'])
+    engine.update('GUYANE', 1, lambda: build_rollups(vide)['total_mensuel'])
+    _, table = engine.snapshot()
+    table = table.set_index('territoire')
+    
+    total_mensuel = build_rollups(historique)['total_mensuel']['revenu_octroi']
+    assert table.loc['REUNION', 'revenu_octroi_total'] == total_mensuel.iloc[-1]
+    assert np.isclose(table.loc['REUNION', 'revenu_12_mois'], total_mensuel.iloc[-12:].sum())
+    assert np.isnan(table.loc['GUYANE', 'revenu_octroi_total'])
+    assert np.isnan(table.loc['GUYANE', 'contribution_octroi_pib'])
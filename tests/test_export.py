@@ -0,0 +1,24 @@
+"""Export par blocs : lignes d'une vue filtrée et triée extraites pendant l'écriture"""
+import numpy as np
+import pandas as pd
+
+from octroi.export import ExportJob
+
+def test_export_positions_matches_filtered_frame(tmp_path):
+    frame = pd.DataFrame({
+        'secteur': [f'S{i:03d}' for i in range(25)],
+        'revenu_mensuel': np.arange(25) * 1e5
+    })
+    positions = np.array([24, 3, 17, 0, 9, 12, 5])
+    
+    job = ExportJob(frame, 'CSV', 'vue', taille_bloc=3, dossier=str(tmp_path), positions=positions)
+    assert job.total == len(positions)
+    job.start()._thread.join()
+    assert job.erreur is None and job.ecrites == len(positions)
+    pd.testing.assert_frame_equal(pd.read_csv(job.chemin), frame.iloc[positions].reset_index(drop=True),
+                                  check_dtype=False)
+    
+    # Sélection vide : le fichier garde ses en-têtes
+    vide = ExportJob(frame, 'CSV', 'vide', dossier=str(tmp_path), positions=positions[:0]).start()
+    vide._thread.join()
+    assert list(pd.read_csv(vide.chemin).columns) == ['secteur', 'revenu_mensuel']
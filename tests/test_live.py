@@ -0,0 +1,98 @@
+"""Mises à jour en direct : rechargement de la base et flux du planificateur"""
+import numpy as np
+import pandas as pd
+
+from octroi.live import LiveUpdateEngine, RefreshScheduler
+from octroi.scenario import Scenario
+
+def _base(n=8):
+    return pd.DataFrame({
+        'revenu_mensuel': np.linspace(1e6, 8e6, n),
+        'variation_pct': np.linspace(-4, 4, n),
+        'volume_importation': np.linspace(1e3, 8e3, n)
+    })
+
+def _sync(engine, scheduler, territory_code):
+    # Même lecture du flux que OctroiMerDashboard.sync_live_feed
+    for version, lot in scheduler.batches_since(territory_code, engine.feed_version):
+        engine.apply(*lot, origine=('direct', version))
+        engine.feed_version = version
+
+def test_rebase_keeps_feed_position():
+    scheduler = RefreshScheduler(30, scenario=Scenario(seed=1))
+    engine = LiveUpdateEngine(_base(), base_version=1)
+    scheduler.watch('REUNION', len(engine.base))
+    for _ in range(3):
+        scheduler.tick()
+    _sync(engine, scheduler, 'REUNION')
+    avant = engine.metrics()
+    assert (engine.version, engine.feed_version) == (3, 3)
+    
+    # Base rechargée (nouvelle version, mêmes valeurs) : le journal est rejoué une fois
+    engine.rebase(_base(), 2, scheduler.version('REUNION'))
+    _sync(engine, scheduler, 'REUNION')
+    assert (engine.version, engine.feed_version) == (3, 3)
+    assert engine.metrics()['revenu_total'] == avant['revenu_total']
+
+def test_rebase_without_replay_resumes_at_scheduler_version():
+    scheduler = RefreshScheduler(30)
+    engine = LiveUpdateEngine(_base(), base_version=1)
+    scheduler.watch('REUNION', len(engine.base))
+    scheduler.tick()
+    _sync(engine, scheduler, 'REUNION')
+    scheduler.tick()
+    
+    # Secteurs modifiés : pas de rejeu, la session reprend au flux courant
+    engine.rebase(_base(10), 2, scheduler.version('REUNION'))
+    _sync(engine, scheduler, 'REUNION')
+    assert (engine.version, engine.feed_version) == (0, 2)
+    assert engine.metrics()['revenu_total'] == _base(10)['revenu_mensuel'].sum()
+
+def test_sessions_in_same_state_share_live_version():
+    scheduler = RefreshScheduler(30)
+    sessions = [LiveUpdateEngine(_base(), base_version=1) for _ in range(2)]
+    scheduler.watch('REUNION', 8)
+    scheduler.tick()
+    for engine in sessions:
+        _sync(engine, scheduler, 'REUNION')
+    assert sessions[0].etat == sessions[1].etat != 0
+    
+    # Un lot sans origine est propre à la session
+    sessions[1].apply(*sessions[1].random_batch(np.random.default_rng(0)))
+    assert sessions[0].etat != sessions[1].etat
+
+def test_watch_follows_sector_count():
+    scheduler = RefreshScheduler(30)
+    engine = LiveUpdateEngine(_base(), base_version=1)
+    scheduler.watch('REUNION', len(engine.base))
+    scheduler.tick()
+    _sync(engine, scheduler, 'REUNION')
+    
+    # Rechargement avec moins de secteurs : les lots suivants ont la nouvelle taille
+    engine.rebase(_base(5), 2, scheduler.version('REUNION'))
+    scheduler.watch('REUNION', len(engine.base))
+    assert scheduler.batches_since('REUNION', 0) == []
+    scheduler.tick()
+    scheduler.tick()
+    _sync(engine, scheduler, 'REUNION')
+    assert engine.feed_version == scheduler.version('REUNION') == 3
+    assert all(len(lot[0]) == 5 for _, lot in scheduler.batches_since('REUNION', 0))
+
+def test_territories_without_lease_are_unwatched():
+    baux = {'REUNION', 'GUYANE'}
+    scheduler = RefreshScheduler(30, territoires_actifs=lambda: set(baux))
+    scheduler.watch('REUNION', 8)
+    scheduler.watch('GUYANE', 8)
+    scheduler.tick()
+    
+    # Plus aucune session sur la Guyane : retirée au tick suivant
+    baux.discard('GUYANE')
+    scheduler.tick()
+    assert scheduler.batches_since('GUYANE', 0) == []
+    assert (scheduler.version('REUNION'), scheduler.version('GUYANE')) == (2, 1)
+    
+    # De nouveau consultée : le flux reprend à sa version
+    baux.add('GUYANE')
+    scheduler.watch('GUYANE', 8)
+    scheduler.tick()
+    assert [v for v, _ in scheduler.batches_since('GUYANE', 0)] == [2]
@@ -0,0 +1,30 @@
+"""Métriques des caches : calculs et recalculs des fonctions instrumentées"""
+import pandas as pd
+
+from octroi.metrics import get_metrics, instrumented_cache_data
+
+def _compteur(nom, cache):
+    echantillons, _ = get_metrics()._echantillons()
+    return sum(valeur for n, etiquettes, valeur in echantillons if n == nom and etiquettes.get('cache') == cache)
+
+@instrumented_cache_data(ttl=60)
+def _rollups_test(territory_code, data_version, _historical_data, filtre=None):
+    return _historical_data['valeur'].sum()
+
+def test_recompute_of_same_key_counts_one_eviction():
+    cache = '_rollups_test'
+    historique = pd.DataFrame({'valeur': [1.0, 2.0]})
+    
+    assert _rollups_test('REUNION', 1, historique) == 3.0
+    # Même clé, autre objet pour le paramètre non haché : servi par le cache
+    assert _rollups_test('REUNION', 1, historique.copy()) == 3.0
+    assert _compteur('octroi_cache_evictions_total', cache) == 0
+    
+    _rollups_test.clear()
+    _rollups_test('REUNION', 1, historique)
+    assert _compteur('octroi_cache_misses_total', cache) == 2
+    assert _compteur('octroi_cache_evictions_total', cache) == 1
+    
+    # Nouvelle clé : un calcul, pas une éviction
+    _rollups_test('REUNION', 2, historique)
+    assert _compteur('octroi_cache_evictions_total', cache) == 1
@@ -0,0 +1,116 @@
+"""Historique partitionné et filtres de la barre latérale, comparés aux filtres pandas"""
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from octroi.partitions import HistoryFilter, PartitionedHistory
+from octroi.scenario import Scenario
+from octroi.sources import SyntheticDataSource
+from octroi.store import build_territory_entry
+
+def _entree():
+    return build_territory_entry(SyntheticDataSource(Scenario(seed=11)), 'REUNION')
+
+def _attendu(historique, debut=None, fin=None, categories=None):
+    # Filtre booléen sur l'historique, rangé comme les partitions : catégorie puis mois
+    masque = pd.Series(True, index=range(len(historique)))
+    mois = pd.PeriodIndex(historique.index, freq='M')
+    if debut is not None:
+        masque &= mois >= debut
+    if fin is not None:
+        masque &= mois <= fin
+    if categories is not None:
+        masque &= historique['categorie'].isin(categories).to_numpy()
+    lignes = historique[masque.to_numpy()]
+    return lignes.assign(_mois=lignes.index.asi8).sort_values(['categorie', '_mois'], kind='stable') \
+        .drop(columns='_mois')
+
+def test_select_matches_boolean_filter():
+    historique = _entree()['historical_data']
+    # Historique rangé par date seulement : PartitionedHistory doit le réordonner
+    melange = historique.assign(_mois=historique.index.asi8).sort_values('_mois', kind='stable') \
+        .drop(columns='_mois')
+    partitions = PartitionedHistory(melange)
+    premier, dernier = partitions.premier_mois, partitions.dernier_mois
+    
+    cas = [
+        {},
+        {'debut': premier + 6, 'fin': dernier - 6},
+        {'categories': ['Santé']},
+        {'debut': premier + 3, 'categories': ['Alimentation', 'Transport']},
+        {'fin': premier + 12, 'categories': ['Commerce', 'Industrie', 'Énergie']},
+        {'debut': dernier, 'fin': dernier},
+        {'categories': []},
+        {'debut': dernier + 1, 'fin': dernier + 24},
+        {'debut': premier - 24, 'fin': premier - 1},
+        {'categories': ['Inconnue']}
+    ]
+    for parametres in cas:
+        obtenu = partitions.select(**parametres)
+        assert_frame_equal(obtenu, _attendu(melange, **parametres))
+    assert len(partitions.select(categories=[])) == 0
+    assert len(partitions.select(debut=dernier + 1)) == 0
+
+def test_sorted_history_is_not_copied():
+    entree = _entree()
+    partitions = entree['partitions']
+    # Déjà rangé (catégorie, mois) : l'historique est repris tel quel
+    assert PartitionedHistory(entree['historical_data']).data is entree['historical_data']
+    # Toutes les catégories sur toute la période : une seule plage, vue sans copie
+    tout = partitions.select()
+    assert len(tout) == len(entree['historical_data'])
+    assert tout['revenu_octroi'].to_numpy().base is not None
+
+def test_inactive_filter_returns_loaded_entry():
+    entree = _entree()
+    partitions = entree['partitions']
+    filtre = HistoryFilter.from_controls(partitions, partitions.premier_mois.to_timestamp(),
+                                         partitions.dernier_mois.to_timestamp(), partitions.categories)
+    assert filtre.key is None
+    assert filtre.apply(entree) is entree
+    
+    # Bornes inversées et au-delà de l'historique : même filtre inactif
+    filtre = HistoryFilter.from_controls(partitions, (partitions.dernier_mois + 12).to_timestamp(),
+                                         (partitions.premier_mois - 12).to_timestamp(), partitions.categories)
+    assert filtre.key is None
+
+def test_filter_matches_boolean_filter():
+    entree = _entree()
+    partitions = entree['partitions']
+    premier, dernier = partitions.premier_mois, partitions.dernier_mois
+    historique, courant = entree['historical_data'], entree['current_data']
+    
+    # Bornes inversées : la fenêtre est remise dans l'ordre
+    filtre = HistoryFilter.from_controls(partitions, (dernier - 4).to_timestamp(), (premier + 2).to_timestamp(),
+                                         ['Santé', 'Alimentation'])
+    assert (filtre.debut, filtre.fin, filtre.categories) == (premier + 2, dernier - 4, ('Alimentation', 'Santé'))
+    vue = filtre.apply(entree)
+    assert_frame_equal(vue['historical_data'], _attendu(historique, premier + 2, dernier - 4, ['Santé', 'Alimentation']))
+    assert_frame_equal(vue['current_data'], courant[courant['categorie'].isin(['Santé', 'Alimentation'])])
+    assert entree['current_data'] is courant
+    
+    # Fenêtre entièrement avant l'historique : ramenée à son premier mois
+    filtre = HistoryFilter.from_controls(partitions, (premier - 24).to_timestamp(), (premier - 12).to_timestamp(),
+                                         partitions.categories)
+    assert (filtre.debut, filtre.fin, filtre.categories) == (None, premier, None)
+    vue = filtre.apply(entree)
+    assert_frame_equal(vue['historical_data'], _attendu(historique, fin=premier))
+    assert vue['current_data'] is courant
+    
+    # Fenêtre entièrement après l'historique : ramenée à son dernier mois
+    filtre = HistoryFilter.from_controls(partitions, (dernier + 1).to_timestamp(), (dernier + 12).to_timestamp(),
+                                         partitions.categories)
+    assert (filtre.debut, filtre.fin) == (dernier, None)
+    assert_frame_equal(filtre.apply(entree)['historical_data'], _attendu(historique, debut=dernier))
+
+def test_empty_category_selection():
+    entree = _entree()
+    partitions = entree['partitions']
+    filtre = HistoryFilter.from_controls(partitions, partitions.premier_mois.to_timestamp(),
+                                         partitions.dernier_mois.to_timestamp(), [])
+    assert filtre.categories == ()
+    vue = filtre.apply(entree)
+    assert len(vue['historical_data']) == 0
+    assert len(vue['current_data']) == 0
+    assert list(vue['historical_data'].columns) == list(entree['historical_data'].columns)
+    assert vue['query_index'].taille == 0
+    assert len(vue['query_index'].query('revenu_mensuel')) == 0
@@ -0,0 +1,74 @@
+"""Index de requête du tableau des revenus, comparé aux filtres et tris pandas"""
+import numpy as np
+import pandas as pd
+
+from octroi.live import LiveUpdateEngine
+from octroi.query import COLONNES_TRI, SecteurQueryIndex
+
+def _courant(n=200, seed=4):
+    # Valeurs arrondies : beaucoup d'ex æquo, l'ordre stable est vérifié aussi
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'secteur': [f'S{i:03d}' for i in range(n)],
+        'categorie': rng.choice(['Alimentation', 'Santé', 'Transport', 'Énergie'], n),
+        'revenu_mensuel': rng.integers(1, 20, n) * 1e5,
+        'variation_pct': rng.integers(-3, 4, n).astype(float),
+        'volume_importation': rng.integers(1, 10, n) * 1e3,
+        'taux_normal': rng.choice([2.5, 5.0, 7.5], n)
+    })
+
+def _attendu(courant, colonne, categorie=None, performance=None):
+    masque = np.ones(len(courant), dtype=bool)
+    if categorie is not None:
+        masque &= (courant['categorie'] == categorie).to_numpy()
+    variation = courant['variation_pct']
+    if performance == 'En croissance':
+        masque &= (variation > 0).to_numpy()
+    elif performance == 'En décroissance':
+        masque &= (variation < 0).to_numpy()
+    elif performance == 'Stable':
+        masque &= (variation == 0).to_numpy()
+    return courant[masque].sort_values(colonne, ascending=False, kind='stable')['secteur'].tolist()
+
+def _verifier(index, courant):
+    for colonne in COLONNES_TRI.values():
+        for categorie in [None, 'Santé', 'Énergie', 'Inconnue']:
+            for performance in [None, 'En croissance', 'En décroissance', 'Stable']:
+                positions = index.query(colonne, categorie, performance)
+                assert courant['secteur'].iloc[positions].tolist() == \
+                    _attendu(courant, colonne, categorie, performance)
+
+def test_query_matches_sort_values():
+    courant = _courant()
+    _verifier(SecteurQueryIndex(courant), courant)
+
+def test_subset_matches_filtered_frame():
+    courant = _courant()
+    index = SecteurQueryIndex(courant)
+    for categories in [['Santé'], ['Alimentation', 'Transport'], ['Alimentation', 'Santé', 'Transport', 'Énergie']]:
+        positions = index.positions(categories)
+        assert positions.tolist() == np.flatnonzero(courant['categorie'].isin(categories)).tolist()
+        sous_ensemble = courant.iloc[positions]
+        _verifier(index.subset(positions), sous_ensemble)
+        assert set(index.subset(positions).categories) == set(categories)
+    
+    # Sélection vide : aucune ligne, aucune catégorie
+    positions = index.positions([])
+    vide = index.subset(positions)
+    assert len(positions) == 0 and vide.taille == 0 and vide.categories == {}
+    assert len(vide.query('revenu_mensuel', performance='En croissance')) == 0
+
+def test_with_live_values_matches_sort_values():
+    courant = _courant()
+    index = SecteurQueryIndex(courant)
+    engine = LiveUpdateEngine(courant, base_version=1)
+    rng = np.random.default_rng(9)
+    for _ in range(5):
+        engine.apply(rng.random(len(courant)) < 0.5, rng.uniform(-0.05, 0.05, len(courant)),
+                     rng.uniform(0.95, 1.05, len(courant)))
+    direct = engine.snapshot()
+    index_direct = index.with_live_values(direct)
+    _verifier(index_direct, direct)
+    # Seules les colonnes en direct sont retriées ; l'index de base est inchangé
+    assert index_direct.ordres['taux_normal'] is index.ordres['taux_normal']
+    _verifier(index, courant)
@@ -0,0 +1,64 @@
+"""Simulateur : index des taux et calcul par lots de l'Octroi de Mer"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from octroi.simulator import RateIndex, calculer_octroi_batch
+
+SECTEURS = {
+    'AUTOMOBILE': {'taux_normal': 12.0, 'taux_reduit': 6.0, 'taux_specifique': 0.0},
+    'ENERGIE': {'taux_normal': 2.0, 'taux_reduit': 1.0, 'taux_specifique': 5.0}
+}
+PRODUITS = pd.DataFrame({
+    'produit': ['Voitures', 'Carburants', 'Fusées'],
+    'secteur': ['AUTOMOBILE', 'ENERGIE', 'SPATIAL'],
+    'taux_octroi': [12.0, 2.0, 0.5],
+    'volume': [10, 20, 30]
+})
+
+@pytest.fixture
+def index():
+    return RateIndex(SECTEURS, PRODUITS)
+
+def test_batch_by_sector_amounts_and_statuses(index):
+    declarations = pd.DataFrame({
+        'secteur': ['AUTOMOBILE', 'ENERGIE', 'AUTOMOBILE', 'INCONNU', 'ENERGIE', 'ENERGIE', 'AUTOMOBILE'],
+        'valeur': [1000, 500, 2000, 100, 300, 400, 'abc'],
+        'type_taux': ['Normal', 'Spécifique', 'Réduit', 'Normal', 'Exceptionnel', 'Normal', 'Normal'],
+        'pays_origine': ['France', 'UE', 'DOM', 'France', 'France', 'Lune', 'France']
+    })
+    lignes, agregats = calculer_octroi_batch(declarations, index)
+    
+    # 1000 × 12 % ; 500 × 5 % ; provenance DOM exonérée
+    np.testing.assert_allclose(lignes['montant_octroi'], [120.0, 25.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+    np.testing.assert_allclose(lignes['taux_applique'][:3], [12.0, 5.0, 6.0])
+    assert list(lignes['statut']) == ['ok', 'ok', 'ok', 'secteur inconnu', 'type de taux inconnu',
+                                      'origine inconnue', 'valeur invalide']
+    
+    assert agregats['lignes'] == 7
+    assert agregats['lignes_rejetees'] == 4
+    assert agregats['valeur_totale'] == 3500.0
+    assert agregats['montant_total'] == 145.0
+    par_secteur = agregats['par_secteur'].set_index('secteur')
+    assert par_secteur.loc['AUTOMOBILE', ['lignes', 'valeur', 'montant_octroi']].tolist() == [2, 3000.0, 120.0]
+    assert par_secteur.loc['ENERGIE', ['lignes', 'valeur', 'montant_octroi']].tolist() == [1, 500.0, 25.0]
+    par_origine = agregats['par_origine'].set_index('pays_origine')
+    assert par_origine['montant_octroi'].to_dict() == {'France': 120.0, 'UE': 25.0, 'DOM': 0.0}
+
+def test_batch_by_product_joins_sector_and_defaults(index):
+    declarations = pd.DataFrame({
+        'produit': ['Carburants', 'Voitures', 'Fusées', 'Inconnu'],
+        'valeur': [1000, 100, 100, 100]
+    })
+    lignes, agregats = calculer_octroi_batch(declarations, index, type_taux_defaut='Réduit')
+    
+    # Taux réduit par défaut, origine France : 1000 × 1 % et 100 × 6 %
+    np.testing.assert_allclose(lignes['montant_octroi'], [10.0, 6.0, 0.0, 0.0])
+    assert list(lignes['statut']) == ['ok', 'ok', 'produit inconnu', 'produit inconnu']
+    assert agregats['montant_total'] == 16.0
+    assert list(agregats['par_secteur']['secteur']) == ['AUTOMOBILE', 'ENERGIE']
+
+def test_lookup_rejects_product_of_unknown_sector(index):
+    assert index.lookup('Carburants')['taux_specifique'] == 5.0
+    with pytest.raises(KeyError):
+        index.lookup('Fusées')
@@ -0,0 +1,54 @@
+"""Backend fichiers : ingestion et réingestion des extraits CSV"""
+import os
+
+from octroi.definitions import get_secteurs_definitions
+from octroi.generators import generate_historical_data
+from octroi.scenario import Scenario
+from octroi.sources import FileDataSource
+
+def _extrait(chemin, historique):
+    historique.reset_index(drop=True)[FileDataSource.COLONNES].to_csv(chemin, index=False)
+
+def test_reingest_replaces_partitions_of_changed_extract(tmp_path):
+    csv_dir, store_dir = tmp_path / 'extraits', tmp_path / 'store'
+    csv_dir.mkdir()
+    historique = generate_historical_data('REUNION', get_secteurs_definitions('REUNION'), Scenario(seed=5))
+    _extrait(csv_dir / 'reunion.csv', historique)
+    source = FileDataSource(str(store_dir), csv_dir=str(csv_dir))
+    
+    assert source.sync() == ['reunion.csv']
+    assert len(source.load_history('REUNION')) == len(historique)
+    assert source.sync() == []
+    
+    # Extrait réécrit sans son dernier mois : la partition de ce mois disparaît
+    dernier_mois = historique['date'].max()
+    raccourci = historique[historique['date'] < dernier_mois]
+    _extrait(csv_dir / 'reunion.csv', raccourci)
+    os.utime(csv_dir / 'reunion.csv', (1, 1))
+    assert source.sync() == ['reunion.csv']
+    
+    relu = source.load_history('REUNION')
+    assert len(relu) == len(raccourci)
+    assert relu['date'].max() < dernier_mois
+    assert not relu.duplicated(['date', 'secteur']).any()
+    assert not (store_dir / 'territoire=REUNION' / f"mois={dernier_mois:%Y-%m}").exists()
+
+def test_territory_without_extract_loads_empty(tmp_path):
+    source = FileDataSource(str(tmp_path))
+    data = source.load_territory('GUYANE')
+    assert len(data['historical_data']) == 0
+    assert list(data['current_data'].columns)[:4] == ['territoire', 'secteur', 'nom_complet', 'categorie']
+
+def test_loaded_data_carries_key_of_manifest_read(tmp_path):
+    csv_dir = tmp_path / 'extraits'
+    csv_dir.mkdir()
+    historique = generate_historical_data('REUNION', get_secteurs_definitions('REUNION'), Scenario(seed=5))
+    _extrait(csv_dir / 'reunion.csv', historique)
+    source = FileDataSource(str(tmp_path / 'store'), csv_dir=str(csv_dir))
+    
+    data = source.load_territory('REUNION')
+    assert data['snapshot_key'] == source.snapshot_key('REUNION')
+    
+    # Extrait arrivé après le chargement : nouvelle clé, les données déjà lues gardent la leur
+    _extrait(csv_dir / 'guyane.csv', historique.assign(territoire='GUYANE'))
+    assert source.snapshot_key('REUNION') != data['snapshot_key']